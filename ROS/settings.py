@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -59,12 +60,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.profiling.QueryProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.audit.AuditContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -142,17 +145,36 @@ if not DEBUG:
 else:
     STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
 
-# Basic Django caching (no Redis for now)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'restaurant-cache',
-        'TIMEOUT': 300,  # 5 minutes
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000
+# Shared cache: every worker process sees the same entries.
+# Set REDIS_URL to use Redis, otherwise a local SQLite file is used.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+            'TIMEOUT': 300,  # 5 minutes
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache.sqlite3',
+            'TIMEOUT': 300,  # 5 minutes
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000
+            }
+        }
+    }
+
+# Tests get a private in-memory cache instead of the shared cache file
+if 'test' in sys.argv:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'tests',
         }
     }
-}
 
 # Development caching - simple and effective
 CACHE_MIDDLEWARE_SECONDS = 60 * 15  # 15 minutes cache for anonymous users
@@ -166,10 +188,8 @@ AUTHENTICATION_BACKENDS = [
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
-        'accounts.authentication.JWTAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Cached JWT bearer tokens, falling back to the Django session
+        'accounts.authentication.JWTOrSessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -199,6 +219,7 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 JWT_SECRET_KEY = SECRET_KEY  # Use Django secret key directly
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DAYS = 7
+JWT_PRINCIPAL_CACHE_TTL = 60  # seconds a token's user data is served from cache
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
@@ -258,4 +279,86 @@ PAYMENT_SETTINGS = {
     'AUTO_CREATE_PAYMENT_ON_SERVE': True,
     'DEFAULT_PAYMENT_METHOD': 'cash',
     'RECEIPT_PRINTER_ENABLED': False,  # Set to True if you have a thermal printer
+    # Background verification of pending digital payments
+    'VERIFICATION_BATCH_SIZE': 50,
+    'VERIFICATION_MAX_WORKERS': 4,
+    'VERIFICATION_RATE_LIMIT': 5,  # verify calls per second per gateway
+    'VERIFICATION_MIN_AGE': 60,  # seconds, give the webhook a chance first
+    'VERIFICATION_MAX_ATTEMPTS': 20,
+    # Webhook inbox
+    'CBE_WEBHOOK_SECRET': os.environ.get('CBE_WEBHOOK_SECRET', ''),
+    'WEBHOOK_ASYNC_PROCESSING': True,
+    'WEBHOOK_MAX_ATTEMPTS': 5,
+}
+
+# Request profiling (core.profiling); report at /api/system/profiling/
+PROFILING = {
+    # Fingerprinting every query has a cost: on in development and tests;
+    # in production enable with a low SAMPLE_RATE
+    'ENABLED': DEBUG or 'test' in sys.argv,
+    'SAMPLE_RATE': 1.0,  # share of requests profiled
+    'RING_SIZE': 200,  # samples kept per URL name
+    'HEADERS': DEBUG,  # X-Query-Count / Server-Timing response headers
+    'ENFORCE_BUDGETS': 'test' in sys.argv,  # over-budget requests fail tests
+    'QUERY_BUDGETS': {  # URL name -> max queries per request
+        'kitchen-orders': 10,
+        'cashier-dashboard-data': 12,
+        'table-list': 10,
+        'table-board': 5,
+        'waste-dashboard-api': 10,
+        'profit_intelligence:api-dashboard': 35,
+        'health-check': 2,
+    },
+}
+
+# Profit dashboard snapshot (profit_intelligence.snapshot)
+DASHBOARD_SNAPSHOT = {
+    'MAX_WORKERS': 4,  # threads computing uncached sections
+    'TIMEOUT': 5,  # seconds before returning a partial snapshot
+    'TTLS': {},  # per-section cache TTL overrides, e.g. {'trend': 600}
+}
+
+# Order ready time estimates (tables.eta)
+ORDER_ETA = {
+    'HISTORY_DAYS': 30,  # finished orders item preparation times are learned from
+    'STATION_CAPACITY': 2,  # tickets a station works on at once
+    'STATION_CAPACITIES': {},  # per-station overrides, e.g. {'grill': 3}
+    'CACHE_TIMEOUT': 600,  # seconds learned estimates are cached
+}
+
+# Table QR codes (tables.qr)
+QR_CODES = {
+    'BASE_URL': os.environ.get('QR_BASE_URL', 'http://localhost:8000'),
+    'TOKEN_TTL_HOURS': 4,
+    'MAX_WORKERS': 4,  # processes rendering QR images in batches
+    'REVOCATION_SYNC_INTERVAL': 30,  # seconds a process trusts a token it found not revoked
+}
+
+# Partitioned analytics export (core.analytics_export, manage.py export_analytics)
+ANALYTICS_EXPORT = {
+    'ROOT': os.path.join(BASE_DIR, 'exports', 'analytics'),
+    'CHUNK_SIZE': 5000,  # rows read and held at a time
+    'LAG_HOURS': 6,  # rows younger than this are left for the next run
+}
+
+# Buffered audit log (core.audit) and its archival (manage.py archive_audit_logs)
+AUDIT_LOG = {
+    'BATCH_SIZE': 200,  # events written per bulk_create
+    'FLUSH_INTERVAL_MS': 1000,  # longest an event waits in the buffer
+    'BUFFER_SIZE': 20000,  # events held per process; the oldest are dropped beyond
+    'SYNCHRONOUS': 'test' in sys.argv,  # tests see events at once
+    # Reverse proxies (REMOTE_ADDR) whose X-Forwarded-For names the client
+    'TRUSTED_PROXIES': [ip for ip in os.environ.get('AUDIT_TRUSTED_PROXIES', '').split(',') if ip],
+    'ARCHIVE_ROOT': os.path.join(BASE_DIR, 'exports', 'audit'),
+    'RETENTION_MONTHS': 3,  # whole months kept in the live table
+}
+
+# Background jobs (core.jobs, manage.py run_jobs)
+JOB_QUEUE = {
+    'WORKERS': 4,  # jobs run at once per worker
+    'POLL_INTERVAL': 2,  # seconds between polls of an idle queue
+    'LEASE_SECONDS': 60 * 5,  # running jobs without a heartbeat this long are requeued
+    'HEARTBEAT_SECONDS': 60,  # workers refresh their running jobs' lease this often
+    'MAX_ATTEMPTS': 3,
+    'RETRY_DELAY': 30,  # seconds, doubled on every retry
 }
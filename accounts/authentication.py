@@ -1,16 +1,65 @@
 # accounts/authentication.py - Create this file
+import hashlib
+import time
+
 import jwt
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework import authentication
 from rest_framework.exceptions import AuthenticationFailed
 from .utils import verify_jwt_token
 
 User = get_user_model()
 
+# User fields cached per token; everything else is loaded lazily on access
+PRINCIPAL_FIELDS = [
+    'id', 'username', 'email', 'first_name', 'last_name', 'role',
+    'manager_scope', 'branch_id', 'restaurant_id',
+    'is_active', 'is_staff', 'is_superuser',
+]
+
+
+def _principal_ttl():
+    return getattr(settings, 'JWT_PRINCIPAL_CACHE_TTL', 60)
+
+
+def _principal_key(token):
+    return 'auth:principal:' + hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def _generation_key(user_id):
+    return f'auth:generation:{user_id}'
+
+
+def revoke_user_principals(user_id):
+    """Invalidate every cached principal of a user (role/status changes)"""
+    cache.set(_generation_key(user_id), time.time_ns(), None)
+
+
+def _build_user(principal):
+    """Rebuild the user from cached data without touching the DB.
+
+    Fields not in PRINCIPAL_FIELDS are deferred, so save() only writes
+    the loaded fields and never clobbers the rest of the row.
+    """
+    field_names = []
+    values = []
+    for field in User._meta.concrete_fields:
+        if field.attname in principal:
+            field_names.append(field.attname)
+            values.append(principal[field.attname])
+
+    return User.from_db('default', field_names, values)
+
 
 class JWTAuthentication(authentication.BaseAuthentication):
-    """JWT authentication for DRF"""
+    """JWT authentication for DRF
+
+    The user principal is cached per token for JWT_PRINCIPAL_CACHE_TTL
+    seconds, so repeat requests (dashboard polling) need no DB query and
+    no signature check. revoke_user_principals() drops the cache early.
+    """
 
     def authenticate(self, request):
         auth_header = request.headers.get('Authorization', '')
@@ -18,8 +67,32 @@ class JWTAuthentication(authentication.BaseAuthentication):
         if not auth_header.startswith('Bearer '):
             return None  # Let other auth classes try
 
+        token = auth_header.split(' ')[1] if ' ' in auth_header else ''
+        if not token:
+            raise AuthenticationFailed('Invalid token')
+
+        user = self.get_cached_user(token)
+        if user is None:
+            user = self.authenticate_token(token)
+
+        return (user, token)
+
+    def get_cached_user(self, token):
+        principal = cache.get(_principal_key(token))
+        if not principal:
+            return None
+
+        if principal['exp'] <= time.time():
+            return None
+
+        generation = cache.get(_generation_key(principal['user']['id']), 0)
+        if principal['generation'] != generation:
+            return None
+
+        return _build_user(principal['user'])
+
+    def authenticate_token(self, token):
         try:
-            token = auth_header.split(' ')[1]
             payload = verify_jwt_token(token)
 
             if not payload:
@@ -29,6 +102,9 @@ class JWTAuthentication(authentication.BaseAuthentication):
             if not user_id:
                 raise AuthenticationFailed('Invalid token payload')
 
+            # Read the generation first so a concurrent revoke wins
+            generation = cache.get(_generation_key(user_id), 0)
+
             try:
                 user = User.objects.get(id=user_id)
             except User.DoesNotExist:
@@ -38,11 +114,46 @@ class JWTAuthentication(authentication.BaseAuthentication):
             if not user.is_active:
                 raise AuthenticationFailed('User account is disabled')
 
-            return (user, token)
+            self.cache_principal(token, user, payload, generation)
+            return user
 
+        except AuthenticationFailed:
+            raise
         except jwt.ExpiredSignatureError:
             raise AuthenticationFailed('Token has expired')
         except jwt.InvalidTokenError:
             raise AuthenticationFailed('Invalid token')
         except Exception as e:
             raise AuthenticationFailed(f'Authentication error: {str(e)}')
+
+    def cache_principal(self, token, user, payload, generation):
+        exp = payload.get('exp') or (time.time() + _principal_ttl())
+        ttl = int(min(_principal_ttl(), exp - time.time()))
+        if ttl <= 0:
+            return
+
+        cache.set(_principal_key(token), {
+            'user': {
+                field.attname: getattr(user, field.attname)
+                for field in User._meta.concrete_fields
+                if field.attname in PRINCIPAL_FIELDS
+            },
+            'exp': exp,
+            'generation': generation,
+        }, ttl)
+
+
+class JWTOrSessionAuthentication(authentication.SessionAuthentication):
+    """Single DRF authentication class for the whole API
+
+    Bearer tokens go through the cached JWT path; anything else falls
+    back to the Django session (with CSRF checks).
+    """
+
+    jwt_authentication = JWTAuthentication()
+
+    def authenticate(self, request):
+        if request.headers.get('Authorization', '').startswith('Bearer '):
+            return self.jwt_authentication.authenticate(request)
+
+        return super().authenticate(request)
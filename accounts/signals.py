@@ -1,13 +1,36 @@
 # accounts/signals.py
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
 from .models import CustomUser
+from .authentication import PRINCIPAL_FIELDS, revoke_user_principals
 from tables.models import Order
 
 
+@receiver(post_save, sender=CustomUser)
+def revoke_cached_principal_on_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Drop cached JWT principals when identity data (role, branch, status...)
+    may have changed. Performance-metric saves with update_fields skip this.
+    """
+    if created:
+        return
+
+    if update_fields is not None:
+        changed = {sender._meta.get_field(name).attname for name in update_fields}
+        if not changed & (set(PRINCIPAL_FIELDS) | {'password'}):
+            return
+
+    revoke_user_principals(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_cached_principal_on_delete(sender, instance, **kwargs):
+    revoke_user_principals(instance.pk)
+
+
 @receiver(post_save, sender=Order)
 def update_staff_performance(sender, instance, created, **kwargs):
     """
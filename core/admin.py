@@ -2,7 +2,7 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
-from .models import AuditLog, SystemSetting
+from .models import AuditLog, Job, SystemSetting
 import json
 
 
@@ -56,7 +56,7 @@ class AuditLogAdmin(admin.ModelAdmin):
         }),
     )
 
-    actions = ['clear_old_logs']
+    actions = ['archive_old_logs']
 
     # Disable add permission
     def has_add_permission(self, request):
@@ -114,18 +114,15 @@ class AuditLogAdmin(admin.ModelAdmin):
     details_formatted.short_description = 'Details'
 
     # Custom action
-    def clear_old_logs(self, request, queryset):
-        """Clear logs older than 30 days"""
-        from datetime import timedelta
-        cutoff_date = timezone.now() - timedelta(days=30)
+    def archive_old_logs(self, request, queryset):
+        """Roll months past the retention into archive files"""
+        from core.audit_archive import archive_audit_logs
 
-        # Delete logs older than 30 days
-        old_logs = AuditLog.objects.filter(created_at__lt=cutoff_date)
-        count = old_logs.count()
-        old_logs.delete()
-
-        self.message_user(request, f"Deleted {count} logs older than 30 days.")
-    clear_old_logs.short_description = "Clear logs older than 30 days"
+        results = archive_audit_logs()
+        count = sum(rows for _, rows, _ in results)
+        self.message_user(
+            request, f"Archived {count} logs from {len(results)} month(s) past the retention.")
+    archive_old_logs.short_description = "Archive logs past the retention period"
 
 
 @admin.register(SystemSetting)
@@ -208,3 +205,22 @@ class SystemSettingAdmin(admin.ModelAdmin):
             except json.JSONDecodeError:
                 pass  # Keep as string if not valid JSON
         super().save_model(request, obj, form, change)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Admin interface for background jobs (core.jobs)"""
+    list_display = ['name', 'status', 'priority', 'attempts', 'created_by',
+                    'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['job_id', 'name', 'error']
+    readonly_fields = [field.name for field in Job._meta.fields]
+
+    actions = ['requeue_jobs']
+
+    def requeue_jobs(self, request, queryset):
+        count = queryset.filter(status__in=['failed', 'cancelled']).update(
+            status='queued', attempts=0, error='', run_after=timezone.now(),
+            locked_by='', locked_at=None, finished_at=None)
+        self.message_user(request, f"Requeued {count} job(s).")
+    requeue_jobs.short_description = "Requeue failed/cancelled jobs"
@@ -0,0 +1,303 @@
+# core/analytics_export.py
+"""
+Analytics export of transactional data.
+
+Orders, order items, payments, stock transactions and waste records are
+written to partitioned files for offline analysis:
+
+    <root>/<dataset>/date=YYYY-MM-DD/branch=<id>/part-<run>-<seq>.<ext>
+
+(Hive-style directories, readable as one dataset by pyarrow, DuckDB or
+Spark). Formats are Parquet and Arrow IPC when pyarrow is installed,
+gzipped CSV otherwise.
+
+Exports are incremental: each dataset keeps a watermark (in SystemSetting)
+and a run exports rows whose time falls between it and now - LAG_HOURS,
+the lag leaving orders time to settle (be served, paid, cancelled) first.
+Rows are read in keyset-paginated chunks of CHUNK_SIZE ids, so memory
+stays constant whatever the window; parts are written under temporary
+names and only renamed, and the watermark moved, once a dataset completes.
+
+A full export (or the first one after a reset) rewrites a dataset's whole
+history, so it is written to a staging directory next to the dataset's and
+swapped in once complete, replacing the old parts instead of adding to them.
+"""
+import csv
+import gzip
+import logging
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from inventory.models import StockTransaction
+from payments.models import Payment
+from tables.models import Order, OrderItem
+from waste_tracker.models import WasteRecord
+
+from .models import SystemSetting
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_SETTING = 'analytics_export.watermarks'
+FORMAT_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow', 'csv': 'csv.gz'}
+
+
+def export_config():
+    config = {
+        'ROOT': os.path.join(settings.BASE_DIR, 'exports', 'analytics'),
+        'FORMAT': 'parquet' if pyarrow else 'csv',
+        'CHUNK_SIZE': 5000,  # rows read (and held) at a time
+        'LAG_HOURS': 6,  # rows younger than this wait for the next run
+    }
+    config.update(getattr(settings, 'ANALYTICS_EXPORT', {}))
+    return config
+
+
+class Dataset:
+    """
+    An exported model: its columns (values() paths), the time field that
+    drives watermarks and date partitions, and the path to its branch.
+    """
+
+    def __init__(self, name, model, time_field, branch_field, columns):
+        self.name = name
+        self.model = model
+        self.time_field = time_field
+        self.branch_field = branch_field
+        self.columns = columns
+
+    def fields(self):
+        return ['id', self.time_field, self.branch_field] + [
+            column for column in self.columns
+            if column not in ('id', self.time_field, self.branch_field)]
+
+
+DATASETS = {
+    dataset.name: dataset for dataset in [
+        Dataset('orders', Order, 'placed_at', 'table__branch_id', [
+            'order_number', 'table_id', 'waiter_id', 'chef_id', 'order_type',
+            'status', 'subtotal', 'tax_amount', 'service_charge',
+            'discount_amount', 'total_amount', 'is_paid', 'is_priority',
+            'confirmed_at', 'ready_at', 'served_at', 'completed_at',
+            'cancelled_at',
+        ]),
+        Dataset('order_items', OrderItem, 'order__placed_at', 'order__table__branch_id', [
+            'order_id', 'menu_item_id', 'menu_item__name',
+            'menu_item__category_id', 'quantity', 'unit_price', 'station',
+        ]),
+        Dataset('payments', Payment, 'created_at', 'order__table__branch_id', [
+            'payment_id', 'order_id', 'payment_method', 'amount', 'status',
+            'processed_by_id', 'processed_at', 'refunded_at',
+        ]),
+        Dataset('stock_transactions', StockTransaction, 'created_at', 'branch_id', [
+            'stock_item_id', 'stock_item__name', 'transaction_type',
+            'quantity', 'unit_cost', 'total_cost', 'order_id', 'menu_item_id',
+            'user_id', 'restaurant_id', 'transaction_date',
+        ]),
+        Dataset('waste_records', WasteRecord, 'created_at', 'branch_id', [
+            'waste_id', 'stock_transaction_id', 'stock_transaction__stock_item_id',
+            'stock_transaction__quantity', 'stock_transaction__total_cost',
+            'waste_reason_id', 'waste_reason__category_id', 'status',
+            'priority', 'station', 'shift', 'recorded_by_id',
+            'is_recurring_issue', 'recorded_at', 'waste_occurred_at',
+        ]),
+    ]
+}
+
+
+# ============ WATERMARKS ============
+
+def get_watermarks():
+    setting = SystemSetting.objects.filter(key=WATERMARK_SETTING).first()
+    return dict(setting.value) if setting else {}
+
+
+def set_watermark(dataset_name, value):
+    watermarks = get_watermarks()
+    watermarks[dataset_name] = value.isoformat()
+    SystemSetting.objects.update_or_create(
+        key=WATERMARK_SETTING,
+        defaults={'value': watermarks,
+                  'description': 'Analytics export: exported-until time per dataset'})
+
+
+def reset_watermarks(dataset_names=None):
+    if dataset_names is None:
+        SystemSetting.objects.filter(key=WATERMARK_SETTING).delete()
+        return
+    watermarks = get_watermarks()
+    for name in dataset_names:
+        watermarks.pop(name, None)
+    SystemSetting.objects.update_or_create(
+        key=WATERMARK_SETTING, defaults={'value': watermarks})
+
+
+# ============ WRITERS ============
+
+def _column_value(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _write_csv(path, columns, rows):
+    with gzip.open(path, 'wt', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def _arrow_table(columns, rows):
+    data = {column: [] for column in columns}
+    for row in rows:
+        for column, value in zip(columns, row):
+            if isinstance(value, Decimal):
+                value = float(value)  # mixed scales do not infer as one decimal128
+            data[column].append(_column_value(value))
+    return pyarrow.table(data)
+
+
+def write_part(path, columns, rows, file_format):
+    if file_format == 'csv':
+        _write_csv(path, columns, rows)
+        return
+    if pyarrow is None:
+        raise RuntimeError(f"The {file_format} export format requires pyarrow")
+
+    table = _arrow_table(columns, rows)
+    if file_format == 'parquet':
+        pyarrow.parquet.write_table(table, path)
+    else:
+        with pyarrow.OSFile(str(path), 'wb') as sink:
+            with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+# ============ EXPORT ============
+
+def _partition(row):
+    moment = row[1]
+    day = timezone.localtime(moment).date() if moment else 'unknown'
+    return f"date={day}", f"branch={row[2] if row[2] is not None else 'none'}"
+
+
+def export_dataset(dataset, until, since=None, root=None, file_format=None,
+                   chunk_size=None, run_id=None):
+    """
+    Export a dataset's rows with since <= time < until in chunks of
+    chunk_size ids. Returns (rows, files).
+    """
+    config = export_config()
+    root = Path(root or config['ROOT'])
+    file_format = file_format or config['FORMAT']
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+    run_id = run_id or timezone.now().strftime('%Y%m%dT%H%M%S')
+    extension = FORMAT_EXTENSIONS[file_format]
+
+    fields = dataset.fields()
+    queryset = dataset.model.objects.filter(**{f'{dataset.time_field}__lt': until})
+    if since:
+        queryset = queryset.filter(**{f'{dataset.time_field}__gte': since})
+    queryset = queryset.order_by('id').values_list(*fields)
+
+    written = []
+    total = 0
+    last_id = 0
+    sequence = 0
+    try:
+        while True:
+            # Keyset pagination: no OFFSET scans, one chunk in memory
+            rows = list(queryset.filter(id__gt=last_id)[:chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            total += len(rows)
+
+            partitions = {}
+            for row in rows:
+                partitions.setdefault(_partition(row), []).append(row)
+            for (day, branch), partition_rows in partitions.items():
+                directory = root / dataset.name / day / branch
+                directory.mkdir(parents=True, exist_ok=True)
+                sequence += 1
+                path = directory / f"part-{run_id}-{sequence:05d}.{extension}.tmp"
+                write_part(path, fields, partition_rows, file_format)
+                written.append(path)
+    except Exception:
+        for path in written:
+            path.unlink(missing_ok=True)
+        raise
+
+    files = []
+    for path in written:
+        final = path.with_name(path.name[:-len('.tmp')])
+        path.rename(final)
+        files.append(final)
+    return total, files
+
+
+def _swap_in(staging, target):
+    """Replace target with the staging directory (absent when no rows)"""
+    retired = target.with_name(f".{target.name}-retired")
+    if target.exists():
+        shutil.rmtree(retired, ignore_errors=True)
+        target.rename(retired)
+    if staging.exists():
+        staging.rename(target)
+    shutil.rmtree(retired, ignore_errors=True)
+
+
+def run_export(dataset_names=None, root=None, file_format=None, chunk_size=None,
+               full=False, until=None):
+    """
+    Incremental export of the datasets (all by default) from their
+    watermark to now - LAG_HOURS. A dataset without a watermark (or every
+    one with full) is exported whole and replaces the dataset's directory.
+    Returns {dataset: (rows, files)}.
+    """
+    config = export_config()
+    root = Path(root or config['ROOT'])
+    until = until or timezone.now() - timedelta(hours=config['LAG_HOURS'])
+    run_id = timezone.now().strftime('%Y%m%dT%H%M%S')
+    watermarks = {} if full else get_watermarks()
+
+    results = {}
+    for name in dataset_names or DATASETS:
+        dataset = DATASETS[name]
+        since = parse_datetime(watermarks[name]) if watermarks.get(name) else None
+        if since and since >= until:
+            results[name] = (0, [])
+            continue
+
+        if since:
+            rows, files = export_dataset(
+                dataset, until, since=since, root=root, file_format=file_format,
+                chunk_size=chunk_size, run_id=run_id)
+        else:
+            staging_root = root / f".staging-{run_id}"
+            try:
+                rows, files = export_dataset(
+                    dataset, until, root=staging_root, file_format=file_format,
+                    chunk_size=chunk_size, run_id=run_id)
+                _swap_in(staging_root / name, root / name)
+            finally:
+                shutil.rmtree(staging_root, ignore_errors=True)
+            files = [root / path.relative_to(staging_root) for path in files]
+        set_watermark(name, until)
+        logger.info(f"Exported {rows} {name} rows to {len(files)} file(s)")
+        results[name] = (rows, files)
+    return results
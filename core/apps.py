@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Cache invalidation for tagged dashboard caches
+        import core.signals
+
+        # Buffered audit log and its capture hooks
+        import core.audit
+
+        # Background job handlers (core.jobs) registered in <app>/jobs.py
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('jobs')
@@ -0,0 +1,325 @@
+# core/audit.py
+"""
+Buffered AuditLog writer.
+
+record() never touches the database: it appends the event (with its own
+timestamp, user, IP and user agent) to an in-process ring buffer and
+returns. A daemon thread per process drains the buffer with one
+bulk_create every BATCH_SIZE events or FLUSH_INTERVAL_MS milliseconds,
+whichever comes first, and an atexit hook flushes what is left when the
+process shuts down. The buffer holds at most BUFFER_SIZE events; if the
+database falls that far behind, the oldest events are dropped (and the
+loss logged) rather than the process growing without bound.
+
+With SYNCHRONOUS (on under `manage.py test`) events are written at once,
+in the caller's transaction. A process forked with events still pending
+leaves them to its parent: the child drops its copy and starts its own
+flusher.
+
+Events are captured automatically (see CAPTURE below) for logins, logouts
+and failed logins, order creation and status transitions, and payment
+creation and status transitions. Status changes written with update()
+bypass the hooks and are recorded where the update happens, through the
+record_*_transition() helpers. AuditContextMiddleware makes the current
+request - its user, IP and user agent - available to those hooks; the IP
+is taken from X-Forwarded-For only when the request comes from one of
+TRUSTED_PROXIES.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+from django.db import close_old_connections
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from payments.models import Payment
+from tables.models import Order
+
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+_current_request = ContextVar('audit_request', default=None)
+
+
+def audit_config():
+    config = {
+        'ENABLED': True,
+        'BATCH_SIZE': 200,  # events written per bulk_create
+        'FLUSH_INTERVAL_MS': 1000,  # longest an event waits in the buffer
+        'BUFFER_SIZE': 20000,  # events held at most; the oldest are dropped beyond
+        'SYNCHRONOUS': False,  # write every event at once (tests)
+        'TRUSTED_PROXIES': [],  # REMOTE_ADDRs whose X-Forwarded-For is believed
+        'ARCHIVE_ROOT': os.path.join(settings.BASE_DIR, 'exports', 'audit'),
+        'RETENTION_MONTHS': 3,  # whole months kept in the live table
+        'ARCHIVE_CHUNK_SIZE': 5000,  # rows read and deleted at a time
+    }
+    config.update(getattr(settings, 'AUDIT_LOG', {}))
+    return config
+
+
+# ============ BUFFER ============
+
+class AuditBuffer:
+    """Ring buffer of pending AuditLog rows, drained by a daemon thread"""
+
+    def __init__(self, config=None):
+        self.config = config or audit_config()
+        self.events = deque(maxlen=self.config['BUFFER_SIZE'])
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.dropped = 0
+        self.written = 0
+        self._thread = None
+        self._pid = None
+
+    def add(self, event):
+        self._ensure_thread()
+        with self.lock:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.events.append(event)
+            pending = len(self.events)
+        if pending >= self.config['BATCH_SIZE']:
+            self.wakeup.set()
+
+    def _ensure_thread(self):
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid:
+            return
+        if self._pid is not None and self._pid != pid:
+            self._reset_after_fork(pid)
+        with self.lock:
+            if self._thread is not None and self._pid == pid:
+                return
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='audit-flusher', daemon=True)
+            self._thread.start()
+
+    def _reset_after_fork(self, pid):
+        # A forked worker inherits the buffer but not the thread. The parent
+        # still writes the pending events, so the copy is dropped; the locks
+        # may have been held by a parent thread and are replaced unacquired.
+        self._pid = pid
+        self._thread = None
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.events = deque(maxlen=self.config['BUFFER_SIZE'])
+        self.dropped = 0
+        self.written = 0
+
+    def _run(self):
+        interval = self.config['FLUSH_INTERVAL_MS'] / 1000
+        while True:
+            self.wakeup.wait(interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """Write every pending event; returns the number written"""
+        with self.flush_lock:
+            with self.lock:
+                events = list(self.events)
+                self.events.clear()
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                logger.warning(f"Audit buffer full: {dropped} event(s) dropped")
+            if not events:
+                return 0
+            try:
+                AuditLog.objects.bulk_create(events, batch_size=self.config['BATCH_SIZE'])
+            except Exception as e:
+                logger.error(f"Failed to write {len(events)} audit event(s): {e}")
+                return 0
+            self.written += len(events)
+            return len(events)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'pending': len(self.events),
+                'dropped': self.dropped,
+                'written': self.written,
+                'flusher_alive': bool(self._thread and self._thread.is_alive()),
+            }
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
+
+
+def flush():
+    return audit_buffer.flush()
+
+
+# ============ RECORDING ============
+
+def _client_ip(request, trusted_proxies=()):
+    remote = request.META.get('REMOTE_ADDR') or None
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    if not forwarded or remote not in trusted_proxies:
+        return remote
+    # Walk back from the nearest hop: the first address that is not one of
+    # our proxies is the client (anything before it is client-supplied)
+    for address in reversed([part.strip() for part in forwarded.split(',')]):
+        if address and address not in trusted_proxies:
+            return address
+    return remote
+
+
+def record(action, model_name, object_id=None, user=None, details=None, request=None):
+    """
+    Queue an audit event. request defaults to the current request
+    (AuditContextMiddleware); details must be JSON serializable.
+    """
+    config = audit_config()
+    if not config['ENABLED']:
+        return None
+
+    request = request or _current_request.get()
+
+    event = AuditLog(
+        user=user,
+        action=action,
+        model_name=model_name,
+        object_id=str(object_id) if object_id is not None else None,
+        details=details or {},
+        ip_address=(_client_ip(request, config['TRUSTED_PROXIES'])
+                    if request is not None else None),
+        user_agent=request.META.get('HTTP_USER_AGENT', '') if request is not None else '',
+        created_at=timezone.now(),
+    )
+    if config['SYNCHRONOUS']:
+        event.save()
+    else:
+        audit_buffer.add(event)
+    return event
+
+
+def current_user():
+    """The authenticated user of the current request, if any"""
+    request = _current_request.get()
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+class AuditContextMiddleware:
+    """Expose the current request to audit hooks fired while handling it"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+
+# ============ CAPTURE ============
+# The status loaded with an order or payment is remembered on it
+# (post_init, no query), so a save records a transition only when the
+# status really changed.
+
+@receiver(user_logged_in)
+def audit_login(sender, request, user, **kwargs):
+    record('LOGIN', 'CustomUser', user.pk, user=user, request=request,
+           details={'success': True})
+
+
+@receiver(user_logged_out)
+def audit_logout(sender, request, user, **kwargs):
+    if user is not None:
+        record('LOGOUT', 'CustomUser', user.pk, user=user, request=request)
+
+
+@receiver(user_login_failed)
+def audit_login_failed(sender, credentials, request=None, **kwargs):
+    record('LOGIN', 'CustomUser', request=request,
+           details={'success': False, 'username': credentials.get('username', '')})
+
+
+def _status_transition(instance, created, update_fields):
+    """(from, to) if the save created the row or changed its status, else None"""
+    if created:
+        return None, instance.status
+    if update_fields is not None and 'status' not in update_fields:
+        return None
+    # A deferred status was never loaded, so it cannot have been changed
+    status = instance.__dict__.get('status')
+    if status is None or status == instance._audited_status:
+        return None
+    return instance._audited_status, status
+
+
+@receiver(post_init, sender=Order)
+@receiver(post_init, sender=Payment)
+def remember_audited_status(sender, instance, **kwargs):
+    instance._audited_status = instance.__dict__.get('status')
+
+
+def record_order_transition(order, previous, status, event='status_change'):
+    """Audit an order status change, also for changes made with update()"""
+    record('ORDER', 'Order', order.pk, user=current_user(), details={
+        'event': event,
+        'order_number': order.order_number,
+        'from': previous,
+        'to': status,
+        'total_amount': str(order.total_amount),
+    })
+
+
+def record_payment_transition(payment, previous, status, event='status_change'):
+    """Audit a payment status change, also for changes made with update()"""
+    record('PAYMENT', 'Payment', payment.pk, user=current_user(), details={
+        'event': event,
+        'payment_id': str(payment.payment_id),
+        'order_id': payment.order_id,
+        'method': payment.payment_method,
+        'amount': str(payment.amount),
+        'from': previous,
+        'to': status,
+    })
+
+
+def record_table_transition(table_id, table_number, previous, status):
+    """Audit a table status change made with update() (see tables.table_state)"""
+    record('UPDATE', 'Table', table_id, user=current_user(), details={
+        'event': 'status_change',
+        'table_number': table_number,
+        'from': previous,
+        'to': status,
+    })
+
+
+@receiver(post_save, sender=Order)
+def audit_order(sender, instance, created, update_fields=None, **kwargs):
+    transition = _status_transition(instance, created, update_fields)
+    if transition is None:
+        return
+    previous, status = transition
+    instance._audited_status = status
+    record_order_transition(instance, previous, status, 'created' if created else 'status_change')
+
+
+@receiver(post_save, sender=Payment)
+def audit_payment(sender, instance, created, update_fields=None, **kwargs):
+    transition = _status_transition(instance, created, update_fields)
+    if transition is None:
+        return
+    previous, status = transition
+    instance._audited_status = status
+    record_payment_transition(instance, previous, status, 'created' if created else 'status_change')
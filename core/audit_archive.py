@@ -0,0 +1,128 @@
+# core/audit_archive.py
+"""
+Monthly archival of AuditLog.
+
+The live table keeps the current month and the RETENTION_MONTHS before it.
+Older whole months are rolled into gzipped JSON lines files, partitioned
+by month:
+
+    <root>/year=YYYY/month=MM/audit-YYYY-MM-<run>.jsonl.gz
+
+Rows are read in keyset-paginated chunks of ARCHIVE_CHUNK_SIZE ids, so
+memory stays constant whatever the month's volume. A month's file is
+written under a temporary name and renamed once complete; only then are
+the archived rows deleted, chunk by chunk (id range by id range), so a
+failed run loses nothing and is simply run again. Rows arriving late for
+an archived month go to a new file of that month on the next run.
+"""
+import gzip
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from django.utils import timezone
+
+from .audit import audit_config
+from .models import AuditLog
+from .streaming import write_rows
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['id', 'created_at', 'user_id', 'user__username', 'action', 'model_name',
+           'object_id', 'details', 'ip_address', 'user_agent']
+
+
+def _month_start(year, month):
+    return timezone.make_aware(datetime(year, month, 1))
+
+
+def _add_months(year, month, months):
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+def retention_cutoff(retention_months=None, now=None):
+    """Start of the oldest month kept in the live table"""
+    if retention_months is None:
+        retention_months = audit_config()['RETENTION_MONTHS']
+    now = timezone.localtime(now or timezone.now())
+    return _month_start(*_add_months(now.year, now.month, -retention_months))
+
+
+def archivable_months(cutoff):
+    """(year, month) of every month with rows older than the cutoff, oldest first"""
+    months = AuditLog.objects.filter(created_at__lt=cutoff).dates('created_at', 'month')
+    return [(month.year, month.month) for month in months]
+
+
+def archive_month(year, month, root=None, chunk_size=None, run_id=None):
+    """
+    Archive one month's rows to a file and delete them from the table.
+    Returns (rows, path), path None when the month had no rows.
+    """
+    config = audit_config()
+    root = Path(root or config['ARCHIVE_ROOT'])
+    chunk_size = chunk_size or config['ARCHIVE_CHUNK_SIZE']
+    run_id = run_id or timezone.now().strftime('%Y%m%dT%H%M%S')
+
+    start = _month_start(year, month)
+    end = _month_start(*_add_months(year, month, 1))
+    month_rows = AuditLog.objects.filter(created_at__gte=start, created_at__lt=end)
+    queryset = month_rows.order_by('id').values(*COLUMNS)
+
+    chunks = []  # (first id, last id) of every chunk written
+
+    def rows():
+        last_id = 0
+        while True:
+            # Keyset pagination: no OFFSET scans, one chunk in memory
+            chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                return
+            chunks.append((chunk[0]['id'], chunk[-1]['id']))
+            last_id = chunk[-1]['id']
+            yield from chunk
+
+    directory = root / f"year={year:04d}" / f"month={month:02d}"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"audit-{year:04d}-{month:02d}-{run_id}.jsonl.gz"
+    temporary = path.with_name(path.name + '.tmp')
+    try:
+        with gzip.open(temporary, 'wt', encoding='utf-8') as f:
+            count = write_rows(f, rows(), COLUMNS, 'jsonl')
+    except Exception:
+        temporary.unlink(missing_ok=True)
+        raise
+    if not count:
+        temporary.unlink()
+        return 0, None
+    temporary.rename(path)
+
+    deleted = 0
+    for first_id, last_id in chunks:
+        deleted += month_rows.filter(id__gte=first_id, id__lte=last_id).delete()[0]
+    if deleted != count:
+        logger.warning(f"Audit archive {path}: {count} row(s) written, {deleted} deleted")
+    return count, path
+
+
+def archive_audit_logs(root=None, retention_months=None, chunk_size=None, dry_run=False):
+    """
+    Archive every whole month older than the retention. Returns
+    [(YYYY-MM, rows, path)]; with dry_run, the rows that would be archived.
+    """
+    cutoff = retention_cutoff(retention_months)
+    run_id = timezone.now().strftime('%Y%m%dT%H%M%S')
+    results = []
+    for year, month in archivable_months(cutoff):
+        label = f"{year:04d}-{month:02d}"
+        if dry_run:
+            start = _month_start(year, month)
+            end = _month_start(*_add_months(year, month, 1))
+            count = AuditLog.objects.filter(created_at__gte=start, created_at__lt=end).count()
+            results.append((label, count, None))
+            continue
+        count, path = archive_month(year, month, root=root, chunk_size=chunk_size, run_id=run_id)
+        logger.info(f"Archived {count} audit log(s) of {label} to {path}")
+        results.append((label, count, path))
+    return results
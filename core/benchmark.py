@@ -0,0 +1,405 @@
+"""
+Offline benchmark suite: synthetic restaurant-scale data plus timed
+requests against the hot endpoints through Django's test client.
+
+Used by `manage.py bench`, which runs everything inside a throw-away test
+database so results are reproducible (seeded data, no server needed).
+"""
+import random
+import subprocess
+import time
+import uuid
+from datetime import datetime, time as dt_time, timedelta
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from core.profiling import QueryRecorder
+from inventory.models import StockItem, StockTransaction
+from menu.models import Category, MenuItem
+from payments.models import Payment
+from restaurants.models import Branch, Restaurant
+from tables.models import Cart, CartItem, Order, OrderItem, Table
+from tables.qr import refresh_tokens
+from waste_tracker.models import WasteCategory, WasteReason, WasteRecord
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+BENCH_PASSWORD = 'bench-password'
+
+ACTIVE_STATUSES = ['pending', 'confirmed', 'preparing', 'ready', 'served']
+PAYMENT_METHODS = ['cash', 'cash', 'cash', 'cbe', 'telebirr']
+
+
+# ============ DATA GENERATOR ============
+
+class DataGenerator:
+    """Build a seeded, realistic data volume with bulk inserts
+
+    Every restaurant gets a menu, stock items and waste reasons; every
+    branch gets tables, staff, `days` of paid orders (busier on weekends)
+    with payments and waste records, plus today's open orders.
+    """
+
+    def __init__(self, restaurants=1, branches=2, tables=20, menu_items=40,
+                 days=90, orders_per_day=60, waste_per_day=4, seed=42):
+        self.restaurants = restaurants
+        self.branches = branches
+        self.tables = tables
+        self.menu_items = menu_items
+        self.days = days
+        self.orders_per_day = orders_per_day
+        self.waste_per_day = waste_per_day
+        self.random = random.Random(seed)
+        self.password = make_password(BENCH_PASSWORD)
+        self.users = {}
+        self.order_sequence = {}
+
+    def config(self):
+        return {
+            'restaurants': self.restaurants,
+            'branches': self.branches,
+            'tables': self.tables,
+            'menu_items': self.menu_items,
+            'days': self.days,
+            'orders_per_day': self.orders_per_day,
+            'waste_per_day': self.waste_per_day,
+        }
+
+    def generate(self):
+        """Create the whole dataset; returns row counts per model"""
+        admin = self._user('bench_admin', 'admin')
+        self.users['admin'] = admin
+
+        for r in range(self.restaurants):
+            restaurant = Restaurant.objects.create(
+                name=f'Bench Restaurant {r + 1}',
+                address='Bole Road, Addis Ababa')
+            menu = self._create_menu(restaurant)
+            stock_items = self._create_stock_items(restaurant)
+            reasons = self._create_waste_reasons(restaurant)
+            self.users.setdefault('manager', self._user(
+                f'bench_manager_{r + 1}', 'manager', restaurant))
+
+            for b in range(self.branches):
+                branch = Branch.objects.create(
+                    restaurant=restaurant, name=f'Branch {b + 1}',
+                    location=f'Floor {b + 1}')
+                staff = {
+                    role: self._user(f'bench_{role}_{r + 1}_{b + 1}', role,
+                                     restaurant, branch)
+                    for role in ('chef', 'waiter', 'cashier')
+                }
+                for role, user in staff.items():
+                    self.users.setdefault(role, user)
+
+                tables = self._create_tables(branch)
+                self._create_orders(branch, tables, menu, staff)
+                self._create_waste(restaurant, branch, stock_items, reasons,
+                                   staff['chef'])
+
+        return self.counts()
+
+    @staticmethod
+    def counts():
+        return {
+            model.__name__: model.objects.count()
+            for model in (Restaurant, Branch, Table, MenuItem, Order,
+                          OrderItem, Payment, WasteRecord)
+        }
+
+    def _user(self, username, role, restaurant=None, branch=None):
+        return User.objects.create(
+            username=username, email=f'{username}@bench.local',
+            password=self.password, role=role,
+            restaurant=restaurant, branch=branch)
+
+    def _create_menu(self, restaurant):
+        categories = [
+            Category.objects.create(restaurant=restaurant, name=name, order_index=i)
+            for i, name in enumerate(['Appetizers', 'Main Courses', 'Desserts', 'Drinks'])
+        ]
+
+        items = []
+        for i in range(self.menu_items):
+            price = Decimal(self.random.randrange(80, 900))
+            cost = (price * Decimal(self.random.uniform(0.25, 0.7))).quantize(Decimal('0.01'))
+            items.append(MenuItem(
+                category=categories[i % len(categories)],
+                name=f'Dish {i + 1}',
+                price=price,
+                cost_price=cost,
+                profit_margin=((price - cost) / price * 100).quantize(Decimal('0.01')),
+                preparation_time=self.random.randrange(5, 40)))
+        return MenuItem.objects.bulk_create(items)
+
+    def _create_stock_items(self, restaurant):
+        return StockItem.objects.bulk_create([
+            StockItem(restaurant=restaurant, name=f'Ingredient {i + 1}',
+                      unit=self.random.choice(['kg', 'l', 'unit']),
+                      current_quantity=Decimal('500'),
+                      cost_per_unit=Decimal(self.random.randrange(20, 400)))
+            for i in range(20)
+        ])
+
+    def _create_waste_reasons(self, restaurant):
+        reasons = []
+        for category_type in ('spoilage', 'preparation', 'overproduction'):
+            category = WasteCategory.objects.create(
+                restaurant=restaurant, name=category_type.title(),
+                category_type=category_type)
+            reasons += [
+                WasteReason.objects.create(category=category, name=f'{category.name} {i + 1}')
+                for i in range(2)
+            ]
+        return reasons
+
+    def _create_tables(self, branch):
+        # bulk_create skips Table.save(), so no QR images are rendered
+        tables = Table.objects.bulk_create([
+            Table(branch=branch, table_number=f'{i + 1:02d}',
+                  capacity=self.random.choice([2, 4, 4, 6]))
+            for i in range(self.tables)
+        ])
+        refresh_tokens(tables)
+        return tables
+
+    def _next_order_number(self, day):
+        # Same format as Order.generate_order_number(), shared across branches
+        sequence = self.order_sequence.get(day, 0) + 1
+        self.order_sequence[day] = sequence
+        return f'{day:%y%m%d}{sequence:04d}'
+
+    def _create_orders(self, branch, tables, menu, staff):
+        today = timezone.localdate()
+        orders = []
+        order_items = []
+        placed_times = []
+
+        for offset in range(self.days, -1, -1):
+            day = today - timedelta(days=offset)
+            is_today = offset == 0
+            volume = self.orders_per_day * (1.4 if day.weekday() >= 5 else 1.0)
+            count = max(1, int(self.random.gauss(volume, volume * 0.15)))
+            if is_today:
+                count = max(1, count // 3)
+
+            for _ in range(count):
+                placed_at = timezone.make_aware(datetime.combine(
+                    day, dt_time(self.random.randrange(10, 22), self.random.randrange(60))))
+                if is_today:
+                    status = self.random.choice(ACTIVE_STATUSES)
+                else:
+                    status = 'completed'
+
+                lines = [
+                    (self.random.choice(menu), self.random.choice([1, 1, 1, 2, 3]))
+                    for _ in range(self.random.randrange(1, 5))
+                ]
+                subtotal = sum(item.price * quantity for item, quantity in lines)
+                tax = (subtotal * Decimal('0.15')).quantize(Decimal('0.01'))
+                service = (subtotal * Decimal('0.05')).quantize(Decimal('0.01'))
+
+                order = Order(
+                    order_number=self._next_order_number(day),
+                    table=self.random.choice(tables),
+                    waiter=staff['waiter'],
+                    order_type=self.random.choice(['qr', 'waiter']),
+                    status=status,
+                    subtotal=subtotal,
+                    tax_amount=tax,
+                    service_charge=service,
+                    total_amount=subtotal + tax + service,
+                    confirmed_at=placed_at + timedelta(minutes=2),
+                    completed_at=None if is_today else placed_at + timedelta(minutes=50),
+                    is_paid=not is_today,
+                    inventory_deducted=not is_today)
+                orders.append(order)
+                placed_times.append(placed_at)
+                order_items.append(lines)
+
+        Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+
+        # placed_at is auto_now_add; backdate it in a second pass
+        for order, placed_at in zip(orders, placed_times):
+            order.placed_at = placed_at
+        Order.objects.bulk_update(orders, ['placed_at'], batch_size=BATCH_SIZE)
+
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menu_item=item, quantity=quantity,
+                      unit_price=item.price, unit_cost=item.cost_price)
+            for order, lines in zip(orders, order_items)
+            for item, quantity in lines
+        ], batch_size=BATCH_SIZE)
+
+        Payment.objects.bulk_create([
+            Payment(order=order, payment_method=self.random.choice(PAYMENT_METHODS),
+                    amount=order.total_amount, status='completed',
+                    processed_by=staff['cashier'], processed_at=order.completed_at)
+            for order in orders if order.is_paid
+        ], batch_size=BATCH_SIZE)
+
+    def _create_waste(self, restaurant, branch, stock_items, reasons, chef):
+        today = timezone.localdate()
+        transactions = []
+        records = []
+
+        for offset in range(self.days, -1, -1):
+            day = today - timedelta(days=offset)
+            for _ in range(self.random.randrange(self.waste_per_day + 1)):
+                stock_item = self.random.choice(stock_items)
+                quantity = Decimal(self.random.randrange(1, 50)) / 10
+                transactions.append(StockTransaction(
+                    stock_item=stock_item, transaction_type='waste',
+                    quantity=quantity, unit_cost=stock_item.cost_per_unit,
+                    total_cost=(quantity * stock_item.cost_per_unit).quantize(Decimal('0.01')),
+                    user=chef, restaurant=restaurant, branch=branch,
+                    transaction_date=day))
+                recorded_at = timezone.make_aware(datetime.combine(
+                    day, dt_time(self.random.randrange(8, 23))))
+                records.append(WasteRecord(
+                    waste_reason=self.random.choice(reasons), recorded_by=chef,
+                    branch=branch, status=self.random.choice(['approved'] * 4 + ['pending']),
+                    station='kitchen', recorded_at=recorded_at,
+                    waste_occurred_at=recorded_at))
+
+        StockTransaction.objects.bulk_create(transactions, batch_size=BATCH_SIZE)
+        for record, transaction in zip(records, transactions):
+            record.stock_transaction = transaction
+        WasteRecord.objects.bulk_create(records, batch_size=BATCH_SIZE)
+
+
+# ============ SCENARIOS ============
+
+def _prepare_qr_cart(suite):
+    """Fill a fresh guest cart so every submit creates a real order"""
+    branch = suite.users['waiter'].branch
+    table = Table.objects.filter(branch=branch).order_by('?').first()
+    session_id = uuid.uuid4().hex
+    cart = Cart.objects.create(session_id=session_id, table=table)
+    menu = list(MenuItem.objects.filter(
+        category__restaurant=branch.restaurant).values_list('id', flat=True)[:20])
+    CartItem.objects.bulk_create([
+        CartItem(cart=cart, menu_item_id=menu_item_id, quantity=suite.random.randrange(1, 3))
+        for menu_item_id in suite.random.sample(menu, 3)
+    ])
+    return {'session_id': session_id, 'table_id': table.id, 'customer_name': 'Bench Guest'}
+
+
+# name -> (role, method, path, prepare(suite) -> request data or None)
+SCENARIOS = {
+    'qr_submit': (None, 'post', '/api/tables/submit-qr-order/', _prepare_qr_cart),
+    'kitchen_orders': ('chef', 'get', '/api/tables/orders/kitchen_orders/', None),
+    'cashier_dashboard': ('cashier', 'get', '/api/payments/cashier/dashboard-data/', None),
+    'profit_dashboard': ('manager', 'get', '/profit-intelligence/api/dashboard/', None),
+    'profit_snapshot': ('manager', 'get', '/profit-intelligence/api/snapshot/', None),
+    'waste_dashboard': ('manager', 'get', '/waste/api/dashboard/', None),
+    'waste_analytics': ('manager', 'get', '/waste/api/detailed-analytics/?days=30', None),
+}
+
+
+# ============ SUITE ============
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+class BenchmarkSuite:
+    """Time each scenario through the test client
+
+    warmup requests are discarded; with cold=True the cache is cleared
+    before every measured request (worst case), otherwise caches stay warm.
+    """
+
+    def __init__(self, users, iterations=30, warmup=3, cold=False, seed=42):
+        self.users = users
+        self.iterations = iterations
+        self.warmup = warmup
+        self.cold = cold
+        self.random = random.Random(seed)
+
+    def client_for(self, role):
+        client = Client()
+        if role:
+            client.force_login(self.users[role])
+        return client
+
+    def run(self, names=None, progress=None):
+        results = {}
+        for name in names or SCENARIOS:
+            results[name] = self.run_scenario(name)
+            if progress:
+                progress(name, results[name])
+        return results
+
+    def run_scenario(self, name):
+        role, method, path, prepare = SCENARIOS[name]
+        client = self.client_for(role)
+
+        latencies = []
+        queries = []
+        statuses = {}
+
+        for i in range(self.warmup + self.iterations):
+            data = prepare(self) if prepare else None
+            if self.cold:
+                cache.clear()
+
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                started = time.perf_counter()
+                if method == 'post':
+                    response = client.post(path, data, content_type='application/json')
+                else:
+                    response = client.get(path)
+                elapsed = (time.perf_counter() - started) * 1000
+
+            if i < self.warmup:
+                continue
+            latencies.append(elapsed)
+            queries.append(recorder.count)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        latencies.sort()
+        queries.sort()
+        return {
+            'path': path,
+            'iterations': self.iterations,
+            'p50_ms': round(_percentile(latencies, 50), 2),
+            'p95_ms': round(_percentile(latencies, 95), 2),
+            'p99_ms': round(_percentile(latencies, 99), 2),
+            'mean_ms': round(sum(latencies) / len(latencies), 2),
+            'max_ms': round(latencies[-1], 2),
+            'queries_p50': _percentile(queries, 50),
+            'queries_max': queries[-1],
+            'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info():
+    return {
+        'commit': git_revision(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'timestamp': timezone.now().isoformat(),
+    }
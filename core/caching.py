@@ -0,0 +1,195 @@
+"""
+Tag-based cache invalidation and the cached_view decorator.
+
+Every tag ("branch:5:orders", "restaurant:2:menu") has a version stored in
+the shared cache. Keys of tagged entries embed the current versions of
+their tags, so invalidating a tag just gives it a new version: every entry
+built on the old one stops being found, in every worker process.
+"""
+import functools
+import hashlib
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+TAG_VERSION_TIMEOUT = 60 * 60 * 24
+
+
+# ============ TAGS ============
+
+def branch_tag(branch_id, topic):
+    return f'branch:{branch_id}:{topic}'
+
+
+def restaurant_tag(restaurant_id, topic):
+    return f'restaurant:{restaurant_id}:{topic}'
+
+
+def global_tag(topic):
+    return f'all:{topic}'
+
+
+def scope_tags(user, *topics):
+    """Tags matching the data scope a user's dashboards read"""
+    tags = []
+    for topic in topics:
+        if user.role == 'admin':
+            tags.append(global_tag(topic))
+        elif user.role == 'manager' and user.restaurant_id:
+            tags.append(restaurant_tag(user.restaurant_id, topic))
+        elif user.branch_id:
+            tags.append(branch_tag(user.branch_id, topic))
+        else:
+            tags.append(global_tag(topic))
+    return tags
+
+
+def tags_for_write(topic, branch_id=None, restaurant_id=None):
+    """Every tag a write in this branch/restaurant makes stale"""
+    tags = [global_tag(topic)]
+    if branch_id:
+        tags.append(branch_tag(branch_id, topic))
+    if restaurant_id:
+        tags.append(restaurant_tag(restaurant_id, topic))
+    return tags
+
+
+def _tag_key(tag):
+    return f'tag:{tag}'
+
+
+def get_tag_versions(tags):
+    """Current version of each tag, creating missing ones"""
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if key not in versions:
+            version = uuid.uuid4().hex[:12]
+            # add() so concurrent workers agree on one initial version
+            if not cache.add(key, version, TAG_VERSION_TIMEOUT):
+                version = cache.get(key, version)
+            versions[key] = version
+
+    return [versions[key] for key in keys]
+
+
+def _bump_tags(tags):
+    cache.set_many(
+        {_tag_key(tag): uuid.uuid4().hex[:12] for tag in tags},
+        TAG_VERSION_TIMEOUT)
+
+
+class _PendingInvalidation:
+    """Tags invalidated inside one transaction, bumped once on commit"""
+
+    def __init__(self):
+        self.tags = set()
+
+    def __call__(self):
+        _bump_tags(self.tags)
+
+
+def invalidate_tags(*tags):
+    """
+    Make every entry cached under any of these tags stale. Inside a
+    transaction the tags are collected and bumped once, on commit: a write
+    path saving many rows costs one cache write, and readers never cache
+    data the transaction has not committed yet.
+    """
+    if not tags:
+        return
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _bump_tags(tags)
+        return
+
+    pending = getattr(connection, '_pending_tag_invalidation', None)
+    # A rolled back transaction (or savepoint) drops its on_commit callbacks
+    if pending is None or not any(entry[1] is pending for entry in connection.run_on_commit):
+        pending = connection._pending_tag_invalidation = _PendingInvalidation()
+        transaction.on_commit(pending)
+    pending.tags.update(tags)
+
+
+def make_tagged_key(base_key, tags):
+    versions = ':'.join(get_tag_versions(sorted(tags)))
+    digest = hashlib.sha1(versions.encode('utf-8')).hexdigest()[:16]
+    return f'{base_key}:{digest}'
+
+
+def get_or_set_tagged(base_key, tags, compute, timeout=60):
+    """Return the cached value for base_key/tags, computing it on a miss"""
+    key = make_tagged_key(base_key, tags)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+# ============ COUNTERS ============
+
+def incr_counter(key, timeout=60, delta=1):
+    """Atomic counter shared by all workers (window starts at first hit)"""
+    if cache.add(key, delta, timeout):
+        return delta
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, delta, timeout)
+        return delta
+
+
+# ============ VIEWS ============
+
+def cached_view(timeout=30, topics=(), tags=None, vary_on_user=False):
+    """
+    Cache successful GET responses of an API view.
+
+    topics: data topics ("orders", "payments"...) resolved to the caller's
+        scope with scope_tags(); tags: or a callable(request) returning
+        explicit tags. The key varies on the full path and on the user's
+        role/branch/restaurant (or the user id with vary_on_user).
+
+    Works on function views (request first) and on APIView / ViewSet
+    methods (self, request). Put it below @api_view/@permission_classes
+    so auth and permission checks still run on every hit.
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(*args, **kwargs):
+            request = args[0] if isinstance(args[0], (HttpRequest, Request)) else args[1]
+            if request.method != 'GET':
+                return view_func(*args, **kwargs)
+
+            user = request.user
+            if vary_on_user:
+                scope = f'user:{user.pk}'
+            else:
+                scope = f'{user.role}:{user.branch_id}:{user.restaurant_id}'
+
+            entry_tags = tags(request) if callable(tags) else list(tags or [])
+            entry_tags += scope_tags(user, *topics)
+
+            path_hash = hashlib.sha1(
+                request.get_full_path().encode('utf-8')).hexdigest()[:16]
+            base_key = f'view:{view_func.__module__}.{view_func.__qualname__}:{scope}:{path_hash}'
+            key = make_tagged_key(base_key, entry_tags)
+
+            cached = cache.get(key)
+            if cached is not None:
+                return Response(cached)
+
+            response = view_func(*args, **kwargs)
+            if response.status_code == 200 and hasattr(response, 'data'):
+                cache.set(key, response.data, timeout)
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,281 @@
+# core/jobs.py
+"""
+Database-backed background jobs.
+
+Heavy work (report generation, profit backfills, price optimization runs)
+is queued as a Job row and executed by the run_jobs worker, off the
+request path:
+
+    @job_handler('inventory.report')
+    def build_report(job, report_type, ...): ... return {...}
+
+    job, created = enqueue('inventory.report', {...}, user=request.user)
+
+Handlers live in the apps' jobs.py modules (imported when core is ready)
+and take the Job plus its params as keyword arguments; their return value
+is stored as the job result. Jobs with the same name and params dedupe
+while one is queued or running. Workers claim the highest priority, oldest
+ready jobs; a failed job is retried with exponential backoff until
+max_attempts. A worker refreshes the lease (locked_at) of the jobs it is
+running every HEARTBEAT_SECONDS, so only a job whose worker died - no
+heartbeat for LEASE_SECONDS - is released, and a job's outcome is only
+recorded by the worker still holding it.
+"""
+import hashlib
+import json
+import logging
+import os
+import socket
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait)
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+LIVE_STATUSES = ('queued', 'running')
+
+
+def job_config():
+    config = {
+        'WORKERS': 4,  # jobs run at once per worker process
+        'POLL_INTERVAL': 2,  # seconds between polls of an idle queue
+        'LEASE_SECONDS': 60 * 5,  # running jobs without a heartbeat this long are released
+        'HEARTBEAT_SECONDS': 60,  # how often a worker refreshes its jobs' lease
+        'MAX_ATTEMPTS': 3,
+        'RETRY_DELAY': 30,  # seconds, doubled on every attempt
+    }
+    config.update(getattr(settings, 'JOB_QUEUE', {}))
+    return config
+
+
+# ============ REGISTRY ============
+
+JOB_HANDLERS = {}
+
+
+def job_handler(name):
+    """Register a function as the handler of a job name"""
+    def register(func):
+        JOB_HANDLERS[name] = func
+        return func
+    return register
+
+
+def dedup_key(name, params):
+    canonical = json.dumps(params or {}, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(f"{name}|{canonical}".encode('utf-8')).hexdigest()
+
+
+# ============ ENQUEUE ============
+
+def enqueue(name, params=None, priority=Job.PRIORITY_NORMAL, user=None,
+            restaurant_id=None, branch_id=None, run_after=None, max_attempts=None):
+    """
+    Queue a job, or return the live (queued/running) job with the same
+    name and params. Returns (job, created).
+    """
+    if name not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job: {name}")
+
+    params = json.loads(json.dumps(params or {}, cls=DjangoJSONEncoder))
+    key = dedup_key(name, params)
+    existing = Job.objects.filter(dedup_key=key, status__in=LIVE_STATUSES).first()
+    if existing:
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            job = Job.objects.create(
+                name=name, params=params, dedup_key=key, priority=priority,
+                created_by=user, restaurant_id=restaurant_id, branch_id=branch_id,
+                run_after=run_after or timezone.now(),
+                max_attempts=max_attempts or job_config()['MAX_ATTEMPTS'],
+            )
+    except IntegrityError:
+        # Lost a race with an identical enqueue
+        return Job.objects.get(dedup_key=key, status__in=LIVE_STATUSES), False
+
+    logger.info(f"Queued job {job.name} {job.job_id} (priority {priority})")
+    return job, True
+
+
+def cancel(job):
+    """Cancel a job that has not started; returns True if it was queued"""
+    return Job.objects.filter(pk=job.pk, status='queued').update(
+        status='cancelled', finished_at=timezone.now()) > 0
+
+
+# ============ EXECUTION ============
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def release_stale_jobs(lease_seconds=None):
+    """Requeue running jobs whose worker has not heartbeated within the lease"""
+    lease_seconds = lease_seconds or job_config()['LEASE_SECONDS']
+    released = Job.objects.filter(
+        status='running', locked_at__lt=timezone.now() - timedelta(seconds=lease_seconds)
+    ).update(status='queued', locked_by='', locked_at=None)
+    if released:
+        logger.warning(f"Released {released} stale job(s)")
+    return released
+
+
+def claim_jobs(limit, worker=None):
+    """Claim up to `limit` ready jobs, highest priority then oldest first"""
+    if limit <= 0:
+        return []
+    worker = worker or worker_name()
+    now = timezone.now()
+
+    with transaction.atomic():
+        candidates = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', run_after__lte=now)
+            .order_by('-priority', 'created_at')
+            .values_list('id', flat=True)[:limit])
+        claimed = []
+        for job_id in candidates:
+            # The status guard keeps claims exclusive where row locks are not supported
+            if Job.objects.filter(id=job_id, status='queued').update(
+                    status='running', locked_by=worker, locked_at=now,
+                    started_at=now):
+                claimed.append(job_id)
+    return claimed
+
+
+def heartbeat(job_ids, worker=None):
+    """Refresh the lease of running jobs held by the worker"""
+    if not job_ids:
+        return 0
+    return Job.objects.filter(
+        id__in=job_ids, status='running', locked_by=worker or worker_name()
+    ).update(locked_at=timezone.now())
+
+
+def run_job(job_id, worker=None):
+    """
+    Run a claimed job and record its result; returns the final status, or
+    'released' if the job was released from the worker meanwhile (its
+    outcome then belongs to whoever holds it now).
+    """
+    close_old_connections()
+    try:
+        job = Job.objects.get(id=job_id)
+        worker = worker or job.locked_by
+        held = Job.objects.filter(id=job_id, status='running', locked_by=worker)
+        handler = JOB_HANDLERS.get(job.name)
+        attempts = job.attempts + 1
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for {job.name}")
+            result = handler(job, **job.params)
+        except Exception as e:
+            logger.error(f"Job {job.name} {job.job_id} failed (attempt {attempts}): {e}",
+                         exc_info=True)
+            if attempts < job.max_attempts and handler is not None:
+                delay = job_config()['RETRY_DELAY'] * 2 ** (attempts - 1)
+                outcome = 'queued'
+                updated = held.update(
+                    status='queued', attempts=attempts, error=str(e),
+                    run_after=timezone.now() + timedelta(seconds=delay),
+                    locked_by='', locked_at=None)
+            else:
+                outcome = 'failed'
+                updated = held.update(
+                    status='failed', attempts=attempts, error=str(e),
+                    finished_at=timezone.now(), locked_by='', locked_at=None)
+        else:
+            outcome = 'succeeded'
+            result = json.loads(json.dumps(result, cls=DjangoJSONEncoder))
+            updated = held.update(
+                status='succeeded', attempts=attempts, result=result, error='',
+                finished_at=timezone.now(), locked_by='', locked_at=None)
+
+        if not updated:
+            logger.warning(f"Job {job.name} {job.job_id} was released from {worker}; "
+                           f"its {outcome} outcome is discarded")
+            return 'released'
+        return outcome
+    finally:
+        close_old_connections()
+
+
+def _close_connections():
+    # Forked pool processes must not share the parent's DB connections
+    connections.close_all()
+
+
+class Worker:
+    """
+    Polls the queue and runs jobs on a thread pool (or a process pool for
+    CPU-bound handlers), keeping at most `workers` jobs in flight.
+    """
+
+    def __init__(self, workers=None, processes=False, poll_interval=None):
+        config = job_config()
+        self.workers = workers or config['WORKERS']
+        self.poll_interval = poll_interval or config['POLL_INTERVAL']
+        self.processes = processes
+        self.heartbeat_seconds = config['HEARTBEAT_SECONDS']
+        self.name = worker_name()
+
+    def _executor(self):
+        if self.processes:
+            connections.close_all()
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=_close_connections)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+
+    def run(self, burst=False, max_jobs=None):
+        """
+        Run jobs until stopped - or, with burst, until no job is ready -
+        or until max_jobs have run. Returns the number of jobs run.
+        """
+        done = 0
+        in_flight = {}  # future: job id
+        last_heartbeat = time.monotonic()
+        with self._executor() as executor:
+            while True:
+                finished = [future for future in in_flight if future.done()]
+                for future in finished:
+                    self._collect(future, in_flight.pop(future))
+                done += len(finished)
+                if max_jobs is not None and done >= max_jobs:
+                    break
+
+                if time.monotonic() - last_heartbeat >= self.heartbeat_seconds:
+                    heartbeat(list(in_flight.values()), self.name)
+                    last_heartbeat = time.monotonic()
+
+                release_stale_jobs()
+                free = self.workers - len(in_flight)
+                if max_jobs is not None:
+                    free = min(free, max_jobs - done - len(in_flight))
+                for job_id in claim_jobs(free, self.name):
+                    in_flight[executor.submit(run_job, job_id, self.name)] = job_id
+
+                if in_flight:
+                    wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                elif burst:
+                    break
+                else:
+                    time.sleep(self.poll_interval)
+        return done
+
+    def _collect(self, future, job_id):
+        try:
+            outcome = future.result()
+        except Exception as e:
+            # run_job records handler errors itself; this is the bookkeeping failing
+            logger.error(f"Job {job_id} crashed in worker {self.name}: {e}", exc_info=e)
+            return
+        logger.info(f"Job {job_id} {outcome}")
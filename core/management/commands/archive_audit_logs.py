@@ -0,0 +1,36 @@
+# core/management/commands/archive_audit_logs.py
+from django.core.management.base import BaseCommand
+
+from core.audit import audit_config, flush
+from core.audit_archive import archive_audit_logs
+
+
+class Command(BaseCommand):
+    help = ('Roll whole months of audit logs older than the retention into '
+            'compressed monthly files and delete them from the live table')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int,
+                            help='Whole months kept in the table besides the current one')
+        parser.add_argument('--output-dir', help='Archive root directory')
+        parser.add_argument('--chunk-size', type=int,
+                            help='Rows read and deleted at a time')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the rows that would be archived')
+
+    def handle(self, *args, **options):
+        flush()
+        results = archive_audit_logs(
+            root=options['output_dir'], retention_months=options['months'],
+            chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+
+        if not results:
+            self.stdout.write('No audit logs past the retention')
+            return
+        for month, rows, path in results:
+            self.stdout.write(f"{month}: {rows} row(s)" + (f" -> {path}" if path else ''))
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing archived'))
+        else:
+            root = options['output_dir'] or audit_config()['ARCHIVE_ROOT']
+            self.stdout.write(self.style.SUCCESS(f"Audit logs archived to {root}"))
@@ -0,0 +1,133 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment)
+
+from core.benchmark import SCENARIOS, BenchmarkSuite, DataGenerator, environment_info
+
+BENCH_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = ('Benchmark hot endpoints on generated data in a throw-away test '
+            'database; writes p50/p95/p99 latency and query counts as JSON')
+
+    def add_arguments(self, parser):
+        # Dataset
+        parser.add_argument('--restaurants', type=int, default=1)
+        parser.add_argument('--branches', type=int, default=2,
+                            help='Branches per restaurant')
+        parser.add_argument('--tables', type=int, default=20,
+                            help='Tables per branch')
+        parser.add_argument('--menu-items', type=int, default=40)
+        parser.add_argument('--days', type=int, default=90,
+                            help='Days of order/waste history')
+        parser.add_argument('--orders-per-day', type=int, default=60,
+                            help='Average orders per branch per day')
+        parser.add_argument('--seed', type=int, default=42)
+
+        # Run
+        parser.add_argument('--scenarios',
+                            help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold', action='store_true',
+                            help='Clear the cache before every measured request')
+        parser.add_argument('--output', help='Write the JSON results to this file')
+        parser.add_argument('--compare',
+                            help='Previous results file to compare p50/p95/queries against')
+
+    def handle(self, *args, **options):
+        names = list(SCENARIOS)
+        if options['scenarios']:
+            names = [name.strip() for name in options['scenarios'].split(',')]
+            unknown = [name for name in names if name not in SCENARIOS]
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(unknown)}")
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        generator = DataGenerator(
+            restaurants=options['restaurants'],
+            branches=options['branches'],
+            tables=options['tables'],
+            menu_items=options['menu_items'],
+            days=options['days'],
+            orders_per_day=options['orders_per_day'],
+            seed=options['seed'])
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=BENCH_CACHES):
+                results = self.run_bench(generator, names, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if baseline:
+            self.print_comparison(baseline, results)
+
+        output = json.dumps(results, indent=2, default=str)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+    def run_bench(self, generator, names, options):
+        self.stdout.write('Generating data...')
+        counts = generator.generate()
+        self.stdout.write(', '.join(f'{model}: {count}' for model, count in counts.items()))
+
+        suite = BenchmarkSuite(
+            generator.users, iterations=options['iterations'],
+            warmup=options['warmup'], cold=options['cold'], seed=options['seed'])
+
+        def progress(name, result):
+            self.stdout.write(
+                f"{name:<20} p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+                f"p99 {result['p99_ms']:>8.2f}ms  queries {result['queries_p50']:>4}  "
+                f"status {result['status_codes']}")
+
+        return {
+            'environment': environment_info(),
+            'dataset': {'config': generator.config(), 'seed': options['seed'], 'rows': counts},
+            'run': {
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'cold_cache': options['cold'],
+            },
+            'scenarios': suite.run(names, progress),
+        }
+
+    def print_comparison(self, baseline, results):
+        previous = baseline.get('scenarios', {})
+        self.stdout.write(
+            f"\nCompared with {baseline.get('environment', {}).get('commit') or 'baseline'}:")
+
+        for name, result in results['scenarios'].items():
+            if name not in previous:
+                continue
+            parts = []
+            for metric in ('p50_ms', 'p95_ms', 'queries_p50'):
+                before = previous[name].get(metric) or 0
+                after = result[metric]
+                change = f'{(after - before) / before * 100:+.1f}%' if before else 'n/a'
+                parts.append(f'{metric} {before} -> {after} ({change})')
+            self.stdout.write(f"{name:<20} " + '  '.join(parts))
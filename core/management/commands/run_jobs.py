@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.jobs import JOB_HANDLERS, Worker, release_stale_jobs
+
+
+class Command(BaseCommand):
+    help = ('Run queued background jobs (reports, profit backfills, price '
+            'optimization) on a thread or process pool')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            help='Jobs run at once (default JOB_QUEUE WORKERS)')
+        parser.add_argument('--processes', action='store_true',
+                            help='Use a process pool instead of threads (CPU-bound jobs)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once no job is ready instead of polling')
+        parser.add_argument('--max-jobs', type=int,
+                            help='Exit after running this many jobs')
+        parser.add_argument('--poll-interval', type=float,
+                            help='Seconds between polls of an idle queue')
+
+    def handle(self, *args, **options):
+        worker = Worker(workers=options['workers'], processes=options['processes'],
+                        poll_interval=options['poll_interval'])
+        released = release_stale_jobs()
+        if released:
+            self.stdout.write(self.style.WARNING(f"Released {released} stale job(s)"))
+
+        self.stdout.write(
+            f"Worker {worker.name}: {worker.workers} {'processes' if worker.processes else 'threads'}, "
+            f"handlers: {', '.join(sorted(JOB_HANDLERS))}")
+        try:
+            done = worker.run(burst=options['burst'], max_jobs=options['max_jobs'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping')
+            return
+        self.stdout.write(self.style.SUCCESS(f"Ran {done} job(s)"))
@@ -1,5 +1,9 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class AuditLog(models.Model):
@@ -26,7 +30,8 @@ class AuditLog(models.Model):
     details = models.JSONField(default=dict)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
     user_agent = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the buffered row is written
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
@@ -53,3 +58,67 @@ class SystemSetting(models.Model):
 
     def __str__(self):
         return self.key
+
+
+class Job(models.Model):
+    """Background job queued for the run_jobs worker (see core.jobs)"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    PRIORITY_LOW = -10
+    PRIORITY_NORMAL = 0
+    PRIORITY_HIGH = 10
+
+    job_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    name = models.CharField(max_length=100)  # registered handler
+    params = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    dedup_key = models.CharField(max_length=64, db_index=True)
+    priority = models.SmallIntegerField(default=PRIORITY_NORMAL)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+
+    # Outcome
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+
+    # Scheduling and leases
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    # Scope
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    restaurant = models.ForeignKey(
+        'restaurants.Restaurant', on_delete=models.CASCADE, null=True, blank=True)
+    branch = models.ForeignKey(
+        'restaurants.Branch', on_delete=models.CASCADE, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_after']),
+            models.Index(fields=['restaurant', 'created_at']),
+        ]
+        constraints = [
+            # One live job per name + parameters
+            models.UniqueConstraint(
+                fields=['dedup_key'], condition=models.Q(status__in=['queued', 'running']),
+                name='unique_live_job'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.status}] {self.job_id}"
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed', 'cancelled')
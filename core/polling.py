@@ -2,6 +2,8 @@ import time
 from django.utils import timezone
 from django.core.cache import cache
 
+from .caching import incr_counter
+
 
 class SmartPoller:
     """Smart adaptive polling system"""
@@ -36,10 +38,9 @@ class SmartPoller:
         self.activity_count += 1
         self.last_activity = timezone.now()
 
-        # Store in cache for cross-request tracking
+        # Store in the shared cache for cross-request/cross-worker tracking
         cache_key = f'polling_activity_{self.role}'
-        current_activity = cache.get(cache_key, 0)
-        cache.set(cache_key, current_activity + 1, timeout=60)
+        incr_counter(cache_key, timeout=self.config['ACTIVITY_WINDOW'])
 
     def adjust_interval(self, has_activity=False, is_peak_hours=False):
         """Adaptively adjust polling interval"""
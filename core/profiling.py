@@ -0,0 +1,240 @@
+"""
+Per-request query and latency profiling.
+
+QueryProfilingMiddleware counts the SQL queries of every request, times
+them, fingerprints them to spot N+1 patterns (the same statement run many
+times), and times response rendering (serialization) and the whole
+request. Samples are aggregated per URL name in an in-process ring buffer
+served by the admin endpoint /api/system/profiling/.
+
+Profiling is on by default only with DEBUG; in production it can be
+enabled for a share of requests with SAMPLE_RATE, the others running
+without the per-query wrapper.
+
+Query budgets are declared per URL name in PROFILING['QUERY_BUDGETS'].
+Over-budget requests are logged, and with ENFORCE_BUDGETS (on under
+`manage.py test`) raise QueryBudgetExceeded so the test fails.
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r'IN \((?:%s|\?)(?:, ?(?:%s|\?))*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def profiling_config():
+    config = {
+        'ENABLED': settings.DEBUG,
+        'SAMPLE_RATE': 1.0,  # share of requests profiled
+        'RING_SIZE': 200,  # samples kept per URL name
+        'QUERY_BUDGETS': {},  # URL name -> max queries per request
+        'ENFORCE_BUDGETS': False,
+        'HEADERS': False,  # add X-Query-Count / Server-Timing headers
+    }
+    config.update(getattr(settings, 'PROFILING', {}))
+    return config
+
+
+def fingerprint(sql):
+    """Normalize SQL so the same statement with other values matches"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    return ' '.join(sql.split())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more queries than its URL name's budget allows"""
+
+
+# ============ RECORDING ============
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts and times queries"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.fingerprints = Counter()
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        if self.render_started is not None:
+            self.render_time = time.perf_counter() - self.render_started
+
+    def duplicates(self, limit=5):
+        return [
+            {'sql': sql[:300], 'count': count}
+            for sql, count in self.fingerprints.most_common(limit)
+            if count > 1
+        ]
+
+
+class ProfileStore:
+    """Recent request samples per URL name (thread-safe ring buffers)"""
+
+    def __init__(self, size):
+        self.size = size
+        self.samples = defaultdict(lambda: deque(maxlen=self.size))
+        self.lock = threading.Lock()
+
+    def record(self, name, sample):
+        with self.lock:
+            self.samples[name].append(sample)
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+    def summary(self, budgets=None):
+        """Aggregate per URL name, slowest p95 first"""
+        budgets = budgets or {}
+        with self.lock:
+            snapshot = {name: list(samples) for name, samples in self.samples.items()}
+
+        rows = [self._summarize(name, samples, budgets.get(name))
+                for name, samples in snapshot.items() if samples]
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    @staticmethod
+    def _summarize(name, samples, budget):
+        count = len(samples)
+        latencies = sorted(sample['total_ms'] for sample in samples)
+        queries = [sample['queries'] for sample in samples]
+
+        def percentile(p):
+            index = min(count - 1, int(round(p / 100 * (count - 1))))
+            return latencies[index]
+
+        duplicates = Counter()
+        for sample in samples:
+            for duplicate in sample['duplicates']:
+                duplicates[duplicate['sql']] = max(
+                    duplicates[duplicate['sql']], duplicate['count'])
+
+        return {
+            'url_name': name,
+            'requests': count,
+            'p50_ms': percentile(50),
+            'p95_ms': percentile(95),
+            'max_ms': latencies[-1],
+            'avg_queries': round(sum(queries) / count, 1),
+            'max_queries': max(queries),
+            'avg_db_ms': round(sum(s['db_ms'] for s in samples) / count, 2),
+            'avg_render_ms': round(sum(s['render_ms'] for s in samples) / count, 2),
+            'query_budget': budget,
+            'over_budget': sum(1 for q in queries if budget is not None and q > budget),
+            'duplicate_queries': [
+                {'sql': sql, 'max_count': max_count}
+                for sql, max_count in duplicates.most_common(5)
+            ],
+            'last_request': samples[-1],
+        }
+
+
+store = ProfileStore(profiling_config()['RING_SIZE'])
+
+
+# ============ MIDDLEWARE ============
+
+class QueryProfilingMiddleware:
+    """Record queries, DB time, render time and latency of every request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = profiling_config()
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        # Unsampled requests skip the per-query wrapper (and its fingerprinting)
+        sample_rate = self.config['SAMPLE_RATE']
+        if sample_rate < 1 and random.random() >= sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        request._query_recorder = recorder
+        started = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        total_time = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+
+        name = match.view_name
+        sample = {
+            'path': request.path,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(recorder.db_time * 1000, 2),
+            'render_ms': round(recorder.render_time * 1000, 2),
+            'total_ms': round(total_time * 1000, 2),
+            'duplicates': recorder.duplicates(),
+            'at': time.time(),
+        }
+        store.record(name, sample)
+
+        if self.config['HEADERS']:
+            response['X-Query-Count'] = str(recorder.count)
+            response['Server-Timing'] = (
+                f"db;dur={sample['db_ms']}, render;dur={sample['render_ms']}, "
+                f"total;dur={sample['total_ms']}")
+
+        self.check_budget(name, sample)
+        return response
+
+    def process_template_response(self, request, response):
+        # Template/DRF responses are rendered right after this hook
+        recorder = getattr(request, '_query_recorder', None)
+        if recorder is not None:
+            recorder.start_render()
+            response.add_post_render_callback(recorder.finish_render)
+        return response
+
+    def check_budget(self, name, sample):
+        budget = self.config['QUERY_BUDGETS'].get(name)
+        if budget is None or sample['queries'] <= budget:
+            return
+
+        message = (
+            f"{name} ran {sample['queries']} queries (budget {budget}) "
+            f"for {sample['method']} {sample['path']}")
+        if sample['duplicates']:
+            top = sample['duplicates'][0]
+            message += f"; repeated {top['count']}x: {top['sql'][:120]}"
+
+        if self.config['ENFORCE_BUDGETS']:
+            raise QueryBudgetExceeded(message)
+        logger.warning(f"Query budget exceeded: {message}")
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import AuditLog, SystemSetting
+from .models import AuditLog, Job, SystemSetting
 
 
 class AuditLogSerializer(serializers.ModelSerializer):
@@ -29,3 +29,25 @@ class HealthCheckSerializer(serializers.Serializer):
     timestamp = serializers.DateTimeField()
     database = serializers.CharField()
     cache = serializers.CharField()
+
+
+class JobSerializer(serializers.ModelSerializer):
+    created_by_username = serializers.CharField(
+        source='created_by.username', read_only=True, default=None)
+
+    class Meta:
+        model = Job
+        fields = [
+            'job_id', 'name', 'params', 'priority', 'status', 'attempts',
+            'max_attempts', 'error', 'run_after', 'created_by_username',
+            'restaurant', 'branch', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+
+class JobEnqueueSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=100)
+    params = serializers.DictField(required=False, default=dict)
+    priority = serializers.ChoiceField(
+        choices=[Job.PRIORITY_LOW, Job.PRIORITY_NORMAL, Job.PRIORITY_HIGH],
+        default=Job.PRIORITY_NORMAL)
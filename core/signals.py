@@ -0,0 +1,115 @@
+# core/signals.py - Cache invalidation for tagged dashboard caches
+# ProfitAggregation rows are recomputed from orders/waste on read, so profit
+# dashboards are tagged with those topics instead of their own.
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from menu.models import Category, MenuItem
+from payments.models import Payment
+from restaurants.models import Branch
+from tables.models import Order, OrderItem, StationTicket, Table
+from waste_tracker.models import WasteRecord, WasteTarget
+
+from .caching import branch_tag, invalidate_tags, tags_for_write
+
+# Table -> branch -> restaurant rarely changes; cache it to keep writes cheap
+SCOPE_CACHE_TIMEOUT = 60 * 60
+
+
+def _branch_restaurant_id(branch_id):
+    if not branch_id:
+        return None
+    return cache.get_or_set(
+        f'scope:branch:{branch_id}',
+        lambda: Branch.objects.filter(id=branch_id).values_list(
+            'restaurant_id', flat=True).first(),
+        SCOPE_CACHE_TIMEOUT)
+
+
+def _table_branch_id(table_id):
+    if not table_id:
+        return None
+    return cache.get_or_set(
+        f'scope:table:{table_id}',
+        lambda: Table.objects.filter(id=table_id).values_list(
+            'branch_id', flat=True).first(),
+        SCOPE_CACHE_TIMEOUT)
+
+
+def _order_branch_id(order_id):
+    return _table_branch_id(
+        Order.objects.filter(id=order_id).values_list('table_id', flat=True).first())
+
+
+def invalidate_branch(branch_id, *topics):
+    restaurant_id = _branch_restaurant_id(branch_id)
+    tags = []
+    for topic in topics:
+        tags += tags_for_write(topic, branch_id, restaurant_id)
+    invalidate_tags(*tags)
+
+
+def invalidate_restaurant(restaurant_id, *topics):
+    """Restaurant-wide write: also stale every branch of the restaurant"""
+    branch_ids = Branch.objects.filter(
+        restaurant_id=restaurant_id).values_list('id', flat=True)
+    tags = []
+    for topic in topics:
+        tags += tags_for_write(topic, restaurant_id=restaurant_id)
+        tags += [branch_tag(branch_id, topic) for branch_id in branch_ids]
+    invalidate_tags(*tags)
+
+
+# ============ RECEIVERS ============
+
+@receiver([post_save, post_delete], sender=Order)
+def invalidate_order_caches(sender, instance, **kwargs):
+    invalidate_branch(_table_branch_id(instance.table_id), 'orders', 'tables')
+
+
+@receiver([post_save, post_delete], sender=OrderItem)
+def invalidate_order_item_caches(sender, instance, **kwargs):
+    invalidate_branch(_order_branch_id(instance.order_id), 'orders')
+
+
+@receiver([post_save, post_delete], sender=Payment)
+def invalidate_payment_caches(sender, instance, **kwargs):
+    invalidate_branch(_order_branch_id(instance.order_id), 'payments', 'orders')
+
+
+@receiver([post_save, post_delete], sender=StationTicket)
+def invalidate_station_ticket_caches(sender, instance, **kwargs):
+    invalidate_branch(instance.branch_id, 'orders')
+
+
+@receiver([post_save, post_delete], sender=Table)
+def invalidate_table_caches(sender, instance, **kwargs):
+    invalidate_branch(instance.branch_id, 'tables')
+
+
+@receiver([post_save, post_delete], sender=MenuItem)
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_menu_caches(sender, instance, **kwargs):
+    restaurant_id = (instance.restaurant_id if sender is Category else
+                     Category.objects.filter(id=instance.category_id).values_list(
+                         'restaurant_id', flat=True).first())
+    invalidate_tags(*tags_for_write('menu', restaurant_id=restaurant_id))
+
+
+# WasteTarget.calculate_current_value() saves these while dashboards are read;
+# they derive from WasteRecords, whose own writes already invalidate
+DERIVED_TARGET_FIELDS = {'current_value', 'last_updated'}
+
+
+@receiver([post_save, post_delete], sender=WasteRecord)
+@receiver([post_save, post_delete], sender=WasteTarget)
+def invalidate_waste_caches(sender, instance, **kwargs):
+    update_fields = kwargs.get('update_fields')
+    if sender is WasteTarget and update_fields and set(update_fields) <= DERIVED_TARGET_FIELDS:
+        return
+
+    if instance.branch_id:
+        invalidate_branch(instance.branch_id, 'waste')
+    else:
+        invalidate_restaurant(instance.restaurant_id, 'waste')
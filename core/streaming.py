@@ -0,0 +1,81 @@
+# core/streaming.py
+"""
+Streaming CSV / JSONL output for large result sets.
+
+Rows (dicts, typically from a values() queryset read with
+.iterator(chunk_size=STREAM_CHUNK_SIZE)) are encoded lazily and emitted in
+buffered chunks, either as a StreamingHttpResponse or into a file, so
+neither the web worker nor a report job ever holds the full result.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+STREAM_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson',
+}
+STREAM_CHUNK_SIZE = 2000  # rows per database round trip
+BUFFER_ROWS = 500  # rows per chunk written to the client/file
+
+
+class _Echo:
+    """csv.writer target that hands back each line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(['' if row.get(column) is None else row.get(column)
+                               for column in columns])
+
+
+def _jsonl_lines(rows, columns):
+    for row in rows:
+        yield json.dumps({column: row.get(column) for column in columns},
+                         cls=DjangoJSONEncoder) + '\n'
+
+
+def encode_rows(rows, columns, output='csv'):
+    """Lazily encode rows as CSV or JSON lines, BUFFER_ROWS at a time"""
+    if output not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported output format: {output}")
+    lines = _csv_lines(rows, columns) if output == 'csv' else _jsonl_lines(rows, columns)
+
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= BUFFER_ROWS:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def streaming_response(rows, columns, output='csv', filename=None):
+    response = StreamingHttpResponse(
+        encode_rows(rows, columns, output), content_type=STREAM_FORMATS[output])
+    if filename:
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
+
+
+def write_rows(fileobj, rows, columns, output='csv'):
+    """Write encoded rows to a text file object; returns the row count"""
+    count = 0
+
+    def counted():
+        nonlocal count
+        for row in rows:
+            count += 1
+            yield row
+
+    for chunk in encode_rows(counted(), columns, output):
+        fileobj.write(chunk)
+    return count
@@ -1,3 +1,161 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from core.analytics_export import run_export
+from core.audit import AuditBuffer, _client_ip, audit_config
+from core.benchmark import DataGenerator
+from core.jobs import (
+    JOB_HANDLERS, claim_jobs, enqueue, heartbeat, release_stale_jobs, run_job)
+from core.models import AuditLog, Job
+from core.profiling import QueryBudgetExceeded, profiling_config, store
+from tables.models import Order, Table
+from tables.table_state import TableStateService
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Hot endpoints requested on a small generated dataset. Under
+    `manage.py test` the profiling middleware enforces PROFILING
+    budgets: an over-budget request raises QueryBudgetExceeded.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = DataGenerator(restaurants=1, branches=1, tables=5, menu_items=10,
+                                  days=3, orders_per_day=10, waste_per_day=2)
+        generator.generate()
+        cls.users = generator.users
+
+    def setUp(self):
+        cache.clear()  # cold caches: the budget covers a full computation
+        store.reset()
+
+    def assertWithinBudget(self, url_name, role, path):
+        budget = profiling_config()['QUERY_BUDGETS'].get(url_name)
+        self.assertIsNotNone(budget, f"No query budget for {url_name}")
+
+        self.client.force_login(self.users[role])
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+
+        sample = store.samples[url_name][-1]
+        self.assertLessEqual(sample['queries'], budget)
+        return response
+
+
+class QueryBudgetEnforcementTests(QueryBudgetTestCase):
+    def test_over_budget_request_fails(self):
+        config = profiling_config()
+        budgets = {**config['QUERY_BUDGETS'], 'kitchen-orders': 1}
+        with override_settings(PROFILING={**config, 'QUERY_BUDGETS': budgets}):
+            client = Client()  # middleware is loaded with the overridden budgets
+            client.force_login(self.users['chef'])
+            with self.assertRaises(QueryBudgetExceeded):
+                client.get('/api/tables/orders/kitchen_orders/')
+
+
+class AnalyticsExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        DataGenerator(restaurants=1, branches=1, tables=2, menu_items=4,
+                      days=2, orders_per_day=5, waste_per_day=0).generate()
+
+    def test_full_export_replaces_previous_parts(self):
+        with tempfile.TemporaryDirectory() as root:
+            first = run_export(['orders'], root=root, file_format='csv',
+                               full=True, until=timezone.now())
+            # A part of an earlier run, as if written at another time
+            stale = first['orders'][1][0].with_name('part-20000101T000000-00001.csv.gz')
+            first['orders'][1][0].rename(stale)
+            second = run_export(['orders'], root=root, file_format='csv',
+                                full=True, until=timezone.now())
+
+            parts = sorted(Path(root, 'orders').rglob('part-*.csv.gz'))
+            self.assertEqual(first['orders'][0], second['orders'][0])
+            self.assertFalse(stale.exists())
+            self.assertEqual(parts, sorted(second['orders'][1]))
+            self.assertEqual(sorted(p.name for p in Path(root).iterdir()), ['orders'])
+
+
+class JobLeaseTests(TestCase):
+    def claim(self, handler):
+        patcher = mock.patch.dict(JOB_HANDLERS, {'tests.lease': handler})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        job, _ = enqueue('tests.lease', {})
+        self.assertEqual(claim_jobs(1, 'worker-a'), [job.id])
+        return job
+
+    def expire(self, job):
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(days=1))
+
+    def test_heartbeat_keeps_a_long_job_leased(self):
+        job = self.claim(lambda job: None)
+        self.expire(job)
+        self.assertEqual(heartbeat([job.id], 'worker-a'), 1)
+        self.assertEqual(release_stale_jobs(), 0)
+        self.assertEqual(run_job(job.id, 'worker-a'), 'succeeded')
+
+    def test_released_job_outcome_is_discarded(self):
+        def handler(job):
+            # The worker stalls past its lease and another worker takes the job
+            self.expire(job)
+            release_stale_jobs()
+            claim_jobs(1, 'worker-b')
+            return {'from': 'worker-a'}
+
+        job = self.claim(handler)
+        self.assertEqual(run_job(job.id, 'worker-a'), 'released')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.result), ('running', 'worker-b', None))
+
+
+class AuditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        DataGenerator(restaurants=1, branches=1, tables=2, menu_items=4,
+                      days=0, orders_per_day=4, waste_per_day=0).generate()
+
+    def test_forwarded_for_only_trusted_from_proxies(self):
+        request = RequestFactory().get('/', REMOTE_ADDR='10.0.0.2',
+                                       HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7')
+        self.assertEqual(_client_ip(request), '10.0.0.2')
+        # The proxy appends the client it saw; earlier entries are client-supplied
+        self.assertEqual(_client_ip(request, ['10.0.0.2']), '203.0.113.7')
+
+    def test_forked_buffer_drops_the_parents_events(self):
+        config = {**audit_config(), 'BATCH_SIZE': 1000}
+        with mock.patch.object(AuditBuffer, '_run', lambda buffer: None):
+            buffer = AuditBuffer(config)
+            buffer.add(AuditLog(action='LOGIN', model_name='CustomUser'))
+            lock = buffer.lock
+            buffer._pid = -1  # as seen from a forked child
+            buffer.add(AuditLog(action='LOGOUT', model_name='CustomUser'))
+
+        self.assertEqual([event.action for event in buffer.events], ['LOGOUT'])
+        self.assertIsNot(buffer.lock, lock)
+
+    def test_table_status_update_is_audited(self):
+        table = Table.objects.exclude(status='cleaning').first()
+        self.assertTrue(TableStateService.set_status(table.id, 'cleaning'))
+        log = AuditLog.objects.get(model_name='Table', object_id=str(table.id))
+        self.assertEqual((log.details['from'], log.details['to']), (table.status, 'cleaning'))
+
+    def test_admin_bulk_order_transition_is_audited(self):
+        orders = Order.objects.exclude(status='ready')
+        expected = {str(order.id): order.status for order in orders}
+        self.assertTrue(expected)
+        AuditLog.objects.all().delete()
+
+        changed = admin.site._registry[Order]._bulk_transition(orders.all(), 'ready')
+        self.assertEqual(changed, len(expected))
+        logs = AuditLog.objects.filter(model_name='Order')
+        self.assertEqual({log.object_id: log.details['from'] for log in logs}, expected)
+        self.assertTrue(all(log.details['to'] == 'ready' for log in logs))
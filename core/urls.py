@@ -5,4 +5,8 @@ urlpatterns = [
     path('health/', views.health_check, name='health-check'),
     path('system/info/', views.SystemInfoView.as_view(), name='system-info'),
     path('system/stats/', views.system_stats, name='system-stats'),
+    path('system/profiling/', views.profiling_report, name='system-profiling'),
+    path('jobs/', views.jobs, name='jobs'),
+    path('jobs/<uuid:job_id>/', views.job_detail, name='job-detail'),
+    path('jobs/<uuid:job_id>/result/', views.job_result, name='job-result'),
 ]
@@ -14,8 +14,8 @@ from django.utils import timezone
 from django.db import connection
 from django.core.cache import cache
 
-from .serializers import HealthCheckSerializer
-from accounts.permissions import IsAdminUser
+from .serializers import HealthCheckSerializer, JobEnqueueSerializer, JobSerializer
+from accounts.permissions import IsAdminUser, IsManagerOrAdmin
 from django.shortcuts import render
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_protect
 from django.views.decorators.http import require_http_methods
@@ -182,3 +182,119 @@ def system_stats(request):
     }
 
     return Response(stats)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def profiling_report(request):
+    """Per-endpoint query counts and latency (admin only); DELETE resets"""
+    from .profiling import profiling_config, store
+
+    if request.method == 'DELETE':
+        store.reset()
+        return Response({'success': True})
+
+    config = profiling_config()
+    endpoints = store.summary(config['QUERY_BUDGETS'])
+
+    if request.GET.get('over_budget'):
+        endpoints = [row for row in endpoints if row['over_budget']]
+
+    return Response({
+        'success': True,
+        'ring_size': config['RING_SIZE'],
+        'endpoints': endpoints,
+    })
+
+
+# ============ JOBS ============
+
+def _scoped_jobs(user):
+    from .models import Job
+
+    jobs = Job.objects.select_related('created_by')
+    if user.role == 'admin':
+        return jobs
+    jobs = jobs.filter(restaurant_id=user.restaurant_id)
+    if user.branch_id:
+        jobs = jobs.filter(branch_id=user.branch_id)
+    return jobs
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated, IsManagerOrAdmin])
+def jobs(request):
+    """
+    GET: recent jobs of the caller's scope (?status=, ?name=).
+    POST {name, params, priority}: queue a job; an identical live job is
+    returned instead of queueing a duplicate. Managers' jobs are scoped to
+    their restaurant/branch (restaurant_id/branch_id params are forced).
+    """
+    from .jobs import JOB_HANDLERS, enqueue
+
+    user = request.user
+    if request.method == 'GET':
+        queryset = _scoped_jobs(user)
+        for field in ('status', 'name'):
+            if request.GET.get(field):
+                queryset = queryset.filter(**{field: request.GET[field]})
+        return Response({'jobs': JobSerializer(queryset[:50], many=True).data})
+
+    serializer = JobEnqueueSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    name = serializer.validated_data['name']
+    if name not in JOB_HANDLERS:
+        return Response({'error': f'Unknown job: {name}', 'available': sorted(JOB_HANDLERS)},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    params = dict(serializer.validated_data['params'])
+    if user.role != 'admin':
+        if not user.restaurant_id:
+            # Without a restaurant the forced scope would be "everything"
+            return Response({'error': 'No restaurant assigned'},
+                            status=status.HTTP_403_FORBIDDEN)
+        params['restaurant_id'] = user.restaurant_id
+        if user.branch_id:
+            params['branch_id'] = user.branch_id
+
+    job, created = enqueue(
+        name, params, priority=serializer.validated_data['priority'], user=user,
+        restaurant_id=params.get('restaurant_id'), branch_id=params.get('branch_id'))
+    return Response({
+        'success': True,
+        'created': created,
+        'job': JobSerializer(job).data,
+        'status_url': f'/api/jobs/{job.job_id}/',
+        'result_url': f'/api/jobs/{job.job_id}/result/',
+    }, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsManagerOrAdmin])
+def job_detail(request, job_id):
+    """Job status; DELETE cancels a job that has not started"""
+    from .jobs import cancel
+
+    job = _scoped_jobs(request.user).filter(job_id=job_id).first()
+    if job is None:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'DELETE':
+        if not cancel(job):
+            return Response({'error': f'Job is {job.status}'}, status=status.HTTP_409_CONFLICT)
+        job.refresh_from_db()
+    return Response({'success': True, 'job': JobSerializer(job).data})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsManagerOrAdmin])
+def job_result(request, job_id):
+    """A finished job's result (409 while it is queued or running)"""
+    job = _scoped_jobs(request.user).filter(job_id=job_id).first()
+    if job is None:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    if job.status != 'succeeded':
+        return Response({'error': f'Job is {job.status}', 'status': job.status,
+                         'job_error': job.error or None},
+                        status=status.HTTP_409_CONFLICT)
+    return Response({'success': True, 'job_id': job.job_id, 'result': job.result})
@@ -2,7 +2,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
-from .models import StockItem, StockTransaction, StockAlert, Recipe, InventoryReport
+from .models import (StockItem, StockTransaction, StockAlert, Recipe, InventoryReport,
+                     StockItemCostHistory, MenuItemCostHistory)
 from decimal import Decimal
 
 
@@ -181,8 +182,35 @@ class InventoryReportAdmin(admin.ModelAdmin):
     )
 
 
+class CostHistoryAdmin(admin.ModelAdmin):
+    """Cost history is append-only: viewable, never edited"""
+    list_filter = ['source', 'effective_from']
+    date_hierarchy = 'effective_from'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class StockItemCostHistoryAdmin(CostHistoryAdmin):
+    list_display = ['stock_item', 'cost_per_unit', 'effective_from', 'source']
+    search_fields = ['stock_item__name']
+
+
+class MenuItemCostHistoryAdmin(CostHistoryAdmin):
+    list_display = ['menu_item', 'unit_cost', 'effective_from', 'source']
+    search_fields = ['menu_item__name']
+
+
 admin.site.register(StockItem, StockItemAdmin)
 admin.site.register(StockTransaction, StockTransactionAdmin)
 admin.site.register(StockAlert, StockAlertAdmin)
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(InventoryReport, InventoryReportAdmin)
+admin.site.register(StockItemCostHistory, StockItemCostHistoryAdmin)
+admin.site.register(MenuItemCostHistory, MenuItemCostHistoryAdmin)
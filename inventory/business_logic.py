@@ -26,14 +26,24 @@ class ProfitCalculator:
             items = MenuItem.objects.filter(id=menu_item_id)
         else:
             items = MenuItem.objects.all()
+        # Recipes, categories and recent sales are loaded for all items at once
+        items = items.select_related('category').prefetch_related('recipes__stock_item')
+
+        # Get recent sales trend (last 7 days)
+        week_ago = timezone.now() - timedelta(days=7)
+        recent = dict(OrderItem.objects.filter(
+            menu_item__in=items,
+            order__completed_at__gte=week_ago,
+            order__status='completed'
+        ).values('menu_item_id').annotate(total=Sum('quantity')).order_by()
+            .values_list('menu_item_id', 'total'))
 
         profit_data = []
 
         for item in items:
             # Get ingredient cost from recipes
-            recipes = Recipe.objects.filter(menu_item=item)
             ingredient_cost = Decimal('0.00')
-            for recipe in recipes:
+            for recipe in item.recipes.all():
                 # Handle None ingredient_cost
                 recipe_cost = recipe.ingredient_cost or Decimal('0.00')
                 ingredient_cost += recipe_cost
@@ -46,15 +56,7 @@ class ProfitCalculator:
             profit_margin = (gross_profit / revenue *
                              100) if revenue > 0 else Decimal('0.00')
 
-            # Get recent sales trend (last 7 days)
-            week_ago = timezone.now() - timedelta(days=7)
-            recent_orders = OrderItem.objects.filter(
-                menu_item=item,
-                order__completed_at__gte=week_ago,
-                order__status='completed'
-            )
-            recent_sales = recent_orders.aggregate(
-                total=Sum('quantity'))['total'] or 0
+            recent_sales = recent.get(item.id) or 0
 
             profit_data.append({
                 'id': item.id,
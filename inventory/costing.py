@@ -0,0 +1,80 @@
+# inventory/costing.py
+"""
+Point-in-time costs.
+
+Costs are history, not state: every change of StockItem.cost_per_unit and
+of MenuItem.cost_price (the recipe cost per serving) appends a row to
+StockItemCostHistory / MenuItemCostHistory, effective from that moment,
+and each OrderItem stores the menu item's unit_cost at the time of sale.
+COGS for any past period is then the sum of its stored line costs - a
+cost change never rewrites or forces a recompute of earlier days.
+
+Order lines inserted without a unit_cost (bulk creates) are given the
+cost in effect when their order was placed - an index lookup on
+(menu_item, effective_from) - by fill_missing_unit_costs().
+"""
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from tables.models import Order, OrderItem
+
+from .models import MenuItemCostHistory, Recipe, StockItemCostHistory
+
+COST_FIELD = DecimalField(max_digits=14, decimal_places=2)
+
+
+# ============ LINE COSTS ============
+
+def order_item_line_cost(prefix=''):
+    """
+    Expression for an OrderItem's quantity x unit cost (prefix: the path to
+    the OrderItem, e.g. 'orderitem__' from MenuItem). Lines without a
+    captured unit_cost fall back to today's cost; fill_missing_unit_costs()
+    gives them their historical one first.
+    """
+    unit_cost = Coalesce(F(f'{prefix}unit_cost'), F(f'{prefix}menu_item__cost_price'),
+                         output_field=COST_FIELD)
+    return ExpressionWrapper(F(f'{prefix}quantity') * unit_cost, output_field=COST_FIELD)
+
+
+def fill_missing_unit_costs(order_items):
+    """
+    Store the cost in effect when the order was placed on lines created
+    without one (bulk inserts); one UPDATE, a no-op when none are missing
+    """
+    # An UPDATE cannot join, so the order's placed_at is a nested subquery
+    placed_at = Order.objects.filter(
+        id=OuterRef(OuterRef('order_id'))).values('placed_at')[:1]
+    cost_at_sale = MenuItemCostHistory.objects.filter(
+        menu_item_id=OuterRef('menu_item_id'),
+        effective_from__lte=Subquery(placed_at),
+    ).order_by('-effective_from', '-id').values('unit_cost')[:1]
+    return OrderItem.objects.filter(
+        id__in=order_items.filter(unit_cost__isnull=True).values('id')
+    ).update(unit_cost=Subquery(cost_at_sale))
+
+
+# ============ RECORDING ============
+
+def record_stock_item_cost(stock_item, source='change'):
+    return StockItemCostHistory.objects.create(
+        stock_item=stock_item, cost_per_unit=stock_item.cost_per_unit, source=source)
+
+
+def record_menu_item_cost(menu_item, source='change'):
+    return MenuItemCostHistory.objects.create(
+        menu_item=menu_item, unit_cost=menu_item.cost_price, source=source)
+
+
+def update_recipe_costs(stock_item):
+    """
+    Recompute the cost_price of every menu item whose recipe uses a stock
+    item (after its cost changed); returns the number of menu items updated
+    """
+    recipes = Recipe.objects.filter(stock_item=stock_item).select_related('menu_item')
+    updated = 0
+    for recipe in recipes:
+        recipe.menu_item._cost_source = 'stock'
+        recipe.update_menu_item_cost()
+        updated += 1
+    return updated
@@ -0,0 +1,34 @@
+# inventory/jobs.py - Background job handlers (see core.jobs)
+from core.jobs import job_handler
+
+from .models import InventoryReport
+from .reports import generate_report
+
+
+@job_handler('inventory.report')
+def build_inventory_report(job, report_type, start_date, end_date, output='csv',
+                           restaurant_id=None, branch_id=None):
+    """Generate an InventoryReport and its artifact file"""
+    report = InventoryReport.objects.create(
+        report_type=report_type,
+        title=f"{report_type.replace('_', ' ').title()} Report - {start_date} to {end_date}",
+        summary=f"Generated {report_type} report covering {start_date} to {end_date}",
+        start_date=start_date,
+        end_date=end_date,
+        generated_by=job.created_by,
+        restaurant_id=restaurant_id,
+        branch_id=branch_id,
+        status='pending',
+    )
+    report = generate_report(
+        InventoryReport.objects.select_related('restaurant', 'branch').get(pk=report.pk), output)
+    if report.status != 'completed':
+        raise RuntimeError(report.error or f'Report {report.pk} {report.status}')
+
+    return {
+        'report_id': report.id,
+        'title': report.title,
+        'row_count': report.row_count,
+        'summary': report.data.get('summary', {}),
+        'download_url': f'/api/inventory/reports/{report.id}/download/',
+    }
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:40
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_alter_recipe_quantity_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryreport',
+            name='artifact',
+            field=models.FileField(blank=True, upload_to='reports/inventory/%Y/%m/'),
+        ),
+        migrations.AddField(
+            model_name='inventoryreport',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='inventoryreport',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='inventoryreport',
+            name='row_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='inventoryreport',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='inventoryreport',
+            name='data',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AlterField(
+            model_name='inventoryreport',
+            name='summary',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def seed_cost_history(apps, schema_editor):
+    """The current costs, effective since each item was created"""
+    StockItem = apps.get_model('inventory', 'StockItem')
+    StockItemCostHistory = apps.get_model('inventory', 'StockItemCostHistory')
+    MenuItem = apps.get_model('menu', 'MenuItem')
+    MenuItemCostHistory = apps.get_model('inventory', 'MenuItemCostHistory')
+
+    StockItemCostHistory.objects.bulk_create([
+        StockItemCostHistory(stock_item_id=item_id, cost_per_unit=cost,
+                             effective_from=created_at, source='initial')
+        for item_id, cost, created_at in StockItem.objects.values_list(
+            'id', 'cost_per_unit', 'created_at').iterator()
+    ], batch_size=1000)
+    MenuItemCostHistory.objects.bulk_create([
+        MenuItemCostHistory(menu_item_id=item_id, unit_cost=cost,
+                            effective_from=created_at, source='initial')
+        for item_id, cost, created_at in MenuItem.objects.values_list(
+            'id', 'cost_price', 'created_at').iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_inventoryreport_artifact'),
+        ('menu', '0003_category_station_menuitem_station'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuItemCostHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit_cost', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('effective_from', models.DateTimeField(default=django.utils.timezone.now)),
+                ('source', models.CharField(choices=[('initial', 'Initial cost'), ('change', 'Cost change'), ('recipe', 'Recipe change'), ('stock', 'Ingredient cost change')], default='change', max_length=20)),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_history', to='menu.menuitem')),
+            ],
+            options={
+                'verbose_name_plural': 'Menu item cost history',
+                'ordering': ['-effective_from', '-id'],
+                'get_latest_by': 'effective_from',
+                'indexes': [models.Index(fields=['menu_item', 'effective_from'], name='inventory_m_menu_it_94f04f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockItemCostHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cost_per_unit', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('effective_from', models.DateTimeField(default=django.utils.timezone.now)),
+                ('source', models.CharField(choices=[('initial', 'Initial cost'), ('change', 'Cost change')], default='change', max_length=20)),
+                ('stock_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_history', to='inventory.stockitem')),
+            ],
+            options={
+                'verbose_name_plural': 'Stock item cost history',
+                'ordering': ['-effective_from', '-id'],
+                'get_latest_by': 'effective_from',
+                'indexes': [models.Index(fields=['stock_item', 'effective_from'], name='inventory_s_stock_i_d9eda2_idx')],
+            },
+        ),
+        migrations.RunPython(seed_cost_history, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 # inventory/models.py
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from decimal import Decimal
@@ -320,6 +321,76 @@ class Recipe(models.Model):
         return total_cost
 
 
+class StockItemCostHistory(models.Model):
+    """
+    Append-only record of a stock item's cost_per_unit: one row each time
+    it changes, effective from that moment
+    """
+    SOURCE_CHOICES = [
+        ('initial', 'Initial cost'),
+        ('change', 'Cost change'),
+    ]
+
+    stock_item = models.ForeignKey(
+        StockItem, on_delete=models.CASCADE, related_name='cost_history')
+    cost_per_unit = models.DecimalField(max_digits=10, decimal_places=2)
+    effective_from = models.DateTimeField(default=timezone.now)
+    source = models.CharField(
+        max_length=20, choices=SOURCE_CHOICES, default='change')
+
+    class Meta:
+        ordering = ['-effective_from', '-id']
+        get_latest_by = 'effective_from'
+        indexes = [
+            models.Index(fields=['stock_item', 'effective_from']),
+        ]
+        verbose_name_plural = 'Stock item cost history'
+
+    def __str__(self):
+        return f"{self.stock_item.name}: {self.cost_per_unit} from {self.effective_from:%Y-%m-%d %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Cost history is append-only")
+        super().save(*args, **kwargs)
+
+
+class MenuItemCostHistory(models.Model):
+    """
+    Append-only record of a menu item's cost per serving (its recipe cost,
+    MenuItem.cost_price): one row each time it changes
+    """
+    SOURCE_CHOICES = [
+        ('initial', 'Initial cost'),
+        ('change', 'Cost change'),
+        ('recipe', 'Recipe change'),
+        ('stock', 'Ingredient cost change'),
+    ]
+
+    menu_item = models.ForeignKey(
+        'menu.MenuItem', on_delete=models.CASCADE, related_name='cost_history')
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2)
+    effective_from = models.DateTimeField(default=timezone.now)
+    source = models.CharField(
+        max_length=20, choices=SOURCE_CHOICES, default='change')
+
+    class Meta:
+        ordering = ['-effective_from', '-id']
+        get_latest_by = 'effective_from'
+        indexes = [
+            models.Index(fields=['menu_item', 'effective_from']),
+        ]
+        verbose_name_plural = 'Menu item cost history'
+
+    def __str__(self):
+        return f"{self.menu_item.name}: {self.unit_cost} from {self.effective_from:%Y-%m-%d %H:%M}"
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError("Cost history is append-only")
+        super().save(*args, **kwargs)
+
+
 class InventoryReport(models.Model):
     """
     Stores generated inventory reports
@@ -335,9 +406,23 @@ class InventoryReport(models.Model):
     report_type = models.CharField(max_length=20, choices=REPORT_TYPES)
     title = models.CharField(max_length=200)
 
-    # Report data
-    data = models.JSONField()  # Store report data as JSON
-    summary = models.TextField()
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    # Report data: bounded aggregates; the line rows live in the artifact file
+    data = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    summary = models.TextField(blank=True)
+    artifact = models.FileField(upload_to='reports/inventory/%Y/%m/', blank=True)
+    row_count = models.PositiveIntegerField(default=0)
+
+    # Generation (inventory.reports)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='completed')
+    error = models.TextField(blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
 
     # Date range
     start_date = models.DateField()
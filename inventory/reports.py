@@ -0,0 +1,214 @@
+# inventory/reports.py
+"""
+Inventory reports.
+
+A report is two parts: its line rows (stock items or transactions), which
+are unbounded and only ever streamed - to the client as CSV/JSONL, or to
+the report's artifact file - and a summary of bounded aggregates kept in
+InventoryReport.data. Generation runs as an 'inventory.report' background
+job (inventory.jobs) and writes the artifact through a temporary file, so
+memory stays flat for year-long ranges.
+"""
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.files import File
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from core.streaming import STREAM_CHUNK_SIZE, write_rows
+
+from .models import InventoryReport, StockItem, StockTransaction
+
+logger = logging.getLogger(__name__)
+
+STOCK_ITEM_COLUMNS = [
+    'id', 'name', 'category', 'current_quantity', 'unit', 'cost_per_unit',
+    'stock_value', 'minimum_quantity', 'reorder_quantity', 'is_low_stock',
+    'needs_reorder',
+]
+TRANSACTION_COLUMNS = [
+    'id', 'transaction_date', 'transaction_type', 'stock_item_id',
+    'stock_item__name', 'stock_item__category', 'quantity', 'unit_cost',
+    'total_cost', 'reason', 'reference_number', 'order_id', 'user_id',
+    'branch_id',
+]
+
+REPORT_TYPES = ('stock_valuation', 'transaction_summary', 'waste_analysis')
+
+
+def parse_report_range(start_date_str, end_date_str):
+    """(start, end) dates from YYYY-MM-DD strings; the last 7 days by default"""
+    today = timezone.now().date()
+    start_date = (datetime.strptime(start_date_str, '%Y-%m-%d').date()
+                  if start_date_str else today - timedelta(days=7))
+    end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else today
+    return start_date, end_date
+
+
+def report_querysets(restaurant, branch, start_date, end_date):
+    """Active stock items and the range's transactions of a scope"""
+    stock_items = StockItem.objects.filter(is_active=True)
+    transactions = StockTransaction.objects.all()
+
+    if restaurant:
+        stock_items = stock_items.filter(restaurant=restaurant)
+        transactions = transactions.filter(restaurant=restaurant)
+        if branch:
+            stock_items = stock_items.filter(branch=branch)
+            transactions = transactions.filter(branch=branch)
+
+    transactions = transactions.filter(transaction_date__range=[start_date, end_date])
+    return stock_items, transactions
+
+
+# ============ ROWS ============
+
+def _stock_item_rows(stock_items):
+    fields = [column for column in STOCK_ITEM_COLUMNS
+              if column not in ('stock_value', 'is_low_stock', 'needs_reorder')]
+    for row in stock_items.order_by('name').values(*fields).iterator(chunk_size=STREAM_CHUNK_SIZE):
+        row['stock_value'] = row['current_quantity'] * row['cost_per_unit']
+        row['is_low_stock'] = row['current_quantity'] <= row['minimum_quantity']
+        row['needs_reorder'] = row['current_quantity'] <= row['reorder_quantity']
+        yield row
+
+
+def _transaction_rows(transactions):
+    return transactions.order_by('transaction_date', 'id').values(
+        *TRANSACTION_COLUMNS).iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+
+def report_rows(report_type, stock_items, transactions):
+    """(columns, lazy rows) of a report's lines"""
+    if report_type == 'stock_valuation':
+        return STOCK_ITEM_COLUMNS, _stock_item_rows(stock_items)
+    if report_type == 'waste_analysis':
+        transactions = transactions.filter(transaction_type='waste')
+    return TRANSACTION_COLUMNS, _transaction_rows(transactions)
+
+
+# ============ SUMMARIES ============
+
+def report_summary(report_type, stock_items, transactions):
+    """The report's bounded aggregates (what InventoryReport.data keeps)"""
+    if report_type == 'stock_valuation':
+        value = ExpressionWrapper(F('current_quantity') * F('cost_per_unit'),
+                                  output_field=DecimalField(max_digits=14, decimal_places=2))
+        totals = stock_items.aggregate(
+            total_items=Count('id'),
+            total_value=Sum(value),
+            low_stock_count=Count('id', filter=Q(current_quantity__lte=F('minimum_quantity'))),
+        )
+        total_value = float(totals['total_value'] or 0)
+        return {
+            'report_type': 'stock_valuation',
+            'summary': {
+                'total_items': totals['total_items'],
+                'total_value': total_value,
+                'low_stock_count': totals['low_stock_count'],
+                'average_item_value': total_value / totals['total_items'] if totals['total_items'] else 0
+            }
+        }
+
+    if report_type == 'transaction_summary':
+        transactions_by_type = transactions.values('transaction_type').annotate(
+            count=Count('id'),
+            total_quantity=Sum('quantity'),
+            total_cost=Sum('total_cost')
+        ).order_by('transaction_type')
+
+        daily_transactions = transactions.values(
+            date=F('transaction_date')
+        ).annotate(
+            transaction_count=Count('id'),
+            daily_cost=Sum('total_cost')
+        ).order_by('date')
+
+        top_items = transactions.values(
+            'stock_item__name',
+            'stock_item__category'
+        ).annotate(
+            transaction_count=Count('id'),
+            total_quantity=Sum('quantity'),
+            total_cost=Sum('total_cost')
+        ).order_by('-total_cost')[:10]
+
+        totals = transactions.aggregate(
+            total_transactions=Count('id'),
+            total_quantity=Sum('quantity'),
+            total_cost=Sum('total_cost'))
+        return {
+            'report_type': 'transaction_summary',
+            'transactions_by_type': list(transactions_by_type),
+            'daily_transactions': list(daily_transactions),
+            'top_items': list(top_items),
+            'summary': {
+                'total_transactions': totals['total_transactions'],
+                'total_quantity': totals['total_quantity'] or Decimal('0.00'),
+                'total_cost': totals['total_cost'] or Decimal('0.00')
+            }
+        }
+
+    waste_transactions = transactions.filter(transaction_type='waste')
+    waste_by_item = waste_transactions.values(
+        'stock_item__name',
+        'stock_item__category'
+    ).annotate(
+        waste_count=Count('id'),
+        total_quantity=Sum('quantity'),
+        total_cost=Sum('total_cost')
+    ).order_by('-total_cost')
+
+    waste_reasons = waste_transactions.exclude(reason='').values('reason').annotate(
+        count=Count('id'),
+        total_cost=Sum('total_cost')
+    ).order_by('-total_cost')[:10]
+
+    totals = waste_transactions.aggregate(
+        total_cost=Sum('total_cost'), total_quantity=Sum('quantity'), count=Count('id'))
+    return {
+        'report_type': 'waste_analysis',
+        'waste_by_item': list(waste_by_item),
+        'waste_reasons': list(waste_reasons),
+        'summary': {
+            'total_waste_cost': totals['total_cost'] or Decimal('0.00'),
+            'total_waste_quantity': totals['total_quantity'] or Decimal('0.00'),
+            'waste_transaction_count': totals['count']
+        }
+    }
+
+
+# ============ GENERATION ============
+
+def generate_report(report, output='csv'):
+    """
+    Build a pending report: stream its rows into the artifact file and
+    store the summary. Marks the report completed or failed.
+    """
+    InventoryReport.objects.filter(pk=report.pk).update(status='running')
+    try:
+        stock_items, transactions = report_querysets(
+            report.restaurant, report.branch, report.start_date, report.end_date)
+        report.data = report_summary(report.report_type, stock_items, transactions)
+        columns, rows = report_rows(report.report_type, stock_items, transactions)
+
+        with tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='') as buffer:
+            row_count = write_rows(buffer, rows, columns, output)
+            report.artifact.save(
+                f"{report.report_type}_{report.start_date}_{report.end_date}.{output}",
+                File(buffer), save=False)
+
+        report.row_count = row_count
+        report.status = 'completed'
+        report.completed_at = timezone.now()
+        report.save(update_fields=['artifact', 'data', 'row_count', 'status', 'completed_at'])
+    except Exception as e:
+        logger.error(f"Inventory report {report.pk} failed: {e}", exc_info=True)
+        report.status = 'failed'
+        report.error = str(e)
+        report.save(update_fields=['status', 'error'])
+    return report
+
@@ -1,8 +1,10 @@
 # inventory/signals.py
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_init, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
+from menu.models import MenuItem
 from tables.models import Order, OrderItem
+from .costing import record_menu_item_cost, record_stock_item_cost, update_recipe_costs
 from .models import StockItem, StockTransaction, Recipe, StockAlert
 from decimal import Decimal
 
@@ -82,4 +84,48 @@ def update_menu_item_cost_on_recipe_change(sender, instance, created, **kwargs):
     """
     When a recipe is created or updated, update the menu item's cost_price
     """
+    instance.menu_item._cost_source = 'recipe'
     instance.update_menu_item_cost()
+
+
+# ============ COST HISTORY ============
+# The cost loaded with an instance is remembered on it (post_init, no
+# query), so a save appends a history row only when the cost really changed.
+
+def _cost_changed(instance, field, created, update_fields):
+    if created:
+        return True
+    if update_fields is not None and field not in update_fields:
+        return False
+    # A deferred cost was never loaded, so it cannot have been changed
+    return field in instance.__dict__ and instance.__dict__[field] != instance._recorded_cost
+
+
+@receiver(post_init, sender=StockItem)
+def remember_stock_item_cost(sender, instance, **kwargs):
+    instance._recorded_cost = instance.__dict__.get('cost_per_unit')
+
+
+@receiver(post_save, sender=StockItem)
+def record_stock_item_cost_change(sender, instance, created, update_fields=None, **kwargs):
+    """Append the new cost to the history and re-cost the recipes using it"""
+    if not _cost_changed(instance, 'cost_per_unit', created, update_fields):
+        return
+    record_stock_item_cost(instance, 'initial' if created else 'change')
+    instance._recorded_cost = instance.cost_per_unit
+    if not created:
+        update_recipe_costs(instance)
+
+
+@receiver(post_init, sender=MenuItem)
+def remember_menu_item_cost(sender, instance, **kwargs):
+    instance._recorded_cost = instance.__dict__.get('cost_price')
+
+
+@receiver(post_save, sender=MenuItem)
+def record_menu_item_cost_change(sender, instance, created, update_fields=None, **kwargs):
+    if not _cost_changed(instance, 'cost_price', created, update_fields):
+        return
+    source = instance.__dict__.pop('_cost_source', 'change')  # set by recipe re-costing
+    record_menu_item_cost(instance, 'initial' if created else source)
+    instance._recorded_cost = instance.cost_price
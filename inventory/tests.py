@@ -1,3 +1,62 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import tempfile
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+
+from core.benchmark import DataGenerator
+from core.jobs import claim_jobs, run_job
+from core.models import Job
+from inventory.models import InventoryReport, StockItem
+from inventory.reports import STOCK_ITEM_COLUMNS
+
+
+class InventoryReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generator = DataGenerator(restaurants=1, branches=1, tables=1, menu_items=2,
+                                  days=0, orders_per_day=0, waste_per_day=0)
+        generator.generate()
+        cls.manager = generator.users['manager']
+
+    def setUp(self):
+        self.client.force_login(self.manager)
+
+    def stream(self, output):
+        response = self.client.get('/api/inventory/stream-report/', {
+            'report_type': 'stock_valuation', 'output': output})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_stream_report_csv(self):
+        rows = list(csv.reader(io.StringIO(self.stream('csv'))))
+        self.assertEqual(rows[0], STOCK_ITEM_COLUMNS)
+        self.assertEqual(len(rows) - 1, StockItem.objects.count())
+
+    def test_stream_report_jsonl(self):
+        rows = [json.loads(line) for line in self.stream('jsonl').splitlines()]
+        self.assertEqual(len(rows), StockItem.objects.count())
+        self.assertEqual(list(rows[0]), STOCK_ITEM_COLUMNS)
+
+    def test_generate_report_is_queued_then_downloadable(self):
+        response = self.client.post('/api/inventory/generate-report/', {
+            'report_type': 'stock_valuation', 'output': 'jsonl'}, content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(job_id=response.json()['job_id'])
+        self.assertEqual(job.name, 'inventory.report')
+
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root):
+            self.assertEqual(claim_jobs(1), [job.id])
+            self.assertEqual(run_job(job.id), 'succeeded')
+
+            result = self.client.get(response.json()['result_url']).json()['result']
+            report = InventoryReport.objects.get(id=result['report_id'])
+            self.assertEqual(report.status, 'completed')
+            self.assertEqual(result['row_count'], StockItem.objects.count())
+
+            download = self.client.get(result['download_url'])
+            self.assertEqual(download.status_code, 200)
+            content = b''.join(download.streaming_content).decode()
+            self.assertEqual(len(content.splitlines()), result['row_count'])
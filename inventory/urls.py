@@ -22,6 +22,7 @@ urlpatterns = [
     path('stock-value/', views.total_stock_value, name='total-stock-value'),
     path('waste-analysis/', views.waste_analysis, name='waste-analysis'),
     path('generate-report/', views.generate_report, name='generate-report'),
+    path('stream-report/', views.stream_report, name='stream-report'),
     path('auto-deduct-order/<int:order_id>/',
          views.auto_deduct_from_order, name='auto-deduct-order'),
 
@@ -3,8 +3,9 @@ from accounts.authentication import JWTAuthentication
 from .serializers import StockTransactionSerializer
 from .models import StockTransaction, StockItem, Recipe, StockAlert, InventoryReport
 from tables.models import Order, OrderItem
-import json
-from datetime import datetime, timedelta
+import os
+from datetime import timedelta
+from django.http import FileResponse
 from django.utils import timezone
 from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
 
@@ -27,6 +28,9 @@ from .serializers import (
     StockAlertSerializer, RecipeSerializer, InventoryReportSerializer
 )
 from accounts.permissions import IsManagerOrAdmin, IsWaiterOrHigher
+from core.streaming import STREAM_FORMATS, streaming_response
+from core.jobs import enqueue
+from .reports import REPORT_TYPES, parse_report_range, report_querysets, report_rows
 
 
 class StockItemViewSet(viewsets.ModelViewSet):
@@ -200,6 +204,17 @@ class InventoryReportViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Stream the report's artifact file"""
+        report = self.get_object()
+        if report.status != 'completed' or not report.artifact:
+            return Response(
+                {'error': f'Report is {report.status}', 'status': report.status},
+                status=status.HTTP_409_CONFLICT)
+        return FileResponse(report.artifact.open('rb'), as_attachment=True,
+                            filename=os.path.basename(report.artifact.name))
+
 
 # Custom API Views
 
@@ -323,158 +338,85 @@ def waste_analysis(request):
     })
 
 
+def _report_request(params):
+    """(report_type, start_date, end_date, output) of a report request, or an error Response"""
+    report_type = params.get('report_type', 'transaction_summary')
+    if report_type not in REPORT_TYPES:
+        return Response(
+            {'error': f"report_type must be one of: {', '.join(REPORT_TYPES)}"},
+            status=status.HTTP_400_BAD_REQUEST)
+
+    output = params.get('output', 'csv')
+    if output not in STREAM_FORMATS:
+        return Response({'error': 'output must be csv or jsonl'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        start_date, end_date = parse_report_range(
+            params.get('start_date'), params.get('end_date'))
+    except ValueError:
+        return Response({'error': 'Dates must be YYYY-MM-DD'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return report_type, start_date, end_date, output
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsManagerOrAdmin])
 def generate_report(request):
     """
-    Generate an inventory report
+    Queue an inventory report as a background job ('inventory.report');
+    an identical report already queued or running is returned instead.
+
+    Responds 202 with job_id, created, status, status_url and result_url;
+    the report is no longer built (nor its data returned) in the request.
+    Once the job succeeded, result_url returns the report_id, title,
+    row_count, summary and download_url of the CSV/JSONL line rows.
+    stream-report/ streams the same rows directly.
     """
     user = request.user
-
-    report_type = request.data.get('report_type', 'daily')
-    start_date_str = request.data.get('start_date')
-    end_date_str = request.data.get('end_date')
-
-    # Parse dates
-    start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date(
-    ) if start_date_str else timezone.now().date() - timedelta(days=7)
-    end_date = datetime.strptime(
-        end_date_str, '%Y-%m-%d').date() if end_date_str else timezone.now().date()
-
-    # Filter based on restaurant/branch
-    stock_items = StockItem.objects.filter(is_active=True)
-    transactions = StockTransaction.objects.all()
-
-    if user.restaurant:
-        stock_items = stock_items.filter(restaurant=user.restaurant)
-        transactions = transactions.filter(restaurant=user.restaurant)
-        if user.branch:
-            stock_items = stock_items.filter(branch=user.branch)
-            transactions = transactions.filter(branch=user.branch)
-
-    # Filter transactions by date range
-    transactions = transactions.filter(
-        transaction_date__range=[start_date, end_date]
-    )
-
-    report_data = {}
-
-    if report_type == 'stock_valuation':
-        # Stock valuation report
-        stock_items_data = []
-        for item in stock_items:
-            stock_items_data.append({
-                'name': item.name,
-                'category': item.category,
-                'current_quantity': float(item.current_quantity),
-                'unit': item.unit,
-                'cost_per_unit': float(item.cost_per_unit),
-                'stock_value': float(item.stock_value),
-                'is_low_stock': item.is_low_stock,
-                'needs_reorder': item.needs_reorder
-            })
-
-        total_value = sum(item['stock_value'] for item in stock_items_data)
-        low_stock_count = sum(
-            1 for item in stock_items_data if item['is_low_stock'])
-
-        report_data = {
-            'report_type': 'stock_valuation',
-            'stock_items': stock_items_data,
-            'summary': {
-                'total_items': len(stock_items_data),
-                'total_value': total_value,
-                'low_stock_count': low_stock_count,
-                'average_item_value': total_value / len(stock_items_data) if stock_items_data else 0
-            }
-        }
-
-    elif report_type == 'transaction_summary':
-        # Transaction summary report
-        transactions_by_type = transactions.values('transaction_type').annotate(
-            count=Count('id'),
-            total_quantity=Sum('quantity'),
-            total_cost=Sum('total_cost')
-        )
-
-        daily_transactions = transactions.annotate(
-            date=TruncDate('transaction_date')
-        ).values('date').annotate(
-            transaction_count=Count('id'),
-            daily_cost=Sum('total_cost')
-        ).order_by('date')
-
-        top_items = transactions.values(
-            'stock_item__name',
-            'stock_item__category'
-        ).annotate(
-            transaction_count=Count('id'),
-            total_quantity=Sum('quantity'),
-            total_cost=Sum('total_cost')
-        ).order_by('-total_cost')[:10]
-
-        report_data = {
-            'report_type': 'transaction_summary',
-            'transactions_by_type': list(transactions_by_type),
-            'daily_transactions': list(daily_transactions),
-            'top_items': list(top_items),
-            'summary': {
-                'total_transactions': transactions.count(),
-                'total_quantity': transactions.aggregate(total=Sum('quantity'))['total'] or Decimal('0.00'),
-                'total_cost': transactions.aggregate(total=Sum('total_cost'))['total'] or Decimal('0.00')
-            }
-        }
-
-    elif report_type == 'waste_analysis':
-        # Waste analysis report
-        waste_transactions = transactions.filter(transaction_type='waste')
-
-        waste_by_item = waste_transactions.values(
-            'stock_item__name',
-            'stock_item__category'
-        ).annotate(
-            waste_count=Count('id'),
-            total_quantity=Sum('quantity'),
-            total_cost=Sum('total_cost')
-        ).order_by('-total_cost')
-
-        waste_reasons = waste_transactions.exclude(reason='').values('reason').annotate(
-            count=Count('id'),
-            total_cost=Sum('total_cost')
-        ).order_by('-total_cost')[:10]
-
-        report_data = {
-            'report_type': 'waste_analysis',
-            'waste_by_item': list(waste_by_item),
-            'waste_reasons': list(waste_reasons),
-            'summary': {
-                'total_waste_cost': waste_transactions.aggregate(total=Sum('total_cost'))['total'] or Decimal('0.00'),
-                'total_waste_quantity': waste_transactions.aggregate(total=Sum('quantity'))['total'] or Decimal('0.00'),
-                'waste_transaction_count': waste_transactions.count()
-            }
-        }
-
-    # Create report record
-    from .models import InventoryReport
-    report = InventoryReport.objects.create(
-        report_type=report_type,
-        title=f"{report_type.replace('_', ' ').title()} Report - {start_date} to {end_date}",
-        data=report_data,
-        summary=f"Generated {report_type} report covering {start_date} to {end_date}",
-        start_date=start_date,
-        end_date=end_date,
-        generated_by=user,
-        restaurant=user.restaurant,
-        branch=user.branch if user.branch else None
-    )
+    parsed = _report_request(request.data)
+    if isinstance(parsed, Response):
+        return parsed
+    report_type, start_date, end_date, output = parsed
+
+    branch_id = user.branch_id if user.restaurant_id else None
+    job, created = enqueue('inventory.report', {
+        'report_type': report_type,
+        'start_date': start_date,
+        'end_date': end_date,
+        'output': output,
+        'restaurant_id': user.restaurant_id,
+        'branch_id': branch_id,
+    }, user=user, restaurant_id=user.restaurant_id, branch_id=branch_id, max_attempts=1)
 
     return Response({
         'success': True,
-        'report_id': report.id,
-        'title': report.title,
-        'generated_at': report.created_at,
-        'data': report_data
-    })
+        'job_id': job.job_id,
+        'created': created,
+        'status': job.status,
+        'status_url': f'/api/jobs/{job.job_id}/',
+        'result_url': f'/api/jobs/{job.job_id}/result/',
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsManagerOrAdmin])
+def stream_report(request):
+    """
+    Stream a report's line rows as CSV or JSON lines
+    (?report_type=&start_date=&end_date=&output=csv|jsonl)
+    """
+    user = request.user
+    parsed = _report_request(request.query_params)
+    if isinstance(parsed, Response):
+        return parsed
+    report_type, start_date, end_date, output = parsed
+
+    stock_items, transactions = report_querysets(
+        user.restaurant, user.branch, start_date, end_date)
+    columns, rows = report_rows(report_type, stock_items, transactions)
+    return streaming_response(
+        rows, columns, output, filename=f"{report_type}_{start_date}_{end_date}")
 
 
 @api_view(['POST'])
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0002_menuitem_cost_price_menuitem_last_sold_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='station',
+            field=models.CharField(blank=True, help_text='Kitchen station preparing this category (e.g. grill, bar)', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='station',
+            field=models.CharField(blank=True, help_text="Overrides the category's kitchen station", max_length=100),
+        ),
+    ]
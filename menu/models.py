@@ -3,6 +3,9 @@ from django.utils import timezone
 from django.db import models
 from django.core.validators import MinValueValidator
 
+# Station for items whose category has none
+DEFAULT_STATION = 'kitchen'
+
 
 class Category(models.Model):
     restaurant = models.ForeignKey(
@@ -10,6 +13,9 @@ class Category(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     order_index = models.IntegerField(default=0)
+    station = models.CharField(
+        max_length=100, blank=True,
+        help_text="Kitchen station preparing this category (e.g. grill, bar)")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -37,6 +43,9 @@ class MenuItem(models.Model):
     image = models.ImageField(upload_to='menu_items/', blank=True, null=True)
     preparation_time = models.IntegerField(
         default=15, help_text="Preparation time in minutes")
+    station = models.CharField(
+        max_length=100, blank=True,
+        help_text="Overrides the category's kitchen station")
 
     # ✅ NEW: Business Intelligence Fields
     cost_price = models.DecimalField(
@@ -89,6 +98,10 @@ class MenuItem(models.Model):
             self.profit_margin = (profit_amount / self.price) * 100
         super().save(*args, **kwargs)
 
+    def get_station(self):
+        """Station preparing this item: its own, its category's, or the default"""
+        return self.station or self.category.station or DEFAULT_STATION
+
     def update_sales(self, quantity=1):
         """Update sales statistics when item is sold"""
         from django.db.models import F
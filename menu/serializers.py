@@ -11,7 +11,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = [
             'id', 'restaurant', 'name', 'description',
-            'order_index', 'is_active', 'item_count',
+            'order_index', 'station', 'is_active', 'item_count',
             'available_item_count', 'created_at'
         ]
         read_only_fields = ['id', 'created_at',
@@ -35,7 +35,7 @@ class MenuItemSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'category', 'category_name', 'restaurant_name',
             'name', 'description', 'price', 'image',
-            'preparation_time', 'is_available', 'created_at', 'updated_at'
+            'preparation_time', 'station', 'is_available', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -45,7 +45,7 @@ class MenuItemCreateSerializer(serializers.ModelSerializer):
         model = MenuItem
         fields = [
             'category', 'name', 'description', 'price',
-            'image', 'preparation_time', 'is_available'
+            'image', 'preparation_time', 'station', 'is_available'
         ]
 
     def validate_price(self, value):
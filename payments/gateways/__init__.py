@@ -3,6 +3,17 @@ from .base import BasePaymentGateway
 from .cbe import CBEGateway
 from .telebirr import TelebirrGateway
 from .cash import CashGateway
+from .stub import StubGateway
+
+# Gateway implementation per payment method / PaymentGateway.gateway_type
+GATEWAY_CLASSES = {
+    'cash': CashGateway,
+    'cbe': CBEGateway,
+    'cbe_wallet': CBEGateway,
+    'telebirr': TelebirrGateway,
+    'test': StubGateway,
+}
 
 __all__ = ['BasePaymentGateway', 'CBEGateway',
-           'TelebirrGateway', 'CashGateway']
+           'TelebirrGateway', 'CashGateway', 'StubGateway',
+           'GATEWAY_CLASSES']
@@ -0,0 +1,64 @@
+# payments/gateways/stub.py
+from .base import BasePaymentGateway
+import hashlib
+import time
+
+
+class StubGateway(BasePaymentGateway):
+    """Local stub gateway (no external API) for development and test runs"""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        # Simulated round trip in seconds
+        self.latency = float(self.config.get('latency', 0.05))
+        # Share of verifications that succeed / fail, the rest stay pending
+        self.success_rate = float(self.config.get('success_rate', 0.9))
+        self.failure_rate = float(self.config.get('failure_rate', 0.05))
+
+    def _bucket(self, transaction_id):
+        """Deterministic value in [0, 1) so reruns give the same outcome"""
+        digest = hashlib.sha1(str(transaction_id).encode('utf-8')).hexdigest()
+        return int(digest[:8], 16) / 0x100000000
+
+    def initiate_payment(self, payment_data):
+        """Stub payments are accepted immediately"""
+        return {
+            'success': True,
+            'transaction_id': f"STUB-{payment_data.get('payment_id')}",
+            'payment_url': None,
+            'message': 'Stub payment initiated',
+            'gateway_response': {'stub': True}
+        }
+
+    def verify_payment(self, transaction_id):
+        """Verify stub payment after the simulated latency"""
+        if self.latency:
+            time.sleep(self.latency)
+
+        bucket = self._bucket(transaction_id)
+        if bucket < self.success_rate:
+            status = 'SUCCESS'
+        elif bucket < self.success_rate + self.failure_rate:
+            status = 'FAILED'
+        else:
+            status = 'PENDING'
+
+        return {
+            'success': True,
+            'status': status,
+            'verified': status == 'SUCCESS',
+            'gateway_response': {
+                'stub': True,
+                'transaction_id': str(transaction_id),
+                'status': status
+            }
+        }
+
+    def refund_payment(self, transaction_id, amount):
+        """Stub refunds always succeed"""
+        return {
+            'success': True,
+            'refund_id': f"REFUND-{transaction_id}",
+            'message': 'Stub refund processed',
+            'amount': amount
+        }
@@ -0,0 +1,27 @@
+# payments/management/commands/process_webhook_events.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.webhooks import process_webhook_events
+
+
+class Command(BaseCommand):
+    help = 'Apply pending gateway webhook events from the inbox (retries failed ones)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=500,
+                            help='Max events picked up per run')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep draining every --interval seconds')
+        parser.add_argument('--interval', type=int, default=10,
+                            help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_webhook_events(limit=options['limit'])
+            self.stdout.write(f'Processed {processed} webhook events')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,58 @@
+# payments/management/commands/reprint_receipts.py
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payments.models import Receipt
+from payments.receipts import render_receipts_batch
+
+
+class Command(BaseCommand):
+    help = 'Batch-render receipts for a day (end-of-day reprints) as HTML or ESC/POS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='YYYY-MM-DD (default: today)')
+        parser.add_argument('--branch', type=int, help='Only this branch id')
+        parser.add_argument('--output-format', choices=['html', 'escpos'],
+                            default='html')
+        parser.add_argument('--output', required=True,
+                            help='File to write the combined receipts to')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                day = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD')
+        else:
+            day = timezone.localdate()
+
+        receipts = Receipt.objects.filter(
+            created_at__date=day).order_by('receipt_number')
+        if options['branch']:
+            receipts = receipts.filter(
+                payment__order__table__branch_id=options['branch'])
+
+        receipts = list(receipts.only(
+            'id', 'receipt_number', 'context', 'content_hash'))
+        legacy = sum(1 for receipt in receipts if not receipt.context)
+
+        fmt = options['output_format']
+        rendered = render_receipts_batch(receipts, fmt)
+
+        if fmt == 'escpos':
+            with open(options['output'], 'wb') as f:
+                for _, content in rendered:
+                    f.write(content)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                for _, content in rendered:
+                    f.write(content)
+                    f.write('\n<div style="page-break-after: always;"></div>\n')
+
+        if legacy:
+            self.stdout.write(self.style.WARNING(
+                f'Skipped {legacy} legacy receipts without stored context'))
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {len(rendered)} receipts for {day} to {options['output']}"))
@@ -0,0 +1,76 @@
+# payments/management/commands/verify_pending_payments.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.verification import PaymentVerificationWorker
+
+
+class Command(BaseCommand):
+    help = 'Verify pending digital payments with their gateways and apply the results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            help='Payments verified and applied per transaction')
+        parser.add_argument('--max-workers', type=int,
+                            help='Concurrent gateway calls')
+        parser.add_argument('--rate-limit', type=float,
+                            help='Max verify calls per second per gateway (0 = unlimited)')
+        parser.add_argument('--min-age', type=int,
+                            help='Only verify payments older than this many seconds')
+        parser.add_argument('--max-attempts', type=int,
+                            help='Give up on a payment after this many inconclusive checks')
+        parser.add_argument('--stub', action='store_true',
+                            help='Verify against the local stub gateway instead of real gateways')
+        parser.add_argument('--stub-latency', type=float, default=0.05,
+                            help='Simulated stub gateway latency in seconds')
+        parser.add_argument('--stub-success-rate', type=float, default=0.9,
+                            help='Share of stub verifications that succeed')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, verifying every --interval seconds')
+        parser.add_argument('--interval', type=int, default=60,
+                            help='Seconds between runs with --loop')
+
+    def handle(self, *args, **options):
+        worker_kwargs = {
+            'batch_size': options['batch_size'],
+            'max_workers': options['max_workers'],
+            'rate_limit': options['rate_limit'],
+            'min_age': options['min_age'],
+            'max_attempts': options['max_attempts'],
+            'use_stub': options['stub'],
+            'stub_config': {
+                'latency': options['stub_latency'],
+                'success_rate': options['stub_success_rate'],
+            },
+        }
+
+        while True:
+            worker = PaymentVerificationWorker(**worker_kwargs)
+
+            started = time.monotonic()
+            metrics = worker.run_once()
+            elapsed = time.monotonic() - started
+
+            self.report(metrics, elapsed)
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def report(self, metrics, elapsed):
+        if not metrics:
+            self.stdout.write('No pending digital payments to verify.')
+            return
+
+        for row in metrics:
+            self.stdout.write(
+                f"{row['gateway']}: {row['calls']} calls | "
+                f"avg {row['avg_ms']}ms p50 {row['p50_ms']}ms "
+                f"p95 {row['p95_ms']}ms max {row['max_ms']}ms | "
+                f"completed {row['completed']} failed {row['failed']} "
+                f"pending {row['pending']} errors {row['errors']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Verification run finished in {elapsed:.2f}s'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gateway', models.CharField(choices=[('cbe', 'Commercial Bank of Ethiopia'), ('telebirr', 'Telebirr'), ('cbe_wallet', 'CBE Wallet'), ('test', 'Test Gateway')], max_length=20)),
+                ('event_id', models.CharField(max_length=100)),
+                ('payment_ref', models.CharField(blank=True, max_length=100)),
+                ('gateway_status', models.CharField(blank=True, max_length=30)),
+                ('payload', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('received', 'Received'), ('processed', 'Processed'), ('failed', 'Failed')], default='received', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['received_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'received_at'], name='payments_we_status_4e31df_idx'), models.Index(fields=['payment_ref', 'received_at'], name='payments_we_payment_78bc18_idx')],
+                'unique_together': {('gateway', 'event_id')},
+            },
+        ),
+    ]
@@ -41,6 +41,9 @@ class Payment(models.Model):
         ('cancelled', 'Cancelled'),
     ]
 
+    # Methods settled through an external gateway
+    DIGITAL_PAYMENT_METHODS = ['cbe', 'telebirr', 'cbe_wallet', 'card']
+
     # Order relationship
     order = models.ForeignKey(
         'tables.Order', on_delete=models.CASCADE, related_name='payments')
@@ -121,7 +124,7 @@ class Payment(models.Model):
     @property
     def is_digital_payment(self):
         """Check if payment is digital (not cash)"""
-        return self.payment_method in ['cbe', 'telebirr', 'cbe_wallet', 'card']
+        return self.payment_method in self.DIGITAL_PAYMENT_METHODS
 
     @classmethod
     def check_duplicate_payment(cls, order, payment_method, amount):
@@ -144,7 +147,11 @@ class Receipt(models.Model):
     payment = models.OneToOneField(
         Payment, on_delete=models.CASCADE, related_name='receipt')
     receipt_number = models.CharField(max_length=50, unique=True)
-    html_content = models.TextField()  # HTML for printing
+    # Legacy pre-rendered HTML; new receipts store only `context`
+    html_content = models.TextField(blank=True)
+    # Flattened receipt data rendered to HTML / ESC/POS on demand
+    context = models.JSONField(default=dict, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     printed_at = models.DateTimeField(blank=True, null=True)
     printed_by = models.ForeignKey(
         'accounts.CustomUser', on_delete=models.SET_NULL, null=True, blank=True)
@@ -191,9 +198,22 @@ class Receipt(models.Model):
         """Mark receipt as printed"""
         self.printed_at = timezone.now()
         self.printed_by = user
-        self.save()
+        Receipt.objects.filter(pk=self.pk).update(
+            printed_at=self.printed_at, printed_by=user)
         return self
 
+    def render(self, fmt='html'):
+        """Render as 'html' or 'escpos' (served from cache when unchanged)"""
+        from .receipts import render_receipt
+
+        if not self.context:
+            # Legacy receipt stored as HTML only
+            if fmt == 'html':
+                return self.html_content
+            raise ValueError('Receipt has no stored context to render')
+
+        return render_receipt(self.context, fmt, self.content_hash)
+
 
 class PaymentGateway(models.Model):
     """Payment gateway configuration"""
@@ -232,3 +252,39 @@ class PaymentGateway(models.Model):
 
     def __str__(self):
         return f"{self.name} ({'Test' if self.test_mode else 'Live'})"
+
+
+class WebhookEvent(models.Model):
+    """Durable inbox of gateway webhook deliveries, deduplicated by event ID"""
+    STATUS_CHOICES = [
+        ('received', 'Received'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+
+    gateway = models.CharField(
+        max_length=20, choices=PaymentGateway.GATEWAY_TYPES)
+    event_id = models.CharField(max_length=100)
+    # payment_id from the payload; events are applied in order per payment
+    payment_ref = models.CharField(max_length=100, blank=True)
+    gateway_status = models.CharField(max_length=30, blank=True)
+    payload = models.JSONField(default=dict)
+
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='received')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['received_at', 'id']
+        unique_together = ['gateway', 'event_id']
+        indexes = [
+            models.Index(fields=['status', 'received_at']),
+            models.Index(fields=['payment_ref', 'received_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.gateway} webhook {self.event_id} ({self.status})"
@@ -0,0 +1,176 @@
+# payments/receipts.py - Receipt rendering engine (HTML + ESC/POS)
+import hashlib
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils import timezone
+
+RECEIPT_TEMPLATE_NAME = 'payments/receipt.html'
+COMPANY_NAME = 'RESTAURANT ORDERING SYSTEM'
+
+# Rendered receipts are immutable for a given hash, so keep them a day
+RECEIPT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# 80mm thermal printers print 48 columns in font A
+ESCPOS_LINE_WIDTH = 48
+
+_compiled_template = None
+
+
+def get_receipt_template():
+    """Load and compile the receipt template once per process"""
+    global _compiled_template
+    if _compiled_template is None:
+        _compiled_template = get_template(RECEIPT_TEMPLATE_NAME)
+    return _compiled_template
+
+
+def build_receipt_context(payment, change=0, receipt_number=None):
+    """
+    Flatten everything a receipt shows into plain strings.
+
+    The result is what gets stored on Receipt.context, so reprints never
+    need the payment, order, table or cashier rows again.
+    """
+    order = payment.order
+    change_decimal = Decimal(str(change)) if change else Decimal('0.00')
+    paid_at = payment.processed_at or timezone.now()
+
+    return {
+        'company_name': COMPANY_NAME,
+        'receipt_number': receipt_number or str(payment.payment_id),
+        'payment_id': str(payment.payment_id),
+        'paid_at': paid_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'order_number': order.order_number or '',
+        'table_number': order.table.table_number if order.table else 'N/A',
+        'payment_method': payment.get_payment_method_display(),
+        'amount': str(payment.amount),
+        'change': str(change_decimal) if change_decimal > Decimal('0.00') else '',
+        'cashier': payment.processed_by.username if payment.processed_by else 'System',
+    }
+
+
+def context_hash(context):
+    """Stable SHA-256 of a receipt context"""
+    canonical = json.dumps(context, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _cache_key(content_hash, fmt):
+    return f'receipt:{fmt}:{content_hash}'
+
+
+# ============ RENDERERS ============
+
+def render_html(context):
+    return get_receipt_template().render(context)
+
+
+def render_escpos(context):
+    """Render a receipt as ESC/POS bytes for thermal printers"""
+    ESC, GS = b'\x1b', b'\x1d'
+    width = ESCPOS_LINE_WIDTH
+
+    def encode(text):
+        return text.encode('cp437', errors='replace')
+
+    def row(label, value):
+        value = str(value)
+        space = max(1, width - len(label) - len(value))
+        return encode(f'{label}{" " * space}{value}'[:width]) + b'\n'
+
+    divider = b'-' * width + b'\n'
+
+    out = [
+        ESC + b'@',                    # initialize
+        ESC + b'a\x01',                # center
+        ESC + b'E\x01', encode(context['company_name']) + b'\n', ESC + b'E\x00',
+        b'Payment Receipt\n',
+        ESC + b'a\x00',                # left
+        divider,
+        row('Receipt:', context['receipt_number']),
+        row('Date:', context['paid_at']),
+        row('Order:', f"#{context['order_number']}"),
+        row('Table:', context['table_number']),
+        divider,
+        row('Payment Method:', context['payment_method']),
+        ESC + b'E\x01', row('Amount Paid:', f"${context['amount']}"), ESC + b'E\x00',
+    ]
+    if context.get('change'):
+        out.append(row('Change:', f"${context['change']}"))
+    out += [
+        row('Cashier:', context['cashier']),
+        divider,
+        ESC + b'a\x01',
+        b'Thank you for your payment!\n',
+        encode(f"Receipt ID: {context['payment_id']}") + b'\n',
+        b'\n\n\n',
+        GS + b'V\x42\x00',             # feed and partial cut
+    ]
+    return b''.join(out)
+
+
+RENDERERS = {
+    'html': render_html,
+    'escpos': render_escpos,
+}
+
+
+def render_receipt(context, fmt='html', content_hash=None):
+    """Render a receipt context, served from cache for identical content"""
+    if fmt not in RENDERERS:
+        raise ValueError(f'Unknown receipt format: {fmt}')
+
+    content_hash = content_hash or context_hash(context)
+    key = _cache_key(content_hash, fmt)
+
+    rendered = cache.get(key)
+    if rendered is None:
+        rendered = RENDERERS[fmt](context)
+        cache.set(key, rendered, RECEIPT_CACHE_TIMEOUT)
+
+    return rendered
+
+
+def render_receipts_batch(receipts, fmt='html'):
+    """
+    Render many stored receipts (end-of-day reprints) with one cache
+    round trip for the hits. Returns [(receipt, rendered)] in input order.
+    """
+    if fmt not in RENDERERS:
+        raise ValueError(f'Unknown receipt format: {fmt}')
+
+    receipts = [receipt for receipt in receipts if receipt.context]
+    keys = [_cache_key(receipt.content_hash, fmt) for receipt in receipts]
+    cached = cache.get_many(keys)
+
+    missing = {}
+    results = []
+    for key, receipt in zip(keys, receipts):
+        rendered = cached.get(key, missing.get(key))
+        if rendered is None:
+            rendered = RENDERERS[fmt](receipt.context)
+            missing[key] = rendered
+        results.append((receipt, rendered))
+
+    if missing:
+        cache.set_many(missing, RECEIPT_CACHE_TIMEOUT)
+
+    return results
+
+
+# ============ RECEIPT RECORDS ============
+
+def create_receipt(payment, change=0):
+    """Create the Receipt for a payment, storing only its compact context"""
+    from .models import Receipt
+
+    receipt = Receipt(payment=payment)
+    receipt.receipt_number = receipt.generate_receipt_number()
+    receipt.context = build_receipt_context(
+        payment, change, receipt.receipt_number)
+    receipt.content_hash = context_hash(receipt.context)
+    receipt.save()
+    return receipt
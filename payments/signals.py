@@ -3,6 +3,7 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
 from tables.models import Order
+from tables.table_state import TableStateService
 from .models import Payment
 import logging
 
@@ -100,6 +101,4 @@ def update_order_on_payment_completion(sender, instance, created, **kwargs):
                 f"💰 Payment {instance.payment_id} completed for Order {order.order_number}")
 
             # Update table
-            if order.table:
-                order.table.status = 'cleaning'
-                order.table.save()
+            TableStateService.set_status(order.table_id, 'cleaning')
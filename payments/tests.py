@@ -1,3 +1,131 @@
-from django.test import TestCase
+import hashlib
+import hmac
+import json
+import threading
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.test import override_settings
+from django.utils import timezone
+
+from core.tests import QueryBudgetTestCase
+from payments import webhooks
+from payments.models import Payment, WebhookEvent
+from tables.models import Order
+
+WEBHOOK_SECRET = 'test-secret'
+
+
+class CashierDashboardQueryBudgetTests(QueryBudgetTestCase):
+    def test_cashier_dashboard_within_budget(self):
+        response = self.assertWithinBudget(
+            'cashier-dashboard-data', 'cashier', '/api/payments/cashier/dashboard-data/')
+        orders = response.json()['data']['pending_orders']['orders']
+        self.assertTrue(all('items_count' in order for order in orders))
+
+
+class CashierPendingOrdersTests(QueryBudgetTestCase):
+    url = '/api/payments/cashier/pending-orders/'
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.users['cashier'])
+
+    def test_pages_cover_every_unpaid_order_once(self):
+        seen = []
+        offset = 0
+        while offset is not None:
+            data = self.client.get(self.url, {'limit': 1, 'offset': offset}).json()
+            self.assertLessEqual(len(data['orders']), 1)
+            seen += [order['id'] for order in data['orders']]
+            offset = data['next_offset']
+
+        self.assertEqual(len(seen), data['count'])
+        self.assertEqual(len(set(seen)), len(seen))
+        self.assertGreater(data['count'], 1)
+
+    def test_streams_every_unpaid_order(self):
+        count = self.client.get(self.url).json()['count']
+
+        response = self.client.get(self.url, {'output': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines) - 1, count)
+
+        response = self.client.get(self.url, {'output': 'jsonl'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), count)
+
+    def test_invalid_paging_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'limit': 'x'}).status_code, 400)
+        # Non-positive limits clamp to one row so next_offset always advances
+        for limit in (-1, 0):
+            response = self.client.get(self.url, {'limit': limit})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['orders']), 1)
+            self.assertEqual(response.json()['next_offset'], 1)
+
+
+@override_settings(PAYMENT_SETTINGS={
+    **settings.PAYMENT_SETTINGS, 'CBE_WEBHOOK_SECRET': WEBHOOK_SECRET,
+    'WEBHOOK_ASYNC_PROCESSING': False, 'WEBHOOK_MAX_ATTEMPTS': 3})
+class WebhookInboxTests(QueryBudgetTestCase):
+    def setUp(self):
+        super().setUp()
+        self.payment = Payment.objects.create(
+            order=Order.objects.filter(is_paid=False).first(),
+            payment_method='cbe', amount=Decimal('100.00'))
+
+    def deliver(self, event_id, gateway_status, payment_ref=None):
+        body = json.dumps({'event_id': event_id, 'status': gateway_status,
+                           'payment_id': payment_ref or str(self.payment.payment_id),
+                           'transaction_id': f'tx-{event_id}'}).encode()
+        signature = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+        response = self.client.post('/api/payments/webhooks/cbe/', body,
+                                    content_type='application/json',
+                                    HTTP_X_CBE_SIGNATURE=signature)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_duplicate_delivery_is_ignored(self):
+        self.assertNotIn('duplicate', self.deliver('evt-1', 'SUCCESS'))
+        self.assertTrue(self.deliver('evt-1', 'SUCCESS')['duplicate'])
+        self.assertEqual(WebhookEvent.objects.filter(event_id='evt-1').count(), 1)
+
+    def test_events_of_a_payment_apply_in_order(self):
+        self.deliver('evt-late', 'FAILED')
+        self.deliver('evt-early', 'SUCCESS')
+        # Received first, so applied first; the later FAILED finds it settled
+        WebhookEvent.objects.filter(event_id='evt-early').update(
+            received_at=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(webhooks.process_webhook_events(), 2)
+        self.payment.refresh_from_db()
+        self.assertEqual((self.payment.status, self.payment.transaction_id),
+                         ('completed', 'tx-evt-early'))
+        self.assertFalse(WebhookEvent.objects.exclude(status='processed').exists())
+
+    def test_failed_apply_is_retried_up_to_max_attempts(self):
+        self.deliver('evt-orphan', 'SUCCESS', payment_ref=str(uuid.uuid4()))
+        for _ in range(5):
+            webhooks.process_webhook_events()
+
+        event = WebhookEvent.objects.get(event_id='evt-orphan')
+        self.assertEqual((event.status, event.attempts), ('failed', 3))
+        self.assertIn('does not exist', event.last_error)
+
+    def test_drainer_runs_again_after_a_full_pass(self):
+        passes = [webhooks.DRAIN_BATCH, 0]
+        with mock.patch.object(webhooks, 'process_webhook_events',
+                               side_effect=lambda limit: passes.pop(0)) as process, \
+                mock.patch.object(webhooks, 'close_old_connections'):
+            webhooks._processing_lock.acquire()
+            webhooks._processing_requested.set()
+            drainer = threading.Thread(target=webhooks._drain)
+            drainer.start()
+            drainer.join(5)
+
+        self.assertEqual(process.call_count, 2)
+        self.assertFalse(webhooks._processing_lock.locked())
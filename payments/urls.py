@@ -1,7 +1,7 @@
 # payments/urls.py - CORRECTED VERSION
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import views, webhooks
 
 router = DefaultRouter()
 router.register(r'payments', views.PaymentViewSet, basename='payment')
@@ -33,6 +33,9 @@ urlpatterns = [
     path('payments/<uuid:pk>/generate-receipt/',
          views.PaymentViewSet.as_view({'post': 'generate_detailed_receipt'}), name='payment-generate-receipt'),
 
+    # ✅ GATEWAY WEBHOOKS
+    path('webhooks/cbe/', webhooks.cbe_webhook, name='cbe-webhook'),
+
     # ✅ RECEIPT PRINTING
     path('print-receipt/<uuid:payment_id>/',
          views.print_receipt, name='print-receipt'),
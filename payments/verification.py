@@ -0,0 +1,336 @@
+# payments/verification.py - Background verification of pending digital payments
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.audit import record_payment_transition
+
+from .gateways import GATEWAY_CLASSES, StubGateway
+from .models import Payment, PaymentGateway
+
+logger = logging.getLogger(__name__)
+
+# Gateway statuses that mean the customer will never pay this transaction
+FAILED_GATEWAY_STATUSES = {
+    'failed', 'closed', 'expired', 'cancelled', 'canceled', 'declined'
+}
+
+
+def get_verification_settings():
+    """Verification settings from PAYMENT_SETTINGS with defaults"""
+    payment_settings = getattr(settings, 'PAYMENT_SETTINGS', {})
+    return {
+        'batch_size': payment_settings.get('VERIFICATION_BATCH_SIZE', 50),
+        'max_workers': payment_settings.get('VERIFICATION_MAX_WORKERS', 4),
+        'rate_limit': payment_settings.get('VERIFICATION_RATE_LIMIT', 5),
+        'min_age': payment_settings.get('VERIFICATION_MIN_AGE', 60),
+        'max_attempts': payment_settings.get('VERIFICATION_MAX_ATTEMPTS', 20),
+    }
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` calls per second"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate or 0)
+        self.capacity = burst or max(1, int(self.rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call is allowed"""
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class GatewayMetrics:
+    """Latency and outcome counters for one gateway"""
+
+    def __init__(self, gateway_type):
+        self.gateway_type = gateway_type
+        self.latencies = []
+        self.outcomes = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, seconds, outcome):
+        with self.lock:
+            self.latencies.append(seconds)
+            self.outcomes[outcome] += 1
+
+    def summary(self):
+        """Return count, latency percentiles (ms) and outcome counts"""
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            index = min(count - 1, int(round(p / 100 * (count - 1))))
+            return round(latencies[index] * 1000, 2)
+
+        return {
+            'gateway': self.gateway_type,
+            'calls': count,
+            'avg_ms': round(sum(latencies) / count * 1000, 2) if count else 0.0,
+            'p50_ms': percentile(50),
+            'p95_ms': percentile(95),
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            'completed': self.outcomes['completed'],
+            'failed': self.outcomes['failed'],
+            'pending': self.outcomes['pending'],
+            'errors': self.outcomes['error'],
+        }
+
+
+class PaymentVerificationWorker:
+    """
+    Reconciles pending digital payments with their gateways.
+
+    Pending payments are grouped per gateway, verified concurrently with
+    bounded parallelism and a per-gateway rate limit, and the results are
+    applied in one transaction per batch.
+    """
+
+    def __init__(self, batch_size=None, max_workers=None, rate_limit=None,
+                 min_age=None, max_attempts=None, use_stub=False, stub_config=None):
+        defaults = get_verification_settings()
+        self.batch_size = batch_size or defaults['batch_size']
+        self.max_workers = max_workers or defaults['max_workers']
+        self.rate_limit = defaults['rate_limit'] if rate_limit is None else rate_limit
+        self.min_age = defaults['min_age'] if min_age is None else min_age
+        self.max_attempts = max_attempts or defaults['max_attempts']
+        self.use_stub = use_stub
+        self.stub_config = stub_config or {}
+
+        self.metrics = {}
+        self.rate_limiters = {}
+        self._gateways = {}
+
+    # ============ SELECTION ============
+
+    def get_pending_payments(self):
+        """Pending digital payments old enough to be worth verifying"""
+        cutoff = timezone.now() - timedelta(seconds=self.min_age)
+
+        return Payment.objects.filter(
+            status='pending',
+            payment_method__in=Payment.DIGITAL_PAYMENT_METHODS,
+            created_at__lte=cutoff
+        ).select_related(
+            'order__table__branch'
+        ).order_by('created_at')
+
+    def group_by_gateway(self, payments):
+        """Group payments into {(gateway_type, restaurant_id): [payments]}"""
+        groups = defaultdict(list)
+        skipped = 0
+
+        for payment in payments:
+            attempts = (payment.metadata or {}).get('verification_attempts', 0)
+            if attempts >= self.max_attempts:
+                skipped += 1
+                continue
+
+            gateway_type = 'test' if self.use_stub else payment.payment_method
+            if gateway_type not in GATEWAY_CLASSES:
+                skipped += 1
+                continue
+
+            restaurant_id = payment.order.table.branch.restaurant_id
+            groups[(gateway_type, restaurant_id)].append(payment)
+
+        if skipped:
+            logger.info(f"Skipped {skipped} payments without a usable gateway")
+
+        return groups
+
+    # ============ GATEWAYS ============
+
+    def get_gateway(self, gateway_type, restaurant_id):
+        """Build (and memoize) the gateway client for a restaurant"""
+        key = (gateway_type, restaurant_id)
+        if key in self._gateways:
+            return self._gateways[key]
+
+        if self.use_stub:
+            gateway = StubGateway(self.stub_config)
+        else:
+            # cbe_wallet payments go through the CBE gateway config
+            config_type = 'cbe' if gateway_type == 'cbe_wallet' else gateway_type
+            config = PaymentGateway.objects.filter(
+                gateway_type__in=[gateway_type, config_type],
+                restaurant_id=restaurant_id,
+                is_active=True
+            ).first()
+
+            if not config:
+                gateway = None
+            else:
+                gateway = GATEWAY_CLASSES[gateway_type]({
+                    'api_key': config.api_key,
+                    'merchant_id': config.merchant_id,
+                    'callback_url': config.callback_url,
+                    'test_mode': config.test_mode,
+                    'app_id': config.merchant_id,
+                    'app_key': config.api_secret,
+                })
+
+        self._gateways[key] = gateway
+        return gateway
+
+    # Both are created by verify_group, in the submitting thread, before any
+    # worker can use them: lazily creating them from the workers would race
+    def _get_metrics(self, gateway_type):
+        if gateway_type not in self.metrics:
+            self.metrics[gateway_type] = GatewayMetrics(gateway_type)
+        return self.metrics[gateway_type]
+
+    def _get_rate_limiter(self, gateway_type):
+        if gateway_type not in self.rate_limiters:
+            self.rate_limiters[gateway_type] = RateLimiter(self.rate_limit)
+        return self.rate_limiters[gateway_type]
+
+    # ============ VERIFICATION ============
+
+    @staticmethod
+    def classify(result):
+        """Map a gateway verify result to completed / failed / pending / error"""
+        if not result or not result.get('success'):
+            return 'error'
+
+        if result.get('verified'):
+            return 'completed'
+
+        gateway_status = str(result.get('status') or '').lower()
+        if gateway_status in FAILED_GATEWAY_STATUSES:
+            return 'failed'
+
+        return 'pending'
+
+    def _verify_one(self, gateway, rate_limiter, metrics, payment):
+        """Runs in a worker thread - gateway I/O only, no DB access"""
+        rate_limiter.acquire()
+
+        started = time.monotonic()
+        try:
+            result = gateway.verify_payment(
+                payment.transaction_id or str(payment.payment_id))
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        elapsed = time.monotonic() - started
+
+        outcome = self.classify(result)
+        metrics.record(elapsed, outcome)
+        return payment, outcome, result
+
+    def verify_group(self, gateway_type, restaurant_id, payments, executor):
+        """Verify one gateway group batch by batch"""
+        gateway = self.get_gateway(gateway_type, restaurant_id)
+        if gateway is None:
+            logger.warning(
+                f"No active {gateway_type} gateway for restaurant {restaurant_id}, "
+                f"skipping {len(payments)} payments")
+            return []
+
+        rate_limiter = self._get_rate_limiter(gateway_type)
+        metrics = self._get_metrics(gateway_type)
+
+        results = []
+        for start in range(0, len(payments), self.batch_size):
+            batch = payments[start:start + self.batch_size]
+            futures = [
+                executor.submit(self._verify_one, gateway, rate_limiter, metrics, payment)
+                for payment in batch
+            ]
+            batch_results = [future.result() for future in futures]
+            self.apply_results(batch_results)
+            results.extend(batch_results)
+
+        return results
+
+    @transaction.atomic
+    def apply_results(self, results):
+        """Apply one batch of verification results in a single transaction"""
+        by_pk = {payment.pk: (outcome, result)
+                 for payment, outcome, result in results}
+
+        # Re-read under lock so a webhook that landed meanwhile wins
+        payments = Payment.objects.select_for_update().select_related(
+            'order').filter(pk__in=by_pk.keys(), status='pending')
+
+        now = timezone.now()
+        failed = []
+        still_pending = []
+
+        for payment in payments:
+            outcome, result = by_pk[payment.pk]
+
+            if outcome == 'completed':
+                payment.mark_as_completed(
+                    transaction_id=payment.transaction_id or str(
+                        payment.payment_id),
+                    gateway_response=result.get('gateway_response') or {
+                        'status': result.get('status')}
+                )
+            elif outcome == 'failed':
+                failed.append(payment)
+            else:
+                metadata = payment.metadata or {}
+                metadata['verification_attempts'] = metadata.get(
+                    'verification_attempts', 0) + 1
+                metadata['last_verification_at'] = now.isoformat()
+                if outcome == 'error':
+                    metadata['last_verification_error'] = result.get('error', '')
+                payment.metadata = metadata
+                still_pending.append(payment)
+
+        if failed:
+            Payment.objects.filter(pk__in=[payment.pk for payment in failed]).update(status='failed')
+            # update() sends no post_save, so the audit hook is called directly
+            for payment in failed:
+                record_payment_transition(payment, 'pending', 'failed')
+
+        if still_pending:
+            Payment.objects.bulk_update(still_pending, ['metadata'])
+
+    def run_once(self):
+        """Verify every eligible pending payment once and return metrics"""
+        groups = self.group_by_gateway(self.get_pending_payments())
+
+        if not groups:
+            return self.get_metrics()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for (gateway_type, restaurant_id), payments in groups.items():
+                self.verify_group(gateway_type, restaurant_id,
+                                  payments, executor)
+
+        return self.get_metrics()
+
+    def get_metrics(self):
+        return [metrics.summary() for metrics in self.metrics.values()]
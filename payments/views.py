@@ -10,7 +10,7 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-
+from django.db.models import Count, Sum
 from django.utils import timezone
 from decimal import Decimal
 import uuid
@@ -24,7 +24,13 @@ from .serializers import (
     PaymentProcessSerializer, RefundSerializer, CashierPaymentSerializer
 )
 from tables.models import Order
+from tables.table_state import TableStateService
+from core.caching import cached_view
+from core.streaming import STREAM_CHUNK_SIZE, STREAM_FORMATS, streaming_response
 from .gateways import CashGateway, CBEGateway, TelebirrGateway
+from .receipts import (
+    build_receipt_context, context_hash, create_receipt, render_receipt
+)
 
 logger = logging.getLogger(__name__)
 
@@ -131,6 +137,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsCashierOrHigher])
+@cached_view(timeout=30, topics=('orders', 'payments'), vary_on_user=True)
 def cashier_dashboard_data(request):
     """
     Get dashboard data for cashier interface.
@@ -152,23 +159,21 @@ def cashier_dashboard_data(request):
         pending_orders = Order.objects.filter(
             table__branch=user.branch,  # FIXED: Changed from 'branch' to 'table__branch'
             is_paid=False  # ANY unpaid order
-        ).select_related('table', 'table__branch').order_by('-placed_at')
-
-        logger.info(
-            f"Found {pending_orders.count()} unpaid orders in branch {user.branch.name}")
+        ).select_related('table', 'table__branch', 'waiter').annotate(
+            items_count=Count('items')).order_by('-placed_at')
 
         # ============ Get today's completed payments ============
         today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
         today_end = today_start + timedelta(days=1)
 
-        today_payments = Payment.objects.filter(
+        # ============ Calculate today's revenue ============
+        today_totals = Payment.objects.filter(
             order__table__branch=user.branch,  # FIXED
             status='completed',
             processed_at__range=[today_start, today_end]
-        )
-
-        # ============ Calculate today's revenue ============
-        today_revenue = sum(p.amount for p in today_payments)
+        ).aggregate(revenue=Sum('amount'), transactions=Count('id'))
+        today_revenue = today_totals['revenue'] or Decimal('0.00')
+        today_transactions = today_totals['transactions']
 
         # ============ Get recent payments (last 10) ============
         recent_payments = Payment.objects.filter(
@@ -190,9 +195,12 @@ def cashier_dashboard_data(request):
                 'is_paid': order.is_paid,
                 'placed_at': order.placed_at,
                 'waiter_name': order.waiter.get_full_name() if order.waiter else 'N/A',
-                'items_count': order.items.count()  # FIXED: Use 'items' not 'orderitem_set'
+                'items_count': order.items_count
             })
 
+        logger.info(
+            f"Found {len(pending_orders_data)} unpaid orders in branch {user.branch.name}")
+
         # Fix: Get recent payments data
         recent_payments_data = []
         for payment in recent_payments:
@@ -216,8 +224,8 @@ def cashier_dashboard_data(request):
                 },
                 'today_summary': {
                     'revenue': float(today_revenue),
-                    'transactions': today_payments.count(),
-                    'average_transaction': float(today_revenue / today_payments.count()) if today_payments.count() > 0 else 0
+                    'transactions': today_transactions,
+                    'average_transaction': float(today_revenue / today_transactions) if today_transactions > 0 else 0
                 },
                 'recent_payments': recent_payments_data,
                 'branch': {
@@ -327,22 +335,17 @@ def cashier_process_payment(request):
             order.save()
 
             # Update table status
-            if order.table:
-                order.table.status = 'cleaning'
-                order.table.save()
+            TableStateService.set_status(order.table_id, 'cleaning')
 
             # Generate receipt
-            receipt = Receipt.objects.create(
-                payment=payment,
-                html_content=generate_receipt_html(payment, float(change))
-            )
+            receipt = create_receipt(payment, float(change))
 
             response_data = {
                 'success': True,
                 'payment': PaymentSerializer(payment).data,
                 'receipt': {
                     'receipt_number': receipt.receipt_number,
-                    'html_content': receipt.html_content,
+                    'html_content': receipt.render('html'),
                     'printable': True
                 },
                 'change': float(change) if change > Decimal('0.00') else 0,
@@ -372,10 +375,21 @@ def cashier_process_payment(request):
         }, status=500)
 
 
+PENDING_ORDERS_PAGE_SIZE = 100
+PENDING_ORDER_COLUMNS = [
+    'id', 'order_number', 'table__table_number', 'table__branch_id',
+    'waiter__username', 'status', 'subtotal', 'tax_amount', 'service_charge',
+    'discount_amount', 'total_amount', 'placed_at',
+]
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsCashierOrHigher])
 def cashier_pending_orders(request):
-    """Get orders pending payment for cashier dashboard"""
+    """
+    Orders pending payment for the cashier dashboard, oldest first, a page
+    at a time (?limit=&offset=); ?output=csv|jsonl streams them all
+    """
     user = request.user
 
     # Get orders that need payment
@@ -392,13 +406,37 @@ def cashier_pending_orders(request):
             table__branch=user.branch  # FIXED: table__branch
         )
 
+    orders = orders.order_by('placed_at', 'id')
+
+    # ?output=csv|jsonl streams every unpaid order as flat rows
+    output = request.query_params.get('output')
+    if output:
+        if output not in STREAM_FORMATS:
+            return Response({'error': 'output must be csv or jsonl'}, status=400)
+        rows = orders.values(*PENDING_ORDER_COLUMNS).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        return streaming_response(rows, PENDING_ORDER_COLUMNS, output,
+                                  filename='pending_orders')
+
+    totals = orders.aggregate(count=Count('id'), total_amount=Sum('total_amount'))
+
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', PENDING_ORDERS_PAGE_SIZE)),
+                           PENDING_ORDERS_PAGE_SIZE))
+        offset = max(int(request.query_params.get('offset', 0)), 0)
+    except ValueError:
+        return Response({'error': 'limit and offset must be integers'}, status=400)
+
     from tables.serializers import OrderSerializer
-    serializer = OrderSerializer(orders, many=True)
+    page = orders.select_related('table', 'waiter').prefetch_related(
+        'items__menu_item')[offset:offset + limit]
+    serializer = OrderSerializer(page, many=True)
+    next_offset = offset + limit if offset + limit < totals['count'] else None
 
     return Response({
         'orders': serializer.data,
-        'count': orders.count(),
-        'total_amount': sum(order.total_amount for order in orders)
+        'count': totals['count'],
+        'total_amount': totals['total_amount'] or Decimal('0.00'),
+        'next_offset': next_offset,
     })
 
 
@@ -406,83 +444,7 @@ def cashier_pending_orders(request):
 
 def generate_receipt_html(payment, change=0):
     """Generate receipt HTML"""
-    order = payment.order
-    change_decimal = Decimal(str(change)) if change else Decimal('0.00')
-
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>Receipt {payment.payment_id}</title>
-        <style>
-            body {{ font-family: 'Courier New', monospace; font-size: 12px; margin: 0; padding: 0; width: 80mm; }}
-            .receipt {{ padding: 5mm; }}
-            .header {{ text-align: center; margin-bottom: 10px; }}
-            .company-name {{ font-weight: bold; font-size: 14px; }}
-            .divider {{ border-top: 1px dashed #000; margin: 8px 0; }}
-            .item-row {{ display: flex; justify-content: space-between; }}
-            .total-row {{ font-weight: bold; }}
-            .footer {{ text-align: center; margin-top: 15px; font-size: 10px; }}
-        </style>
-    </head>
-    <body>
-        <div class="receipt">
-            <div class="header">
-                <div class="company-name">RESTAURANT ORDERING SYSTEM</div>
-                <div>Payment Receipt</div>
-            </div>
-            
-            <div class="divider"></div>
-            
-            <div class="receipt-info">
-                <div class="item-row">
-                    <span>Receipt:</span>
-                    <span>{payment.payment_id}</span>
-                </div>
-                <div class="item-row">
-                    <span>Date:</span>
-                    <span>{payment.processed_at.strftime('%Y-%m-%d %H:%M:%S') if payment.processed_at else timezone.now().strftime('%Y-%m-%d %H:%M:%S')}</span>
-                </div>
-                <div class="item-row">
-                    <span>Order:</span>
-                    <span>#{order.order_number}</span>
-                </div>
-                <div class="item-row">
-                    <span>Table:</span>
-                    <span>{order.table.table_number if order.table else 'N/A'}</span>
-                </div>
-            </div>
-            
-            <div class="divider"></div>
-            
-            <div class="payment-details">
-                <div class="item-row">
-                    <span>Payment Method:</span>
-                    <span>{payment.get_payment_method_display()}</span>
-                </div>
-                <div class="item-row">
-                    <span>Amount Paid:</span>
-                    <span>${payment.amount}</span>
-                </div>
-                {f'<div class="item-row"><span>Change:</span><span>${change_decimal}</span></div>' if change_decimal > Decimal("0.00") else ''}
-                <div class="item-row">
-                    <span>Cashier:</span>
-                    <span>{payment.processed_by.username if payment.processed_by else 'System'}</span>
-                </div>
-            </div>
-            
-            <div class="divider"></div>
-            
-            <div class="footer">
-                <div>Thank you for your payment!</div>
-                <div>Receipt ID: {payment.payment_id}</div>
-                <div>Generated: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return render_receipt(build_receipt_context(payment, change), 'html')
 
 
 # ============ OTHER ENDPOINTS (KEEP FOR COMPATIBILITY) ============
@@ -490,28 +452,40 @@ def generate_receipt_html(payment, change=0):
 @api_view(['GET'])
 @permission_classes([IsCashierOrHigher])
 def print_receipt(request, payment_id):
-    """Print receipt view"""
-    try:
-        payment = Payment.objects.get(payment_id=payment_id)
-
-        # Generate receipt if not exists
-        if not hasattr(payment, 'receipt'):
-            receipt = Receipt.objects.create(
-                payment=payment,
-                html_content=generate_receipt_html(payment)
-            )
-        else:
-            receipt = payment.receipt
+    """Print receipt view (?output=escpos returns thermal printer bytes)"""
+    fmt = request.query_params.get('output', 'html')
+    if fmt not in ('html', 'escpos'):
+        return Response({'error': 'output must be html or escpos'}, status=400)
 
-        # Mark as printed
-        receipt.mark_printed(user=request.user)
+    receipt = Receipt.objects.filter(payment__payment_id=payment_id).first()
 
-        # Return HTML for printing
-        from django.http import HttpResponse
-        return HttpResponse(receipt.html_content)
-
-    except Payment.DoesNotExist:
-        return Response({'error': 'Payment not found'}, status=404)
+    if receipt is None or (fmt == 'escpos' and not receipt.context):
+        try:
+            payment = Payment.objects.select_related(
+                'order__table', 'processed_by').get(payment_id=payment_id)
+        except Payment.DoesNotExist:
+            return Response({'error': 'Payment not found'}, status=404)
+
+        if receipt is None:
+            # Generate receipt if not exists
+            receipt = create_receipt(payment)
+        else:
+            # Legacy HTML-only receipt: store its context once
+            receipt.context = build_receipt_context(
+                payment, receipt_number=receipt.receipt_number)
+            receipt.content_hash = context_hash(receipt.context)
+            receipt.save(update_fields=['context', 'content_hash'])
+
+    # Mark as printed
+    receipt.mark_printed(user=request.user)
+
+    from django.http import HttpResponse
+    if fmt == 'escpos':
+        return HttpResponse(receipt.render('escpos'),
+                            content_type='application/octet-stream')
+
+    # Return HTML for printing
+    return HttpResponse(receipt.render('html'))
 
 
 @api_view(['POST'])
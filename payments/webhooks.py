@@ -1,15 +1,56 @@
 # payments/webhooks.py - Industry standard webhook handling
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.http import HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
+from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 import hmac
 import hashlib
 import json
+import logging
+import threading
+import time
+
+from .models import Payment, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _webhook_settings():
+    payment_settings = getattr(settings, 'PAYMENT_SETTINGS', {})
+    return {
+        'cbe_secret': payment_settings.get('CBE_WEBHOOK_SECRET', ''),
+        'async_processing': payment_settings.get('WEBHOOK_ASYNC_PROCESSING', True),
+        'max_attempts': payment_settings.get('WEBHOOK_MAX_ATTEMPTS', 5),
+    }
+
+
+def verify_cbe_signature(payload, signature):
+    """Check the HMAC-SHA256 signature CBE sends in X-CBE-Signature"""
+    secret = _webhook_settings()['cbe_secret']
+    if not secret:
+        # No secret configured: only accept unsigned calls in development
+        return settings.DEBUG
+
+    if not signature:
+        return False
+
+    expected = hmac.new(secret.encode('utf-8'), payload,
+                        hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
 
 
 @csrf_exempt
 @require_POST
 def cbe_webhook(request):
-    """CBE payment webhook - INDUSTRY STANDARD"""
+    """CBE payment webhook - INDUSTRY STANDARD
+
+    Only stores the event in the WebhookEvent inbox and acknowledges.
+    Duplicate deliveries are rejected by the (gateway, event_id) unique key
+    and the payment/order updates happen in process_webhook_events().
+    """
     # 1. Verify signature
     signature = request.headers.get('X-CBE-Signature')
     payload = request.body
@@ -17,27 +58,183 @@ def cbe_webhook(request):
     if not verify_cbe_signature(payload, signature):
         return HttpResponseForbidden('Invalid signature')
 
-    # 2. Parse and validate payload
-    data = json.loads(payload)
-    payment_id = data.get('payment_id')
-    status = data.get('status')
-
-    # 3. Update payment status
-    payment = Payment.objects.get(payment_id=payment_id)
-    payment.gateway_response = data
-    payment.transaction_id = data.get('transaction_id')
-
-    if status == 'SUCCESS':
-        payment.mark_as_completed()
-        # Update order
-        payment.order.mark_paid('cbe', payment_id)
-        # Update table
-        if payment.order.table:
-            payment.order.table.status = 'cleaning'
-            payment.order.table.save()
-
-    elif status == 'FAILED':
+    # 2. Parse payload
+    try:
+        data = json.loads(payload)
+    except (TypeError, ValueError):
+        return HttpResponseBadRequest('Invalid JSON payload')
+
+    # Gateway retries reuse the event id; fall back to the payload hash
+    event_id = (data.get('event_id')
+                or request.headers.get('X-CBE-Event-Id')
+                or hashlib.sha256(payload).hexdigest())
+
+    # 3. Store in the inbox (the unique key rejects duplicates)
+    try:
+        with transaction.atomic():
+            WebhookEvent.objects.create(
+                gateway='cbe',
+                event_id=str(event_id)[:100],
+                payment_ref=str(data.get('payment_id') or '')[:100],
+                gateway_status=str(data.get('status') or '')[:30],
+                payload=data,
+            )
+    except IntegrityError:
+        return JsonResponse({'success': True, 'duplicate': True})
+
+    transaction.on_commit(schedule_webhook_processing)
+
+    return JsonResponse({'success': True})
+
+
+# ============ INBOX PROCESSING ============
+
+DRAIN_BATCH = 500  # events selected per pass
+DRAIN_RETRIES = 3  # failed passes in a row before the drainer gives up
+
+_processing_lock = threading.Lock()
+_processing_requested = threading.Event()
+
+
+def schedule_webhook_processing():
+    """Drain the inbox on a background thread (one drainer per process)"""
+    if not _webhook_settings()['async_processing']:
+        return
+
+    _processing_requested.set()
+    if not _processing_lock.acquire(blocking=False):
+        # The running drainer will pick up the new events
+        return
+
+    threading.Thread(target=_drain, name='webhook-inbox',
+                     daemon=True).start()
+
+
+def _drain():
+    """Process the inbox until no pass is requested; runs holding _processing_lock"""
+    failures = 0
+    while True:
+        try:
+            while _processing_requested.is_set():
+                _processing_requested.clear()
+                if process_webhook_events(DRAIN_BATCH) >= DRAIN_BATCH:
+                    # A full pass may have left events behind
+                    _processing_requested.set()
+                failures = 0
+        except Exception as e:
+            failures += 1
+            logger.error(f"Webhook processing error: {str(e)}", exc_info=True)
+            # The pass's events are still pending: retry, but not forever
+            if failures < DRAIN_RETRIES:
+                _processing_requested.set()
+                time.sleep(failures)
+        finally:
+            close_old_connections()
+            _processing_lock.release()
+
+        # A webhook committed after the last check found the lock still held
+        # and left its event to us
+        if not _processing_requested.is_set() or not _processing_lock.acquire(blocking=False):
+            return
+
+
+def process_webhook_events(limit=DRAIN_BATCH):
+    """
+    Apply received (and retryable failed) inbox events.
+
+    Events are claimed per payment and applied oldest first, so a payment
+    never sees its events out of order. Returns the number processed.
+    """
+    max_attempts = _webhook_settings()['max_attempts']
+
+    payment_refs = list(
+        WebhookEvent.objects.filter(
+            status__in=CLAIMABLE_STATUSES,
+            attempts__lt=max_attempts
+        ).order_by('received_at').values_list('payment_ref', flat=True)[:limit]
+    )
+
+    processed = 0
+    # Preserve order while dropping repeated refs
+    for payment_ref in dict.fromkeys(payment_refs):
+        processed += _process_payment_events(payment_ref, max_attempts)
+
+    return processed
+
+
+# The claim (a row lock) and the apply share one transaction, so a crash
+# between them rolls the claim back with the apply and the event is simply
+# picked up again.
+CLAIMABLE_STATUSES = ['received', 'failed']
+
+
+def _process_payment_events(payment_ref, max_attempts):
+    """Claim and apply all pending events for one payment, in order"""
+    event_ids = list(
+        WebhookEvent.objects.filter(
+            payment_ref=payment_ref,
+            status__in=CLAIMABLE_STATUSES,
+            attempts__lt=max_attempts
+        ).order_by('received_at', 'id').values_list('id', flat=True)
+    )
+
+    processed = 0
+    for event_id in event_ids:
+        event = None
+        try:
+            with transaction.atomic():
+                # A locked event is being applied by a concurrent drainer,
+                # which then owns this payment's later events too
+                event = WebhookEvent.objects.select_for_update(skip_locked=True).filter(
+                    id=event_id, status__in=CLAIMABLE_STATUSES).first()
+                if event is None:
+                    break
+
+                apply_webhook_event(event)
+
+                event.status = 'processed'
+                event.attempts += 1
+                event.last_error = ''
+                event.processed_at = timezone.now()
+                event.save(update_fields=['status', 'attempts', 'last_error', 'processed_at'])
+        except Exception as e:
+            logger.error(
+                f"Webhook event {event.event_id if event else event_id} failed: {str(e)}",
+                exc_info=True)
+            WebhookEvent.objects.filter(id=event_id).update(
+                status='failed',
+                attempts=F('attempts') + 1,
+                last_error=str(e)
+            )
+            # Later events for this payment wait for the retry
+            break
+
+        processed += 1
+
+    return processed
+
+
+def apply_webhook_event(event):
+    """Apply one gateway event to its payment (idempotent)"""
+    data = event.payload
+    payment = Payment.objects.select_for_update().get(
+        payment_id=event.payment_ref)
+
+    # Already settled - a retried or late event must not touch it again
+    if payment.status != 'pending':
+        return payment
+
+    if event.gateway_status == 'SUCCESS':
+        # Signals complete the order and free the table
+        payment.mark_as_completed(
+            transaction_id=data.get('transaction_id'),
+            gateway_response=data
+        )
+
+    elif event.gateway_status == 'FAILED':
         payment.status = 'failed'
+        payment.gateway_response = data
+        payment.transaction_id = data.get('transaction_id')
         payment.save()
 
-    return JsonResponse({'success': True})
+    return payment
@@ -0,0 +1,280 @@
+# profit_intelligence/alert_rules.py
+"""
+Profit alert rules.
+
+Alerts are generated on a schedule (the 'profit.alerts' job or the
+evaluate_profit_alerts command), not on every write, so their cost does
+not grow with order or waste volume. A run evaluates one day:
+
+1. one query loads the day's daily ProfitAggregation rows of every
+   branch, plus the same weekday of the previous BASELINE_WEEKS weeks
+   (the baseline of the drop rules); one query does the same for
+   MenuItemPerformance
+2. every AlertRule is checked in memory against each branch (and
+   restaurant-wide) scope - per scope for branch rules, per menu item for
+   item rules
+3. one query loads the open and recent rule alerts: a rule fires again for
+   the same scope/item only once its alert is resolved and its cooldown
+   has passed
+4. new alerts are written with one bulk_create; open auto-resolving
+   alerts whose rule no longer fires are resolved with one UPDATE
+
+Thresholds and cooldowns are overridable per rule with the
+PROFIT_ALERT_RULES setting: {'low_margin': {'threshold': 12}, ...}.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import MenuItemPerformance, ProfitAggregation, ProfitAlert
+
+logger = logging.getLogger(__name__)
+
+BASELINE_WEEKS = 4
+MIN_BASELINE_DAYS = 2  # same-weekday history needed by the drop rules
+
+
+# ============ METRICS ============
+# A metric takes the scope's row of the day (a values() dict) and the same
+# weekday's rows of previous weeks; it returns the value the threshold is
+# compared with, or None when it does not apply.
+
+def _field(name):
+    def metric(row, history):
+        return row[name]
+    return metric
+
+
+def _margin(row, history):
+    # A day (or item) without sales has no margin to speak of
+    return row['profit_margin'] if row['revenue'] else None
+
+
+def _change_vs_weekday(name, minimum_baseline=0):
+    """% change of a field against its same-weekday average"""
+    def metric(row, history):
+        if len(history) < MIN_BASELINE_DAYS:
+            return None
+        baseline = sum(past[name] for past in history) / len(history)
+        if baseline <= minimum_baseline:
+            return None
+        return (Decimal(row[name]) - Decimal(baseline)) / Decimal(baseline) * 100
+    return metric
+
+
+# ============ RULES ============
+
+class AlertRule:
+    """
+    A declarative alert: fires when metric(row, history) is below
+    (direction 'below') or above the threshold, escalating from severity
+    to escalated_severity past escalate_at.
+    """
+
+    def __init__(self, name, source, alert_type, metric, threshold, title,
+                 direction='below', severity='medium', escalate_at=None,
+                 escalated_severity='high', cooldown_hours=24):
+        self.name = name
+        self.source = source  # 'aggregation' (per branch) or 'item' (per menu item)
+        self.alert_type = alert_type
+        self.metric = metric
+        self.threshold = Decimal(str(threshold))
+        self.title = title
+        self.direction = direction
+        self.severity = severity
+        self.escalate_at = Decimal(str(escalate_at)) if escalate_at is not None else None
+        self.escalated_severity = escalated_severity
+        self.cooldown_hours = cooldown_hours
+
+    def configured(self, overrides):
+        """A copy of the rule with settings overrides applied"""
+        rule = AlertRule.__new__(AlertRule)
+        rule.__dict__.update(self.__dict__)
+        for key, value in overrides.items():
+            if key in ('threshold', 'escalate_at') and value is not None:
+                value = Decimal(str(value))
+            setattr(rule, key, value)
+        return rule
+
+    def _breaches(self, value, bound):
+        return value < bound if self.direction == 'below' else value > bound
+
+    def check(self, row, history):
+        """(value, severity) if the rule fires for the row, else None"""
+        value = self.metric(row, history)
+        if value is None or not self._breaches(Decimal(value), self.threshold):
+            return None
+        value = Decimal(value).quantize(Decimal('0.01'))
+        if self.escalate_at is not None and self._breaches(value, self.escalate_at):
+            return value, self.escalated_severity
+        return value, self.severity
+
+
+RULES = [
+    AlertRule('low_margin', 'aggregation', 'low_margin', _margin, 15,
+              'Profit margin {value}% is below {threshold}%',
+              escalate_at=5),
+    AlertRule('waste_spike', 'aggregation', 'waste_spike', _field('waste_percentage'), 10,
+              'Waste is {value}% of cost of goods (limit {threshold}%)',
+              direction='above', escalate_at=20),
+    AlertRule('revenue_drop', 'aggregation', 'performance_drop',
+              _change_vs_weekday('revenue'), -25,
+              'Revenue {value}% vs the same weekday average',
+              escalate_at=-50),
+    AlertRule('item_loss_maker', 'item', 'loss_maker', _margin, 0,
+              '{item} is selling at a loss (margin {value}%)',
+              severity='high', escalate_at=-20, escalated_severity='critical',
+              cooldown_hours=72),
+    AlertRule('item_low_margin', 'item', 'low_margin', _margin, 15,
+              '{item} margin {value}% is below {threshold}%',
+              severity='low', cooldown_hours=24 * 7),
+    AlertRule('item_demand_drop', 'item', 'demand_drop',
+              _change_vs_weekday('quantity_sold', minimum_baseline=5), -50,
+              '{item} sales {value}% vs the same weekday average',
+              severity='low', escalate_at=-80, escalated_severity='medium',
+              cooldown_hours=72),
+]
+
+
+def active_rules():
+    overrides = getattr(settings, 'PROFIT_ALERT_RULES', {})
+    rules = []
+    for rule in RULES:
+        rule = rule.configured(overrides.get(rule.name, {}))
+        if getattr(rule, 'enabled', True):
+            rules.append(rule)
+    return rules
+
+
+# ============ EVALUATION ============
+
+AGGREGATION_FIELDS = ['id', 'date', 'restaurant_id', 'branch_id', 'revenue',
+                      'profit_margin', 'waste_percentage']
+ITEM_FIELDS = ['id', 'date', 'restaurant_id', 'branch_id', 'menu_item_id',
+               'menu_item__name', 'quantity_sold', 'revenue', 'profit_margin']
+
+
+def _load(queryset, fields, date, key):
+    """{key(row): (row of the date, [same-weekday rows of previous weeks])}"""
+    days = [date - timedelta(weeks=week) for week in range(BASELINE_WEEKS + 1)]
+    current, history = {}, defaultdict(list)
+    for row in queryset.filter(date__in=days).values(*fields).order_by():
+        if row['date'] == date:
+            current[key(row)] = row
+        else:
+            history[key(row)].append(row)
+    return {row_key: (row, history[row_key]) for row_key, row in current.items()}
+
+
+def _alert_key(rule_name, restaurant_id, branch_id, menu_item_id):
+    return (rule_name, restaurant_id, branch_id, menu_item_id)
+
+
+def evaluate_alerts(date=None, restaurant_ids=None, dry_run=False):
+    """
+    Evaluate every active rule for a day (yesterday by default) across all
+    branches. Returns counts of the alerts fired, suppressed, created and
+    resolved.
+    """
+    date = date or timezone.now().date() - timedelta(days=1)
+    now = timezone.now()
+    rules = active_rules()
+
+    aggregations = ProfitAggregation.objects.filter(level='daily')
+    performances = MenuItemPerformance.objects.all()
+    if restaurant_ids:
+        aggregations = aggregations.filter(restaurant_id__in=restaurant_ids)
+        performances = performances.filter(restaurant_id__in=restaurant_ids)
+
+    sources = {
+        'aggregation': _load(aggregations, AGGREGATION_FIELDS, date,
+                             lambda row: (row['restaurant_id'], row['branch_id'], None)),
+        'item': _load(performances, ITEM_FIELDS, date,
+                      lambda row: (row['restaurant_id'], row['branch_id'], row['menu_item_id'])),
+    }
+
+    fired = {}
+    for rule in rules:
+        for (restaurant_id, branch_id, menu_item_id), (row, history) in sources[rule.source].items():
+            result = rule.check(row, history)
+            if result:
+                fired[_alert_key(rule.name, restaurant_id, branch_id, menu_item_id)] = (rule, row, result)
+
+    # Open alerts and alerts still in their cooldown, of every rule
+    cooldowns = {rule.name: timedelta(hours=rule.cooldown_hours) for rule in rules}
+    recent = ProfitAlert.objects.filter(
+        Q(is_resolved=False) | Q(created_at__gte=now - max(cooldowns.values(), default=timedelta(0))),
+        details__has_key='rule')
+    if restaurant_ids:
+        recent = recent.filter(restaurant_id__in=restaurant_ids)
+
+    suppressed = set()
+    open_auto_resolving = {}
+    for alert_id, details, restaurant_id, branch_id, menu_item_id, is_resolved, auto_resolve, created_at in \
+            recent.values_list('id', 'details', 'restaurant_id', 'branch_id', 'menu_item_id',
+                               'is_resolved', 'auto_resolve', 'created_at'):
+        key = _alert_key(details.get('rule'), restaurant_id, branch_id, menu_item_id)
+        cooldown = cooldowns.get(details.get('rule'))
+        if not is_resolved or (cooldown is not None and created_at >= now - cooldown):
+            suppressed.add(key)
+        if not is_resolved and auto_resolve and details.get('date') != date.isoformat():
+            open_auto_resolving[key] = alert_id
+
+    new_alerts = [
+        _build_alert(rule, row, value, severity, date)
+        for key, (rule, row, (value, severity)) in fired.items()
+        if key not in suppressed
+    ]
+    # Evaluated scopes whose rule stopped firing
+    evaluated = {(rule.name,) + scope for rule in rules for scope in sources[rule.source]}
+    to_resolve = [alert_id for key, alert_id in open_auto_resolving.items()
+                  if key in evaluated and key not in fired]
+
+    if not dry_run:
+        with transaction.atomic():
+            ProfitAlert.objects.bulk_create(new_alerts, batch_size=500)
+            if to_resolve:
+                ProfitAlert.objects.filter(id__in=to_resolve, is_resolved=False).update(
+                    is_resolved=True, resolved_at=now, updated_at=now,
+                    resolution_notes=f"Auto-resolved: rule no longer fired on {date}")
+
+    logger.info(f"Profit alerts for {date}: {len(fired)} fired, {len(new_alerts)} new, "
+                f"{len(to_resolve)} resolved")
+    return {
+        'date': date.isoformat(),
+        'rules': len(rules),
+        'scopes': len(sources['aggregation']),
+        'items': len(sources['item']),
+        'fired': len(fired),
+        'suppressed': len(fired) - len(new_alerts),
+        'created': len(new_alerts),
+        'resolved': len(to_resolve),
+        'dry_run': dry_run,
+    }
+
+
+def _build_alert(rule, row, value, severity, date):
+    item_name = row.get('menu_item__name')
+    title = rule.title.format(value=value, threshold=rule.threshold, item=item_name)
+    scope = f"{item_name} on {date}" if item_name else f"{date}"
+    return ProfitAlert(
+        alert_type=rule.alert_type,
+        severity=severity,
+        title=title[:200],
+        message=f"{title} ({scope}). Threshold: {rule.threshold}.",
+        details={'rule': rule.name, 'date': date.isoformat(), 'source_id': row['id']},
+        menu_item_id=row.get('menu_item_id'),
+        current_value=value,
+        threshold=rule.threshold,
+        deviation=value - rule.threshold,
+        auto_resolve=True,
+        auto_resolve_condition={'rule': rule.name, rule.direction: str(rule.threshold)},
+        restaurant_id=row['restaurant_id'],
+        branch_id=row['branch_id'],
+    )
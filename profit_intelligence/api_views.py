@@ -1,10 +1,10 @@
 # profit_intelligence/api_views.py
 from waste_tracker.models import WasteRecord
 from menu.models import MenuItem
-from tables.models import Order, OrderItem
+from tables.models import Order
 from inventory.models import StockItem, StockTransaction
 from .models import ProfitAggregation, MenuItemPerformance, ProfitAlert
-from django.db.models import Sum, Count, Avg, Q, F
+from django.db.models import Sum, Count, Avg, Q
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -17,7 +17,9 @@ from httpcore import Request, Response as HTTPResponse
 
 
 from .business_logic import ProfitDashboardAPI, ProfitCalculator
+from .snapshot import SECTIONS, build_snapshot, daily_change
 from accounts.permissions import IsManagerOrAdmin
+from core.caching import cached_view
 from django.db.models import Count
 
 
@@ -30,6 +32,7 @@ class ProfitDashboardAPIView(APIView):
     """
     permission_classes = [IsAuthenticated, IsManagerOrAdmin]
 
+    @cached_view(timeout=120, topics=('orders', 'waste', 'menu'))
     def get(self, request):
         try:
             user = request.user
@@ -84,6 +87,101 @@ class ProfitDashboardAPIView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class DashboardSnapshotAPIView(APIView):
+    """
+    All profit dashboard sections in one payload, computed in parallel
+
+    Query params: view_level, branch_id, sections (comma separated),
+    timeout (seconds to wait for uncached sections).
+    """
+    permission_classes = [IsAuthenticated, IsManagerOrAdmin]
+
+    def get(self, request):
+        try:
+            user = request.user
+
+            if not user.restaurant:
+                return Response({
+                    'success': False,
+                    'error': 'User not assigned to a restaurant'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            view_level = request.GET.get('view_level', 'branch')
+            if view_level not in ['branch', 'restaurant']:
+                view_level = 'branch'
+
+            branch = None
+            if view_level == 'branch':
+                branch_id = request.GET.get('branch_id')
+                if branch_id:
+                    from restaurants.models import Branch
+                    branch = Branch.objects.filter(
+                        id=branch_id, restaurant=user.restaurant).first()
+                    if not branch:
+                        return Response({
+                            'success': False,
+                            'error': 'Branch not found'
+                        }, status=status.HTTP_404_NOT_FOUND)
+                else:
+                    branch = user.branch
+
+            sections = None
+            if request.GET.get('sections'):
+                sections = [name.strip()
+                            for name in request.GET['sections'].split(',')]
+                unknown = [name for name in sections if name not in SECTIONS]
+                if unknown:
+                    return Response({
+                        'success': False,
+                        'error': f"Unknown sections: {', '.join(unknown)}",
+                        'available': list(SECTIONS)
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+            timeout = None
+            if request.GET.get('timeout'):
+                timeout = min(max(float(request.GET['timeout']), 0), 30)
+
+            snapshot = build_snapshot(
+                user.restaurant, branch, sections=sections, timeout=timeout)
+            data = snapshot['sections']
+
+            return Response({
+                'success': True,
+                'timestamp': timezone.now().isoformat(),
+                'view': {
+                    'level': view_level,
+                    'restaurant': {
+                        'id': user.restaurant.id,
+                        'name': user.restaurant.name
+                    },
+                    'branch': {
+                        'id': branch.id,
+                        'name': branch.name
+                    } if branch else None
+                },
+                'partial': snapshot['partial'],
+                'pending': snapshot['pending'],
+                'errors': snapshot['errors'],
+                'cached': snapshot['cached'],
+                'elapsed_ms': snapshot['elapsed_ms'],
+                'sections': data,
+                'daily_change': daily_change(data.get('today'), data.get('yesterday'))
+            })
+
+        except ValueError:
+            return Response({
+                'success': False,
+                'error': 'timeout must be a number'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Dashboard snapshot error: {str(e)}", exc_info=True)
+            return Response({
+                'success': False,
+                'error': 'Failed to load dashboard snapshot',
+                'details': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class DailyProfitAPIView(APIView):
     """
     Get daily profit for a specific date or date range
@@ -208,7 +306,7 @@ class MenuItemProfitAPIView(APIView):
 
     def get(self, request):
         try:
-            from .models import MenuItemPerformance
+            from .menu_engineering import scoped_performances
             from django.db.models import Sum
 
             user = request.user
@@ -218,15 +316,12 @@ class MenuItemProfitAPIView(APIView):
             end_date = timezone.now().date()
             start_date = end_date - timedelta(days=days)
 
-            # Get menu item performances
-            performances = MenuItemPerformance.objects.filter(
-                date__gte=start_date,
-                date__lte=end_date,
-                restaurant=user.restaurant
-            )
-
+            # Same row source as the menu engineering matrix: no day counted twice
+            branch_id = None
             if request.GET.get('view_level', 'branch') == 'branch' and user.branch:
-                performances = performances.filter(branch=user.branch)
+                branch_id = user.branch.id
+            performances = scoped_performances(
+                user.restaurant.id, branch_id, start_date, end_date)
 
             # Aggregate by menu item
             from django.db.models import Avg, Count
@@ -854,42 +949,15 @@ class SalesDataAPIView(APIView):
             user = request.user
             days = int(request.GET.get('days', 7))
 
-            end_date = timezone.now().date()
-            start_date = end_date - timedelta(days=days)
-
-            # Get sales data for each day
-            sales_data = []
-            current_date = start_date
-
-            while current_date <= end_date:
-                # Get orders for this day
-                orders = Order.objects.filter(
-                    completed_at__date=current_date,
-                    is_paid=True,
-                    table__branch__restaurant=user.restaurant
-                )
-
-                if user.branch and request.GET.get('view_level', 'branch') == 'branch':
-                    orders = orders.filter(table__branch=user.branch)
-
-                total_sales = orders.aggregate(
-                    total=Sum('total_amount'))['total'] or 0
-                order_count = orders.count()
-
-                sales_data.append({
-                    'date': current_date.isoformat(),
-                    'day_name': current_date.strftime('%a'),
-                    'total': float(total_sales),
-                    'orders': order_count,
-                    'avg_order_value': float(total_sales / order_count) if order_count > 0 else 0
-                })
-
-                current_date += timedelta(days=1)
+            branch = None
+            if user.branch and request.GET.get('view_level', 'branch') == 'branch':
+                branch = user.branch
 
             return Response({
                 'success': True,
                 'days': days,
-                'data': sales_data
+                'data': ProfitDashboardAPI.get_sales_data(
+                    user.restaurant, branch, days)
             })
 
         except Exception as e:
@@ -911,43 +979,11 @@ class PopularItemsAPIView(APIView):
             user = request.user
             days = int(request.GET.get('days', 7))
 
-            start_date = timezone.now().date() - timedelta(days=days)
-
-            # Get popular items from order items
-            from tables.models import OrderItem
-            from menu.models import MenuItem
-
-            popular_items = OrderItem.objects.filter(
-                order__completed_at__date__gte=start_date,
-                order__is_paid=True,
-                order__table__branch__restaurant=user.restaurant
-            ).values(
-                'menu_item__id',
-                'menu_item__name',
-                'menu_item__category__name',
-                'menu_item__price',
-                'menu_item__image'
-            ).annotate(
-                total_sold=Sum('quantity'),
-                total_revenue=Sum(F('quantity') * F('unit_price'))
-            ).order_by('-total_sold')[:10]
-
-            items = []
-            for item in popular_items:
-                items.append({
-                    'id': item['menu_item__id'],
-                    'name': item['menu_item__name'],
-                    'category': item['menu_item__category__name'],
-                    'price': float(item['menu_item__price']),
-                    'image': item['menu_item__image'] if item['menu_item__image'] else None,
-                    'sold': item['total_sold'],
-                    'revenue': float(item['total_revenue'])
-                })
-
             return Response({
                 'success': True,
                 'days': days,
-                'items': items
+                'items': ProfitDashboardAPI.get_popular_items(
+                    user.restaurant, days)
             })
 
         except Exception as e:
@@ -969,77 +1005,144 @@ class RecentActivityAPIView(APIView):
             user = request.user
             limit = int(request.GET.get('limit', 10))
 
-            activities = []
-
-            # Get recent orders
-            recent_orders = Order.objects.filter(
-                table__branch__restaurant=user.restaurant,
-                completed_at__isnull=False
-            ).order_by('-completed_at')[:5]
-
-            for order in recent_orders:
-                activities.append({
-                    'type': 'order',
-                    'icon': 'shopping-cart',
-                    'title': f'Order #{order.order_number} Completed',
-                    'description': f'Table {order.table.table_number if order.table else "Unknown"} - ${order.total_amount:.2f}',
-                    'time': order.completed_at,
-                    'amount': float(order.total_amount)
-                })
+            return Response({
+                'success': True,
+                'activities': ProfitDashboardAPI.get_recent_activity(
+                    user.restaurant, limit)
+            })
 
-            # Get recent waste records
-            from waste_tracker.models import WasteRecord
-            recent_waste = WasteRecord.objects.filter(
-                branch__restaurant=user.restaurant,
-                status='approved'
-            ).order_by('-recorded_at')[:5]
-
-            for waste in recent_waste:
-                activities.append({
-                    'type': 'waste',
-                    'icon': 'trash',
-                    'title': f'Waste Recorded',
-                    'description': f'{waste.stock_item.name if waste.stock_item else "Unknown Item"} - {waste.waste_reason.name}',
-                    'time': waste.recorded_at,
-                    'amount': -float(waste.total_cost) if waste.total_cost else 0
-                })
+        except Exception as e:
+            logger.error(f"Recent activity API error: {str(e)}", exc_info=True)
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _ranked_scope(request):
+    """(restaurant_id, branch_id, date) of a ranked-performance request"""
+    from django.db.models import Max
+    from django.utils.dateparse import parse_date
+
+    user = request.user
+    branch_id = None
+    if request.GET.get('view_level', 'branch') == 'branch' and user.branch:
+        branch_id = user.branch.id
+
+    date = parse_date(request.GET.get('date', '') or '')
+    if date is None:
+        # Latest day with data in the scope
+        date = MenuItemPerformance.objects.filter(
+            restaurant=user.restaurant, branch_id=branch_id
+        ).aggregate(latest=Max('date'))['latest']
+    return user.restaurant.id, branch_id, date
+
+
+class TopItemsAPIView(APIView):
+    """
+    Top menu items of a day by precomputed revenue, profit or margin rank
+    """
+    permission_classes = [IsAuthenticated, IsManagerOrAdmin]
+
+    RANKS = {'revenue': 'revenue_rank', 'profit': 'profit_rank', 'margin': 'margin_rank'}
 
-            # Sort by time and limit
-            activities.sort(key=lambda x: x['time'], reverse=True)
-            activities = activities[:limit]
+    def get(self, request):
+        try:
+            from .rankings import ranked_performances
+            from .serializers import MenuItemPerformanceSerializer
 
-            # Format times for display
-            for activity in activities:
-                activity['time'] = self._format_time_difference(
-                    activity['time'])
+            rank_by = self.RANKS.get(request.GET.get('rank_by', 'revenue'))
+            if rank_by is None:
+                return Response({
+                    'success': False,
+                    'error': f"rank_by must be one of: {', '.join(self.RANKS)}"
+                }, status=status.HTTP_400_BAD_REQUEST)
+            limit = min(int(request.GET.get('limit', 10)), 100)
+
+            restaurant_id, branch_id, date = _ranked_scope(request)
+            items = ranked_performances(
+                date, restaurant_id, branch_id, rank_by, limit) if date else []
 
             return Response({
                 'success': True,
-                'activities': activities
+                'date': date.isoformat() if date else None,
+                'rank_by': rank_by,
+                'items': MenuItemPerformanceSerializer(items, many=True).data
             })
 
         except Exception as e:
-            logger.error(f"Recent activity API error: {str(e)}", exc_info=True)
+            logger.error(f"Top items API error: {str(e)}", exc_info=True)
             return Response({
                 'success': False,
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _format_time_difference(self, dt):
-        """Format datetime as time difference string"""
-        if not dt:
-            return "Unknown"
-
-        now = timezone.now()
-        diff = now - dt
-
-        if diff.days > 0:
-            return f"{diff.days}d ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours}h ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes}m ago"
-        else:
-            return "Just now"
+
+class TrendingItemsAPIView(APIView):
+    """
+    Menu items whose sales moved most against the previous day
+    """
+    permission_classes = [IsAuthenticated, IsManagerOrAdmin]
+
+    def get(self, request):
+        try:
+            from .serializers import MenuItemPerformanceSerializer
+
+            direction = request.GET.get('direction', 'up')
+            if direction not in ('up', 'down'):
+                return Response({
+                    'success': False,
+                    'error': 'direction must be up or down'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            limit = min(int(request.GET.get('limit', 10)), 100)
+
+            restaurant_id, branch_id, date = _ranked_scope(request)
+            items = MenuItemPerformance.objects.filter(
+                restaurant_id=restaurant_id, branch_id=branch_id, date=date,
+                trend=direction
+            ).select_related('menu_item__category', 'restaurant', 'branch').order_by(
+                '-quantity_change' if direction == 'up' else 'quantity_change'
+            )[:limit] if date else []
+
+            return Response({
+                'success': True,
+                'date': date.isoformat() if date else None,
+                'direction': direction,
+                'items': MenuItemPerformanceSerializer(items, many=True).data
+            })
+
+        except Exception as e:
+            logger.error(f"Trending items API error: {str(e)}", exc_info=True)
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MenuEngineeringAPIView(APIView):
+    """
+    Menu engineering matrix: stars, plowhorses, puzzles and dogs
+    """
+    permission_classes = [IsAuthenticated, IsManagerOrAdmin]
+
+    def get(self, request):
+        try:
+            from .menu_engineering import get_menu_engineering
+
+            user = request.user
+            days = min(max(int(request.GET.get('days', 30)), 1), 365)
+            branch_id = None
+            if request.GET.get('view_level', 'branch') == 'branch' and user.branch:
+                branch_id = user.branch.id
+
+            return Response({
+                'success': True,
+                **get_menu_engineering(user.restaurant.id, branch_id, days)
+            })
+
+        except Exception as e:
+            logger.error(f"Menu engineering API error: {str(e)}", exc_info=True)
+            return Response({
+                'success': False,
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -22,7 +22,7 @@ class ProfitCalculator:
         """
         try:
             from tables.models import Order, OrderItem
-            from menu.models import MenuItem
+            from inventory.costing import fill_missing_unit_costs, order_item_line_cost
             from .waste_integration import get_waste_costs_for_date
             from .models import ProfitAggregation
 
@@ -47,22 +47,21 @@ class ProfitCalculator:
                 'total'] or Decimal('0.00')
             logger.info(f"Total revenue: ${total_revenue:.2f}")
 
-            # Calculate total ingredient cost from all order items
-            total_ingredient_cost = Decimal('0.00')
-            ingredient_details = []
-
-            for order in orders:
-                for order_item in order.items.all():
-                    if order_item.menu_item and order_item.menu_item.cost_price:
-                        item_cost = order_item.menu_item.cost_price * order_item.quantity
-                        total_ingredient_cost += item_cost
-
-                        ingredient_details.append({
-                            'menu_item': order_item.menu_item.name,
-                            'quantity': order_item.quantity,
-                            'cost_per_unit': float(order_item.menu_item.cost_price),
-                            'total_cost': float(item_cost)
-                        })
+            # Ingredient cost: the unit costs captured on the order lines at
+            # sale time, so later cost changes never alter past days
+            order_items = OrderItem.objects.filter(order__in=orders)
+            fill_missing_unit_costs(order_items)
+            total_ingredient_cost = order_items.aggregate(
+                total=Sum(order_item_line_cost()))['total'] or Decimal('0.00')
+
+            ingredient_details = [{
+                'menu_item': row['menu_item__name'],
+                'quantity': row['total_quantity'],
+                'cost_per_unit': float(row['total_cost'] / row['total_quantity']) if row['total_quantity'] else 0.0,
+                'total_cost': float(row['total_cost'] or 0)
+            } for row in order_items.values('menu_item__name').annotate(
+                total_quantity=Sum('quantity'), total_cost=Sum(order_item_line_cost())
+            ).order_by('-total_cost')[:10]]
 
             logger.info(f"Total ingredient cost: ${total_ingredient_cost:.2f}")
 
@@ -155,8 +154,9 @@ class ProfitCalculator:
         """
         try:
             from tables.models import Order, OrderItem
-            from menu.models import MenuItem
+            from inventory.costing import order_item_line_cost
             from .models import MenuItemPerformance
+            from .rankings import rank_day
 
             logger.info(f"Updating menu item performances for {date}")
 
@@ -170,19 +170,16 @@ class ProfitCalculator:
             if branch:
                 orders = orders.filter(table__branch=branch)
 
-            # Group order items by menu item
-            from django.db.models import Sum
+            # Group order items by menu item, costed at their sale-time unit cost
             menu_item_stats = OrderItem.objects.filter(
                 order__in=orders
             ).values(
                 'menu_item__id',
-                'menu_item__name',
-                'menu_item__category__name',
-                'menu_item__price',
-                'menu_item__cost_price'
+                'menu_item__name'
             ).annotate(
                 total_quantity=Sum('quantity'),
-                total_revenue=Sum(F('quantity') * F('unit_price'))
+                total_revenue=Sum(F('quantity') * F('unit_price')),
+                total_ingredient_cost=Sum(order_item_line_cost())
             )
 
             # Update performance records
@@ -191,54 +188,44 @@ class ProfitCalculator:
                 if not menu_item_id:
                     continue
 
-                try:
-                    menu_item = MenuItem.objects.get(id=menu_item_id)
-
-                    # Calculate costs
-                    quantity = stat['total_quantity'] or 0
-                    revenue = stat['total_revenue'] or Decimal('0.00')
-                    ingredient_cost = (
-                        menu_item.cost_price or Decimal('0.00')) * quantity
-
-                    # Labor cost estimation (20% of ingredient cost)
-                    labor_cost_share = ingredient_cost * Decimal('0.20')
-                    total_cost = ingredient_cost + labor_cost_share
-
-                    # Calculate profits
-                    gross_profit = revenue - ingredient_cost
-                    net_profit = revenue - total_cost
-                    profit_margin = (net_profit / revenue *
-                                     100) if revenue > 0 else Decimal('0.00')
-
-                    # Create or update performance record
-                    performance, created = MenuItemPerformance.objects.update_or_create(
-                        date=date,
-                        menu_item=menu_item,
-                        restaurant=restaurant,
-                        branch=branch,
-                        defaults={
-                            'quantity_sold': quantity,
-                            'revenue': revenue,
-                            'ingredient_cost': ingredient_cost,
-                            'labor_cost_share': labor_cost_share,
-                            'total_cost': total_cost,
-                            'gross_profit': gross_profit,
-                            'net_profit': net_profit,
-                            'profit_margin': profit_margin,
-                            'calculated_at': timezone.now()
-                        }
-                    )
+                # Calculate costs
+                quantity = stat['total_quantity'] or 0
+                revenue = stat['total_revenue'] or Decimal('0.00')
+                ingredient_cost = stat['total_ingredient_cost'] or Decimal('0.00')
 
-                    if created:
-                        logger.info(
-                            f"Created performance record for {menu_item.name}")
-                    else:
-                        logger.info(
-                            f"Updated performance record for {menu_item.name}")
+                # Labor cost estimation (20% of ingredient cost)
+                labor_cost_share = ingredient_cost * Decimal('0.20')
+                total_cost = ingredient_cost + labor_cost_share
 
-                except MenuItem.DoesNotExist:
-                    logger.warning(f"Menu item {menu_item_id} not found")
-                    continue
+                # Calculate profits
+                gross_profit = revenue - ingredient_cost
+                net_profit = revenue - total_cost
+                profit_margin = (net_profit / revenue *
+                                 100) if revenue > 0 else Decimal('0.00')
+
+                # Create or update performance record
+                performance, created = MenuItemPerformance.objects.update_or_create(
+                    date=date,
+                    menu_item_id=menu_item_id,
+                    restaurant=restaurant,
+                    branch=branch,
+                    defaults={
+                        'quantity_sold': quantity,
+                        'revenue': revenue,
+                        'ingredient_cost': ingredient_cost,
+                        'labor_cost_share': labor_cost_share,
+                        'total_cost': total_cost,
+                        'gross_profit': gross_profit,
+                        'net_profit': net_profit,
+                        'profit_margin': profit_margin,
+                        'calculated_at': timezone.now()
+                    }
+                )
+
+                logger.info(
+                    f"{'Created' if created else 'Updated'} performance record for {stat['menu_item__name']}")
+
+            rank_day(date, restaurant.id, branch.id if branch else None)
 
         except Exception as e:
             logger.error(
@@ -721,3 +708,152 @@ class ProfitDashboardAPI:
                 'today_count': 0,
                 'week_count': 0
             }
+
+    @staticmethod
+    def get_sales_data(restaurant, branch=None, days=7):
+        """
+        Daily paid sales for the last `days` days (one grouped query)
+        """
+        from tables.models import Order
+
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=days)
+
+        orders = Order.objects.filter(
+            completed_at__date__gte=start_date,
+            completed_at__date__lte=end_date,
+            is_paid=True,
+            table__branch__restaurant=restaurant
+        )
+        if branch:
+            orders = orders.filter(table__branch=branch)
+
+        totals = {
+            row['completed_at__date']: row
+            for row in orders.values('completed_at__date').annotate(
+                total=Sum('total_amount'), orders=Count('id'))
+        }
+
+        sales_data = []
+        current_date = start_date
+        while current_date <= end_date:
+            row = totals.get(current_date, {})
+            total_sales = row.get('total') or 0
+            order_count = row.get('orders', 0)
+
+            sales_data.append({
+                'date': current_date.isoformat(),
+                'day_name': current_date.strftime('%a'),
+                'total': float(total_sales),
+                'orders': order_count,
+                'avg_order_value': float(total_sales / order_count) if order_count > 0 else 0
+            })
+            current_date += timedelta(days=1)
+
+        return sales_data
+
+    @staticmethod
+    def get_popular_items(restaurant, days=7, limit=10):
+        """
+        Best-selling menu items of the last `days` days
+        """
+        from tables.models import OrderItem
+
+        start_date = timezone.now().date() - timedelta(days=days)
+
+        popular_items = OrderItem.objects.filter(
+            order__completed_at__date__gte=start_date,
+            order__is_paid=True,
+            order__table__branch__restaurant=restaurant
+        ).values(
+            'menu_item__id',
+            'menu_item__name',
+            'menu_item__category__name',
+            'menu_item__price',
+            'menu_item__image'
+        ).annotate(
+            total_sold=Sum('quantity'),
+            total_revenue=Sum(F('quantity') * F('unit_price'))
+        ).order_by('-total_sold')[:limit]
+
+        return [{
+            'id': item['menu_item__id'],
+            'name': item['menu_item__name'],
+            'category': item['menu_item__category__name'],
+            'price': float(item['menu_item__price']),
+            'image': item['menu_item__image'] if item['menu_item__image'] else None,
+            'sold': item['total_sold'],
+            'revenue': float(item['total_revenue'])
+        } for item in popular_items]
+
+    @staticmethod
+    def get_recent_activity(restaurant, limit=10):
+        """
+        Latest completed orders and approved waste, newest first
+        """
+        from tables.models import Order
+        from waste_tracker.models import WasteRecord
+
+        activities = []
+
+        recent_orders = Order.objects.filter(
+            table__branch__restaurant=restaurant,
+            completed_at__isnull=False
+        ).select_related('table').order_by('-completed_at')[:5]
+
+        for order in recent_orders:
+            activities.append({
+                'type': 'order',
+                'icon': 'shopping-cart',
+                'title': f'Order #{order.order_number} Completed',
+                'description': f'Table {order.table.table_number if order.table else "Unknown"} - ${order.total_amount:.2f}',
+                'time': order.completed_at,
+                'amount': float(order.total_amount)
+            })
+
+        recent_waste = WasteRecord.objects.filter(
+            branch__restaurant=restaurant,
+            status='approved'
+        ).select_related(
+            'waste_reason', 'stock_transaction__stock_item'
+        ).order_by('-recorded_at')[:5]
+
+        for waste in recent_waste:
+            activities.append({
+                'type': 'waste',
+                'icon': 'trash',
+                'title': f'Waste Recorded',
+                'description': f'{waste.stock_item.name if waste.stock_item else "Unknown Item"} - {waste.waste_reason.name}',
+                'time': waste.recorded_at,
+                'amount': -float(waste.total_cost) if waste.total_cost else 0
+            })
+
+        # Sort by time and limit
+        activities.sort(key=lambda x: x['time'], reverse=True)
+        activities = activities[:limit]
+
+        for activity in activities:
+            activity['time'] = ProfitDashboardAPI._format_time_difference(
+                activity['time'])
+
+        return activities
+
+    @staticmethod
+    def _format_time_difference(dt):
+        """Format datetime as time difference string"""
+        if not dt:
+            return "Unknown"
+
+        now = timezone.now()
+        diff = now - dt
+
+        if diff.days > 0:
+            return f"{diff.days}d ago"
+        elif diff.seconds > 3600:
+            hours = diff.seconds // 3600
+            return f"{hours}h ago"
+        elif diff.seconds > 60:
+            minutes = diff.seconds // 60
+            return f"{minutes}m ago"
+        else:
+            return "Just now"
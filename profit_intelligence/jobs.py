@@ -0,0 +1,88 @@
+# profit_intelligence/jobs.py - Background job handlers (see core.jobs)
+import json
+from datetime import timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.jobs import job_handler
+from restaurants.models import Branch, Restaurant
+
+from .alert_rules import evaluate_alerts
+from .business_logic import ProfitCalculator
+from .models import ProfitReport
+from .price_optimization import run_price_optimization
+
+REPORT_DAYS = {'daily': 1, 'weekly': 7, 'monthly': 30}
+
+
+def _scope(restaurant_id, branch_id=None):
+    restaurant = Restaurant.objects.get(id=restaurant_id)
+    branch = Branch.objects.get(id=branch_id, restaurant=restaurant) if branch_id else None
+    return restaurant, branch
+
+
+@job_handler('profit.backfill')
+def backfill_profits(job, restaurant_id, branch_id=None, days=30):
+    """Recalculate the daily ProfitAggregations of the last `days` days"""
+    restaurant, branch = _scope(restaurant_id, branch_id)
+    today = timezone.now().date()
+
+    calculated, failed = [], []
+    for day_offset in range(int(days)):
+        target_date = today - timedelta(days=day_offset)
+        result = ProfitCalculator.calculate_daily_profit(target_date, restaurant, branch)
+        (calculated if result['success'] else failed).append(target_date.isoformat())
+
+    return {'days_calculated': len(calculated), 'failed_dates': failed}
+
+
+@job_handler('profit.report')
+def build_profit_report(job, restaurant_id, branch_id=None, report_type='monthly'):
+    """Store a ProfitReport of the period's trend and issues"""
+    restaurant, branch = _scope(restaurant_id, branch_id)
+    days = REPORT_DAYS.get(report_type, 30)
+
+    trend = ProfitCalculator.calculate_profit_trend(days, restaurant, branch)
+    if not trend.get('success', True):
+        raise RuntimeError(trend.get('error', 'Profit trend failed'))
+    issues = ProfitCalculator.analyze_profit_issues(restaurant, branch)
+
+    summary = trend.get('summary', {})
+    report = ProfitReport.objects.create(
+        date=timezone.now().date(),
+        restaurant=restaurant,
+        branch=branch,
+        report_type=report_type,
+        data=json.loads(json.dumps({'trend': trend, 'issues': issues}, cls=DjangoJSONEncoder)),
+        summary=(f"{report_type.title()} profit: revenue {summary.get('total_revenue', 0):.2f}, "
+                 f"profit {summary.get('total_profit', 0):.2f}"),
+        generated_by=job.created_by,
+    )
+    return {'report_id': str(report.report_id), 'summary': summary}
+
+
+@job_handler('profit.price_optimization')
+def optimize_prices(job, restaurant_ids=None, restaurant_id=None, branch_id=None):
+    """
+    Refresh the pending PriceOptimization suggestions (all restaurants by
+    default). A restaurant_id (forced on managers' jobs) limits the run to
+    that restaurant; prices are per restaurant, so branch_id is ignored.
+    """
+    if restaurant_id is not None:
+        restaurant_ids = [restaurant_id]
+    return run_price_optimization(restaurant_ids)
+
+
+@job_handler('profit.alerts')
+def evaluate_profit_alerts(job, date=None, restaurant_ids=None, restaurant_id=None,
+                           branch_id=None):
+    """
+    Run the profit alert rules for a day (yesterday by default). A
+    restaurant_id (forced on managers' jobs) limits the run to that
+    restaurant, all of whose branches are evaluated together.
+    """
+    if restaurant_id is not None:
+        restaurant_ids = [restaurant_id]
+    return evaluate_alerts(parse_date(date) if date else None, restaurant_ids)
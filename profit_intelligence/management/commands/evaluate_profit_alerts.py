@@ -0,0 +1,36 @@
+# profit_intelligence/management/commands/evaluate_profit_alerts.py
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profit_intelligence.alert_rules import evaluate_alerts
+
+
+class Command(BaseCommand):
+    help = ('Evaluate the profit alert rules for a day across all branches '
+            '(schedule daily, after calculate_profits)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to evaluate, YYYY-MM-DD (default: yesterday)')
+        parser.add_argument('--restaurant', type=int, action='append', dest='restaurants',
+                            help='Restaurant id (repeatable; default: all restaurants)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report what would fire without writing alerts')
+
+    def handle(self, *args, **options):
+        date = None
+        if options['date']:
+            try:
+                date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD')
+
+        result = evaluate_alerts(date, options['restaurants'], dry_run=options['dry_run'])
+        self.stdout.write(
+            f"{result['date']}: {result['rules']} rules over {result['scopes']} branch scope(s) "
+            f"and {result['items']} item(s)")
+        self.stdout.write(
+            f"  {result['fired']} fired, {result['suppressed']} suppressed (open or cooling down), "
+            f"{result['created']} created, {result['resolved']} auto-resolved"
+            + (' (dry run)' if result['dry_run'] else ''))
+        self.stdout.write(self.style.SUCCESS('Profit alert evaluation complete!'))
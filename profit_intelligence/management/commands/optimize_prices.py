@@ -0,0 +1,34 @@
+# profit_intelligence/management/commands/optimize_prices.py
+from django.core.management.base import BaseCommand
+
+from profit_intelligence.price_optimization import run_price_optimization
+
+
+class Command(BaseCommand):
+    help = 'Estimate price elasticities and refresh PriceOptimization suggestions for every restaurant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurant', type=int, action='append', dest='restaurants',
+                            help='Restaurant id (repeatable; default: all restaurants)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Estimate and time the run without writing suggestions')
+        parser.add_argument('--repeat', type=int, default=1,
+                            help='Run N times and report the best timings (benchmarking)')
+
+    def handle(self, *args, **options):
+        runs = []
+        for _ in range(max(options['repeat'], 1)):
+            runs.append(run_price_optimization(options['restaurants'], dry_run=options['dry_run']))
+
+        result = runs[-1]
+        self.stdout.write(
+            f"{result['restaurants']} restaurant(s), {result['items_analyzed']} items analyzed, "
+            f"{result['suggestions']} suggestion(s), {result['expired']} expired"
+            + (' (dry run)' if result['dry_run'] else ''))
+        for phase in result['timings_ms']:
+            best = min(run['timings_ms'][phase] for run in runs)
+            self.stdout.write(f"  {phase:<10} {best:10.2f} ms")
+        if result['items_analyzed']:
+            best_total = min(run['timings_ms']['total'] for run in runs)
+            self.stdout.write(f"  {result['items_analyzed'] / (best_total / 1000):,.0f} items/s")
+        self.stdout.write(self.style.SUCCESS('Price optimization complete!'))
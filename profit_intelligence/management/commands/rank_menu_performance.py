@@ -0,0 +1,25 @@
+# profit_intelligence/management/commands/rank_menu_performance.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from profit_intelligence.rankings import rank_range
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily ranks and trends of menu item performance records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30,
+                            help='Number of days back to rank (default: 30)')
+        parser.add_argument('--restaurant', type=int,
+                            help='Restaurant id (default: all restaurants)')
+
+    def handle(self, *args, **options):
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=options['days'] - 1)
+
+        scopes, rows = rank_range(start_date, end_date, options['restaurant'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Ranked {rows} record(s) in {scopes} day/branch scope(s) from {start_date} to {end_date}"))
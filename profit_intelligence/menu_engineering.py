@@ -0,0 +1,149 @@
+# profit_intelligence/menu_engineering.py
+"""
+Menu engineering matrix.
+
+Every item of a restaurant's menu is classified by popularity and
+contribution margin (Kasavana & Smith):
+
+- popularity: the item's share of units sold against 70% of an even share
+  (1 / number of items on the menu)
+- contribution margin: (revenue - ingredient cost) per unit against the
+  menu's sales-weighted average
+
+giving stars (popular, profitable), plowhorses (popular, low margin),
+puzzles (profitable, unpopular) and dogs. The whole matrix comes from a
+fixed number of queries - one GROUP BY over MenuItemPerformance plus the
+menu itself - and is cached per restaurant/branch/period until the day's
+rankings (rankings.rank_day) or the menu change.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Exists, OuterRef, Q, Sum
+from django.utils import timezone
+
+from core.caching import get_or_set_tagged, restaurant_tag
+from menu.models import MenuItem
+
+from .models import MenuItemPerformance
+
+CACHE_TIMEOUT = 60 * 15
+POPULARITY_FACTOR = Decimal('0.70')
+
+CLASSES = {
+    'star': 'Keep visible and protect quality; price is rarely the issue',
+    'plowhorse': 'Raise the price carefully or cut portion/ingredient cost',
+    'puzzle': 'Promote, reposition on the menu or rename to lift sales',
+    'dog': 'Rework or remove from the menu',
+}
+
+
+def _money(value):
+    return round(float(value or Decimal('0.00')), 2)
+
+
+def _classify(popular, profitable):
+    if popular:
+        return 'star' if profitable else 'plowhorse'
+    return 'puzzle' if profitable else 'dog'
+
+
+def scoped_performances(restaurant_id, branch_id, start_date, end_date):
+    """
+    The performance rows of a scope. Restaurant-wide views pick the row
+    source per item-day, as price_optimization.load_history does: the
+    restaurant-level row (branch NULL) when the day has one, the branch
+    rows otherwise, so no sale is counted twice.
+    """
+    performances = MenuItemPerformance.objects.filter(
+        restaurant_id=restaurant_id, date__range=[start_date, end_date])
+    if branch_id:
+        return performances.filter(branch_id=branch_id)
+    restaurant_level = MenuItemPerformance.objects.filter(
+        restaurant_id=restaurant_id, branch__isnull=True,
+        menu_item_id=OuterRef('menu_item_id'), date=OuterRef('date'))
+    return performances.filter(Q(branch__isnull=True) | ~Exists(restaurant_level))
+
+
+def compute_menu_engineering(restaurant_id, branch_id=None, days=30):
+    end_date = timezone.now().date()
+    start_date = end_date - timedelta(days=days - 1)
+
+    sales = {
+        row['menu_item_id']: row for row in
+        scoped_performances(restaurant_id, branch_id, start_date, end_date)
+        .values('menu_item_id')
+        .annotate(quantity=Sum('quantity_sold'), revenue=Sum('revenue'),
+                  ingredient_cost=Sum('ingredient_cost'))
+        .order_by()
+    }
+    menu = MenuItem.objects.filter(category__restaurant_id=restaurant_id).values(
+        'id', 'name', 'category__name', 'price', 'cost_price', 'is_available')
+    # Sold items stay in the matrix even if they were taken off the menu since
+    menu = [item for item in menu if item['is_available'] or item['id'] in sales]
+
+    total_quantity = sum(row['quantity'] or 0 for row in sales.values())
+    total_margin = sum((row['revenue'] or 0) - (row['ingredient_cost'] or 0)
+                       for row in sales.values())
+    average_margin = total_margin / total_quantity if total_quantity else Decimal('0.00')
+    popularity_threshold = (POPULARITY_FACTOR / len(menu) * 100) if menu else Decimal('0.00')
+
+    items = []
+    for item in menu:
+        row = sales.get(item['id'], {})
+        quantity = row.get('quantity') or 0
+        revenue = row.get('revenue') or Decimal('0.00')
+        if quantity:
+            unit_margin = (revenue - (row.get('ingredient_cost') or 0)) / quantity
+        else:
+            unit_margin = (item['price'] or 0) - (item['cost_price'] or 0)
+        menu_mix = (Decimal(quantity) / total_quantity * 100) if total_quantity else Decimal('0.00')
+
+        popular = quantity > 0 and menu_mix >= popularity_threshold
+        profitable = unit_margin >= average_margin
+        classification = _classify(popular, profitable)
+        items.append({
+            'id': item['id'],
+            'name': item['name'],
+            'category': item['category__name'],
+            'price': _money(item['price']),
+            'quantity_sold': quantity,
+            'revenue': _money(revenue),
+            'menu_mix_percent': round(float(menu_mix), 2),
+            'contribution_margin': _money(unit_margin),
+            'total_contribution': _money(unit_margin * quantity),
+            'classification': classification,
+            'recommendation': CLASSES[classification],
+        })
+
+    items.sort(key=lambda item: (list(CLASSES).index(item['classification']),
+                                 -item['total_contribution']))
+    return {
+        'period': {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'days': days,
+        },
+        'thresholds': {
+            'popularity_percent': round(float(popularity_threshold), 2),
+            'average_contribution_margin': _money(average_margin),
+        },
+        'summary': {
+            'total_items': len(items),
+            'total_quantity_sold': total_quantity,
+            'total_contribution': _money(total_margin),
+            **{classification: sum(1 for item in items if item['classification'] == classification)
+               for classification in CLASSES},
+        },
+        'items': items,
+    }
+
+
+def get_menu_engineering(restaurant_id, branch_id=None, days=30):
+    """The matrix, cached until performance rows or the menu of the restaurant change"""
+    today = timezone.now().date()
+    return get_or_set_tagged(
+        f'profit:menu-engineering:{restaurant_id}:{branch_id}:{days}:{today}',
+        [restaurant_tag(restaurant_id, 'performance'), restaurant_tag(restaurant_id, 'menu')],
+        lambda: compute_menu_engineering(restaurant_id, branch_id, days),
+        CACHE_TIMEOUT)
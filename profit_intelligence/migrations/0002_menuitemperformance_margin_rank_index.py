@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('menu', '0003_category_station_menuitem_station'),
+        ('profit_intelligence', '0001_initial'),
+        ('restaurants', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='menuitemperformance',
+            index=models.Index(fields=['margin_rank', 'date'], name='profit_inte_margin__18b655_idx'),
+        ),
+    ]
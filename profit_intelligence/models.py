@@ -205,6 +205,7 @@ class MenuItemPerformance(models.Model):
             models.Index(fields=['profit_margin']),
             models.Index(fields=['revenue_rank', 'date']),
             models.Index(fields=['profit_rank', 'date']),
+            models.Index(fields=['margin_rank', 'date']),
         ]
         ordering = ['date', '-revenue']
 
@@ -222,28 +223,8 @@ class MenuItemPerformance(models.Model):
             self.profit_margin = (
                 self.net_profit / self.revenue) * Decimal('100')
 
-        # Calculate change from previous day
-        if not self.pk:  # Only on creation
-            try:
-                prev_day = MenuItemPerformance.objects.filter(
-                    menu_item=self.menu_item,
-                    restaurant=self.restaurant,
-                    branch=self.branch,
-                    date=self.date - timezone.timedelta(days=1)
-                ).first()
-                if prev_day:
-                    self.previous_day_quantity = prev_day.quantity_sold
-                    self.quantity_change = self.quantity_sold - prev_day.quantity_sold
-
-                    # Determine trend
-                    if self.quantity_change > 2:
-                        self.trend = 'up'
-                    elif self.quantity_change < -2:
-                        self.trend = 'down'
-                    else:
-                        self.trend = 'stable'
-            except:
-                pass
+        # Ranks, previous_day_quantity, quantity_change and trend are
+        # written for the whole day by rankings.rank_day()
 
         super().save(*args, **kwargs)
 
@@ -0,0 +1,287 @@
+# profit_intelligence/price_optimization.py
+"""
+Price optimization engine.
+
+Demand is modelled per menu item with a constant price elasticity,
+ln(quantity) = a + e * ln(price), estimated from the daily
+MenuItemPerformance history (effective price = revenue / quantity):
+
+1. One query loads the history of every restaurant in the run; each item
+   reduces to its sufficient statistics (n, sums of x, y, x², xy), so the
+   fit is a single pass with no per-item query.
+2. Items rarely change price, so estimates are pooled: a category slope
+   (within-item variation of all its items) shrunk toward DEFAULT_ELASTICITY,
+   then each item's slope shrunk toward its category. PRIOR_STRENGTH is in
+   log-price variance units: an item needs that much price variation of its
+   own before its data outweighs the category.
+3. The profit-maximizing price for marginal cost c is c * e / (1 + e)
+   (elastic demand, e < -1); it is bounded to +/- MAX_CHANGE of the current
+   price and rounded to PRICE_STEP. Suggestions that do not raise the
+   projected daily profit by at least MIN_CHANGE of price are dropped.
+4. Pending suggestions of the run's restaurants are expired and the new
+   ones bulk inserted in one transaction.
+
+run_price_optimization() returns per-phase timings for benchmarking.
+"""
+import logging
+import math
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from menu.models import MenuItem
+
+from .models import MenuItemPerformance, PriceOptimization
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM_VERSION = 'elasticity-v1'
+FEATURES_USED = ['daily_quantity', 'effective_price', 'unit_cost',
+                 'item_elasticity', 'category_elasticity']
+
+
+def optimization_config():
+    config = {
+        'HISTORY_DAYS': 90,
+        'MIN_DAYS': 14,  # days with sales before an item gets a suggestion
+        'DEFAULT_ELASTICITY': -1.5,
+        'PRIOR_STRENGTH': 0.02,
+        'ELASTICITY_BOUNDS': (-4.0, -0.3),
+        'MAX_CHANGE': 0.15,  # largest suggested price move, either way
+        'MIN_CHANGE': 0.02,  # smaller moves are not worth a menu change
+        'PRICE_STEP': '0.50',
+        'VALID_DAYS': 14,
+    }
+    config.update(getattr(settings, 'PRICE_OPTIMIZATION', {}))
+    return config
+
+
+class ItemStats:
+    """Sufficient statistics of an item's log-log demand regression"""
+    __slots__ = ('n', 'sx', 'sy', 'sxx', 'sxy', 'quantity', 'revenue', 'cost')
+
+    def __init__(self):
+        self.n = 0
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+        self.quantity = 0
+        self.revenue = 0.0
+        self.cost = 0.0
+
+    def add(self, quantity, revenue, cost):
+        self.quantity += quantity
+        self.revenue += revenue
+        self.cost += cost
+        if quantity <= 0 or revenue <= 0:
+            return
+        x = math.log(revenue / quantity)
+        y = math.log(quantity)
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def centered(self):
+        """(Sxx, Sxy) around the item's own means"""
+        if self.n < 2:
+            return 0.0, 0.0
+        return (self.sxx - self.sx * self.sx / self.n,
+                self.sxy - self.sx * self.sy / self.n)
+
+
+# ============ LOADING ============
+
+def load_history(restaurant_ids, start_date):
+    """
+    {menu_item_id: ItemStats} from one query. A restaurant-wide row
+    (branch NULL) of an item-day wins over its branch rows, which are
+    summed otherwise, so a day is never counted twice.
+    """
+    days = defaultdict(lambda: [0, 0.0, 0.0, False])
+    rows = MenuItemPerformance.objects.filter(
+        restaurant_id__in=restaurant_ids, date__gte=start_date
+    ).values_list('menu_item_id', 'date', 'branch_id', 'quantity_sold',
+                  'revenue', 'ingredient_cost').iterator(chunk_size=5000)
+
+    for menu_item_id, date, branch_id, quantity, revenue, cost in rows:
+        day = days[(menu_item_id, date)]
+        if branch_id is None:
+            days[(menu_item_id, date)] = [quantity, float(revenue), float(cost), True]
+        elif not day[3]:
+            day[0] += quantity
+            day[1] += float(revenue)
+            day[2] += float(cost)
+
+    history = defaultdict(ItemStats)
+    for (menu_item_id, _), (quantity, revenue, cost, _) in days.items():
+        history[menu_item_id].add(quantity, revenue, cost)
+    return history
+
+
+# ============ ESTIMATION ============
+
+def estimate_elasticities(history, item_categories, config=None):
+    """
+    {menu_item_id: (elasticity, weight)}: item slopes shrunk toward their
+    category's pooled slope, itself shrunk toward the default. weight is
+    the share of the estimate that comes from the item's own data.
+    """
+    config = config or optimization_config()
+    prior = config['DEFAULT_ELASTICITY']
+    strength = config['PRIOR_STRENGTH']
+    low, high = config['ELASTICITY_BOUNDS']
+
+    centered = {item_id: stats.centered() for item_id, stats in history.items()}
+    category_sums = defaultdict(lambda: [0.0, 0.0])
+    for item_id, (sxx, sxy) in centered.items():
+        sums = category_sums[item_categories.get(item_id)]
+        sums[0] += sxx
+        sums[1] += sxy
+    category_slopes = {
+        category_id: (sxy + strength * prior) / (sxx + strength)
+        for category_id, (sxx, sxy) in category_sums.items()
+    }
+
+    elasticities = {}
+    for item_id, (sxx, sxy) in centered.items():
+        category_slope = category_slopes[item_categories.get(item_id)]
+        slope = (sxy + strength * category_slope) / (sxx + strength)
+        elasticities[item_id] = (min(max(slope, low), high), sxx / (sxx + strength))
+    return elasticities
+
+
+def _round_price(value, step):
+    return (Decimal(str(value)) / step).quantize(Decimal('1'), ROUND_HALF_UP) * step
+
+
+def _bounded(value, limit):
+    return max(min(value, limit), -limit)
+
+
+def suggest_price(item, stats, elasticity, weight, window_days, config, valid_until):
+    """An unsaved PriceOptimization for an item, or None"""
+    current_price = float(item['price'] or 0)
+    if current_price <= 0 or stats.n < config['MIN_DAYS']:
+        return None
+    unit_cost = (stats.cost / stats.quantity if stats.quantity and stats.cost
+                 else float(item['cost_price'] or 0))
+    if unit_cost <= 0:
+        return None
+
+    max_change = config['MAX_CHANGE']
+    if elasticity < -1:
+        optimal = unit_cost * elasticity / (1 + elasticity)
+    else:
+        optimal = current_price * (1 + max_change)  # inelastic: profit rises with price
+    optimal = min(max(optimal, current_price * (1 - max_change)),
+                  current_price * (1 + max_change))
+    suggested = _round_price(optimal, Decimal(config['PRICE_STEP']))
+    change = (float(suggested) - current_price) / current_price
+    if abs(change) < config['MIN_CHANGE']:
+        return None
+
+    demand = stats.quantity / window_days
+    new_demand = demand * (float(suggested) / current_price) ** elasticity
+    profit = (current_price - unit_cost) * demand
+    new_profit = (float(suggested) - unit_cost) * new_demand
+    profit_change = new_profit - profit
+    if profit_change <= 0:
+        return None
+    revenue_change = float(suggested) * new_demand - current_price * demand
+
+    confidence = 0.2 + 0.75 * weight * min(1.0, stats.n / (2 * config['MIN_DAYS']))
+    direction = 'increase' if change > 0 else 'decrease'
+    return PriceOptimization(
+        menu_item_id=item['id'],
+        restaurant_id=item['category__restaurant_id'],
+        current_price=Decimal(str(current_price)).quantize(Decimal('0.01')),
+        current_cost=Decimal(unit_cost).quantize(Decimal('0.01')),
+        current_margin=Decimal(_bounded((current_price - unit_cost) / current_price * 100, 999.99)).quantize(Decimal('0.01')),
+        current_demand=Decimal(demand).quantize(Decimal('0.01')),
+        suggested_price=suggested,
+        projected_margin=Decimal(_bounded((float(suggested) - unit_cost) / float(suggested) * 100, 999.99)).quantize(Decimal('0.01')),
+        price_change_percent=Decimal(change * 100).quantize(Decimal('0.01')),
+        confidence_score=Decimal(min(confidence, 0.95)).quantize(Decimal('0.01')),
+        algorithm_version=ALGORITHM_VERSION,
+        features_used=FEATURES_USED,
+        reason=(f"Estimated price elasticity {elasticity:.2f} over {stats.n} days of sales: "
+                f"a price {direction} to {suggested} is projected to change daily profit "
+                f"by {profit_change:+.2f}."),
+        key_factors=[
+            {'factor': 'elasticity', 'value': round(elasticity, 3)},
+            {'factor': 'item_data_weight', 'value': round(weight, 3)},
+            {'factor': 'days_observed', 'value': stats.n},
+            {'factor': 'unit_cost', 'value': round(unit_cost, 2)},
+        ],
+        projected_demand_change=Decimal(_bounded((new_demand / demand - 1) * 100, 999.99)).quantize(Decimal('0.01')),
+        # Per unit of current demand, so expected_profit_increase_per_day holds
+        projected_revenue_change=Decimal(revenue_change / demand).quantize(Decimal('0.01')),
+        projected_profit_change=Decimal(profit_change / demand).quantize(Decimal('0.01')),
+        projected_roi=Decimal(_bounded(profit_change / profit * 100 if profit > 0 else 0, 10 ** 7)).quantize(Decimal('0.01')),
+        valid_until=valid_until,
+    )
+
+
+# ============ RUN ============
+
+def run_price_optimization(restaurant_ids=None, dry_run=False, config=None):
+    """
+    Optimize the menu of the given restaurants (all with menu items by
+    default) in one batch. Returns counts and per-phase timings (ms).
+    """
+    config = config or optimization_config()
+    timings = {}
+    started = time.perf_counter()
+
+    items = MenuItem.objects.all()
+    if restaurant_ids:
+        items = items.filter(category__restaurant_id__in=restaurant_ids)
+    items = {item['id']: item for item in items.values(
+        'id', 'price', 'cost_price', 'category_id', 'category__restaurant_id')}
+    restaurant_ids = sorted({item['category__restaurant_id'] for item in items.values()})
+
+    window_days = config['HISTORY_DAYS']
+    history = load_history(restaurant_ids, timezone.now().date() - timedelta(days=window_days))
+    timings['load'] = (time.perf_counter() - started) * 1000
+
+    mark = time.perf_counter()
+    elasticities = estimate_elasticities(
+        history, {item_id: item['category_id'] for item_id, item in items.items()}, config)
+    valid_until = timezone.now() + timedelta(days=config['VALID_DAYS'])
+    suggestions = []
+    for item_id, stats in history.items():
+        item = items.get(item_id)
+        if item is None:
+            continue
+        elasticity, weight = elasticities[item_id]
+        suggestion = suggest_price(item, stats, elasticity, weight, window_days, config, valid_until)
+        if suggestion is not None:
+            suggestions.append(suggestion)
+    timings['estimate'] = (time.perf_counter() - mark) * 1000
+
+    mark = time.perf_counter()
+    expired = 0
+    if not dry_run:
+        with transaction.atomic():
+            expired = PriceOptimization.objects.filter(
+                restaurant_id__in=restaurant_ids, status='pending'
+            ).update(status='expired', updated_at=timezone.now())
+            PriceOptimization.objects.bulk_create(suggestions, batch_size=500)
+    timings['write'] = (time.perf_counter() - mark) * 1000
+    timings['total'] = (time.perf_counter() - started) * 1000
+
+    logger.info(f"Price optimization: {len(history)} items, {len(suggestions)} suggestions "
+                f"in {timings['total']:.0f}ms")
+    return {
+        'restaurants': len(restaurant_ids),
+        'items_analyzed': len(history),
+        'suggestions': len(suggestions),
+        'expired': expired,
+        'dry_run': dry_run,
+        'timings_ms': {phase: round(value, 2) for phase, value in timings.items()},
+    }
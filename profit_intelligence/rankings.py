@@ -0,0 +1,106 @@
+# profit_intelligence/rankings.py
+"""
+Daily ranks and trends of MenuItemPerformance.
+
+rank_day() ranks one (date, restaurant, branch) scope: two queries load
+the day's rows and the previous day's quantities, ranks (1 = highest,
+ties share a rank) and day-over-day trends are computed in memory, and
+one bulk_update writes them. It runs after every daily profit
+calculation, so top-N reads are index range scans on (revenue_rank,
+date), (profit_rank, date) and (margin_rank, date) instead of
+per-request sorts. Ranking also marks the scope's cached performance
+analytics (the 'performance' topic) stale.
+"""
+import logging
+from datetime import timedelta
+
+from core.caching import invalidate_tags, tags_for_write
+
+from .models import MenuItemPerformance
+
+logger = logging.getLogger(__name__)
+
+TREND_THRESHOLD = 2  # units sold vs the previous day before a trend is up/down
+RANK_FIELDS = {
+    'revenue_rank': 'revenue',
+    'profit_rank': 'net_profit',
+    'margin_rank': 'profit_margin',
+}
+UPDATE_FIELDS = list(RANK_FIELDS) + ['previous_day_quantity', 'quantity_change', 'trend']
+
+
+def quantity_trend(quantity_change):
+    if quantity_change > TREND_THRESHOLD:
+        return 'up'
+    if quantity_change < -TREND_THRESHOLD:
+        return 'down'
+    return 'stable'
+
+
+def _assign_ranks(performances, rank_field, value_field):
+    ordered = sorted(performances, key=lambda p: getattr(p, value_field), reverse=True)
+    previous = None
+    for position, performance in enumerate(ordered, start=1):
+        value = getattr(performance, value_field)
+        if value != previous:
+            rank, previous = position, value
+        setattr(performance, rank_field, rank)
+
+
+def rank_day(date, restaurant_id, branch_id=None):
+    """Rank a scope's items for a date; returns the number of rows ranked"""
+    scope = MenuItemPerformance.objects.filter(
+        restaurant_id=restaurant_id, branch_id=branch_id)
+    performances = list(scope.filter(date=date).only(
+        'id', 'menu_item_id', 'quantity_sold', *RANK_FIELDS.values(), *UPDATE_FIELDS))
+    if not performances:
+        return 0
+
+    previous_quantities = dict(scope.filter(
+        date=date - timedelta(days=1),
+        menu_item_id__in=[p.menu_item_id for p in performances]
+    ).values_list('menu_item_id', 'quantity_sold'))
+
+    for rank_field, value_field in RANK_FIELDS.items():
+        _assign_ranks(performances, rank_field, value_field)
+
+    for performance in performances:
+        previous = previous_quantities.get(performance.menu_item_id)
+        if previous is None:
+            performance.previous_day_quantity = 0
+            performance.quantity_change = performance.quantity_sold
+            performance.trend = 'new'
+        else:
+            performance.previous_day_quantity = previous
+            performance.quantity_change = performance.quantity_sold - previous
+            performance.trend = quantity_trend(performance.quantity_change)
+
+    MenuItemPerformance.objects.bulk_update(performances, UPDATE_FIELDS, batch_size=500)
+    invalidate_tags(*tags_for_write('performance', branch_id, restaurant_id))
+    return len(performances)
+
+
+def rank_range(start_date, end_date, restaurant_id=None):
+    """
+    Rank every scope with rows between the dates, oldest day first.
+    Returns (scopes, rows) ranked.
+    """
+    scopes = MenuItemPerformance.objects.filter(date__range=[start_date, end_date])
+    if restaurant_id:
+        scopes = scopes.filter(restaurant_id=restaurant_id)
+    scopes = scopes.values_list('date', 'restaurant_id', 'branch_id').distinct().order_by('date')
+
+    scope_count = rows = 0
+    for date, scope_restaurant_id, branch_id in scopes:
+        rows += rank_day(date, scope_restaurant_id, branch_id)
+        scope_count += 1
+    logger.info(f"Ranked {rows} menu item performances in {scope_count} scope(s)")
+    return scope_count, rows
+
+
+def ranked_performances(date, restaurant_id, branch_id=None, rank_by='revenue_rank', limit=10):
+    """A scope's top `limit` rows of a date by a precomputed rank"""
+    return MenuItemPerformance.objects.filter(
+        restaurant_id=restaurant_id, branch_id=branch_id, date=date,
+        **{f'{rank_by}__gte': 1, f'{rank_by}__lte': limit}
+    ).select_related('menu_item__category', 'restaurant', 'branch').order_by(rank_by)
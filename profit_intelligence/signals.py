@@ -65,6 +65,7 @@ def update_profit_on_price_change(sender, instance, created, **kwargs):
     """
     from .business_logic import ProfitCalculator
     from .models import MenuItemPerformance
+    from .rankings import rank_day
 
     try:
         # Only if price changed (not on creation)
@@ -102,6 +103,11 @@ def update_profit_on_price_change(sender, instance, created, **kwargs):
                                 'profit_margin', 'calculated_at'
                             ])
 
+                # Revenue and profit moved, so the days' ranks did too
+                for scope in performances.values_list(
+                        'date', 'restaurant_id', 'branch_id').order_by('date').distinct():
+                    rank_day(*scope)
+
     except Exception as e:
         logger.error(
             f"Error updating profit on price change: {str(e)}", exc_info=True)
@@ -122,60 +128,9 @@ def store_old_price(sender, instance, **kwargs):
         instance._old_price = None
 
 
-@receiver(post_save, sender='inventory.Recipe')
-def update_profit_on_recipe_change(sender, instance, created, **kwargs):
-    """
-    Update profit calculations when recipe changes
-    """
-    from .business_logic import ProfitCalculator
-    from .models import MenuItemPerformance
-
-    try:
-        menu_item = instance.menu_item
-        logger.info(
-            f"Recipe changed for {menu_item.name}, updating profit calculations")
-
-        # Update recent performance records (last 7 days)
-        week_ago = timezone.now().date() - timedelta(days=7)
-        performances = MenuItemPerformance.objects.filter(
-            menu_item=menu_item,
-            date__gte=week_ago
-        )
-
-        for performance in performances:
-            # Recalculate with updated cost
-            if performance.quantity_sold > 0:
-                # Get updated ingredient cost from menu item
-                ingredient_cost = menu_item.cost_price * performance.quantity_sold
-
-                performance.ingredient_cost = ingredient_cost
-                performance.total_cost = ingredient_cost + performance.labor_cost_share
-                performance.gross_profit = performance.revenue - ingredient_cost
-                performance.net_profit = performance.revenue - performance.total_cost
-
-                if performance.revenue > 0:
-                    performance.profit_margin = (
-                        performance.net_profit / performance.revenue) * 100
-
-                performance.save(update_fields=[
-                    'ingredient_cost', 'total_cost', 'gross_profit',
-                    'net_profit', 'profit_margin', 'calculated_at'
-                ])
-
-        # Also update profit aggregations for affected dates
-        dates_to_update = performances.values_list(
-            'date', flat=True).distinct()
-
-        for date in dates_to_update:
-            ProfitCalculator.calculate_daily_profit(
-                date=date,
-                restaurant=menu_item.category.restaurant,
-                branch=None  # Will update for all branches
-            )
-
-    except Exception as e:
-        logger.error(
-            f"Error updating profit on recipe change: {str(e)}", exc_info=True)
+# Recipe and ingredient cost changes need no recalculation: order lines keep
+# the unit cost of their sale time (inventory.costing), so past days'
+# cost of goods stays as it was.
 
 
 @receiver(post_save, sender='waste_tracker.WasteRecord')
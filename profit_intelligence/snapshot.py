@@ -0,0 +1,218 @@
+# profit_intelligence/snapshot.py
+"""
+Dashboard snapshot: every profit dashboard section in one payload.
+
+Sections are independent, so cache misses are computed concurrently on a
+shared thread pool (each worker thread uses its own DB connection) and
+every section is cached under its own TTL and invalidation tags. When a
+section misses the time budget the snapshot is returned without it
+(partial=True); the computation keeps running and fills the cache for the
+next poll.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+from core.caching import branch_tag, make_tagged_key, restaurant_tag
+from .business_logic import ProfitCalculator, ProfitDashboardAPI
+
+logger = logging.getLogger(__name__)
+
+# compute(restaurant, branch) -> data; branch_scoped=False sections are
+# restaurant-wide and shared by every branch view; writes=True sections
+# upsert ProfitAggregation rows and run one at a time (SQLite allows a
+# single writer, concurrent upgrades fail with "database is locked")
+Section = namedtuple('Section', 'compute ttl topics branch_scoped writes')
+
+SECTIONS = {
+    'today': Section(
+        lambda restaurant, branch: ProfitCalculator.calculate_daily_profit(
+            timezone.now().date(), restaurant, branch),
+        60, ('orders', 'waste', 'menu'), True, True),
+    'yesterday': Section(
+        lambda restaurant, branch: ProfitCalculator.calculate_daily_profit(
+            timezone.now().date() - timedelta(days=1), restaurant, branch),
+        600, ('orders', 'waste', 'menu'), True, True),
+    'trend': Section(
+        lambda restaurant, branch: ProfitCalculator.calculate_profit_trend(
+            30, restaurant, branch),
+        300, ('orders', 'waste', 'menu'), True, True),
+    'issues': Section(
+        lambda restaurant, branch: ProfitCalculator.analyze_profit_issues(
+            restaurant, branch),
+        300, ('orders', 'menu'), True, False),
+    'waste': Section(
+        ProfitDashboardAPI._get_waste_summary,
+        120, ('waste',), True, False),
+    'sales': Section(
+        lambda restaurant, branch: ProfitDashboardAPI.get_sales_data(
+            restaurant, branch, 7),
+        120, ('orders',), True, False),
+    'popular_items': Section(
+        lambda restaurant, branch: ProfitDashboardAPI.get_popular_items(
+            restaurant, 7),
+        300, ('orders', 'menu'), False, False),
+    'recent_activity': Section(
+        lambda restaurant, branch: ProfitDashboardAPI.get_recent_activity(
+            restaurant, 10),
+        30, ('orders', 'waste'), False, False),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+# cache key -> Future, so a slow section is never computed twice at once
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def _config():
+    config = {
+        'MAX_WORKERS': 4,
+        'TIMEOUT': 5,   # seconds a request waits for missing sections
+        'TTLS': {},     # per-section TTL overrides
+    }
+    config.update(getattr(settings, 'DASHBOARD_SNAPSHOT', {}))
+    return config
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_config()['MAX_WORKERS'],
+                thread_name_prefix='dashboard-snapshot')
+        return _executor
+
+
+def _section_key(name, section, restaurant, branch):
+    if section.branch_scoped and branch:
+        base_key = f'snapshot:{name}:{restaurant.id}:{branch.id}'
+        tags = [branch_tag(branch.id, topic) for topic in section.topics]
+    else:
+        base_key = f'snapshot:{name}:{restaurant.id}:all'
+        tags = [restaurant_tag(restaurant.id, topic) for topic in section.topics]
+    return make_tagged_key(base_key, tags)
+
+
+def _is_failure(data):
+    return isinstance(data, dict) and data.get('success') is False
+
+
+def _compute_section(name, key, restaurant, branch):
+    """Worker-thread body: compute, cache, and release the DB connection"""
+    try:
+        section = SECTIONS[name]
+        if section.writes:
+            with _write_lock:
+                data = section.compute(restaurant, branch)
+        else:
+            data = section.compute(restaurant, branch)
+        if not _is_failure(data):
+            ttl = _config()['TTLS'].get(name, section.ttl)
+            cache.set(key, data, ttl)
+        return data
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+        connections.close_all()
+
+
+def _submit(name, key, restaurant, branch):
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is None or future.done():
+            future = _get_executor().submit(
+                _compute_section, name, key, restaurant, branch)
+            _in_flight[key] = future
+        return future
+
+
+def build_snapshot(restaurant, branch=None, sections=None, timeout=None):
+    """
+    Collect the requested sections (all by default) for one dashboard view.
+
+    Returns {'sections', 'cached', 'pending', 'errors', 'partial', 'elapsed_ms'}.
+    """
+    started = time.monotonic()
+    names = [name for name in (sections or SECTIONS) if name in SECTIONS]
+    if timeout is None:
+        timeout = _config()['TIMEOUT']
+
+    keys = {
+        name: _section_key(name, SECTIONS[name], restaurant, branch)
+        for name in names
+    }
+    hits = cache.get_many(list(keys.values()))
+
+    results = {}
+    cached = []
+    futures = {}
+    for name in names:
+        if keys[name] in hits:
+            results[name] = hits[keys[name]]
+            cached.append(name)
+        else:
+            futures[_submit(name, keys[name], restaurant, branch)] = name
+
+    errors = {}
+    pending = []
+    if futures:
+        done, not_done = wait(futures, timeout=timeout)
+
+        for future in done:
+            name = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                logger.error(
+                    f"Snapshot section '{name}' failed: {str(e)}", exc_info=True)
+                errors[name] = str(e)
+                results[name] = None
+                continue
+
+            if _is_failure(data):
+                errors[name] = data.get('error', 'Section failed')
+            results[name] = data
+
+        for future in not_done:
+            name = futures[future]
+            logger.warning(
+                f"Snapshot section '{name}' exceeded {timeout}s, returning partial snapshot")
+            pending.append(name)
+            results[name] = None
+
+    return {
+        'sections': {name: results[name] for name in names},
+        'cached': cached,
+        'pending': sorted(pending),
+        'errors': errors,
+        'partial': bool(pending or errors),
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+    }
+
+
+def daily_change(today, yesterday):
+    """Today vs yesterday deltas derived from the two daily sections"""
+    if not today or not yesterday:
+        return None
+
+    change = {}
+    for field in ('revenue', 'net_profit', 'order_count', 'waste_cost'):
+        current = today.get(field) or 0
+        previous = yesterday.get(field) or 0
+        change[field] = {
+            'amount': round(current - previous, 2),
+            'percentage': round((current - previous) / previous * 100, 2) if previous else None
+        }
+    return change
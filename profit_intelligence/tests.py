@@ -1,3 +1,119 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from core.benchmark import DataGenerator
+from core.jobs import claim_jobs, run_job
+from core.models import Job
+from core.tests import QueryBudgetTestCase
+from menu.models import MenuItem
+from profit_intelligence.models import MenuItemPerformance, PriceOptimization, ProfitAlert
+from profit_intelligence.menu_engineering import compute_menu_engineering, scoped_performances
+from profit_intelligence.rankings import rank_day
+from restaurants.models import Restaurant
+
+
+class ProfitDashboardQueryBudgetTests(QueryBudgetTestCase):
+    def test_profit_dashboard_within_budget(self):
+        self.assertWithinBudget('profit_intelligence:api-dashboard', 'manager',
+                                '/profit-intelligence/api/dashboard/')
+
+
+class ProfitJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generator = DataGenerator(restaurants=2, branches=1, tables=2, menu_items=6,
+                                  days=3, orders_per_day=10, waste_per_day=0)
+        generator.generate()
+        cls.manager = generator.users['manager']
+
+    def queue(self, name, params=None):
+        self.client.force_login(self.manager)
+        response = self.client.post('/api/jobs/', {'name': name, 'params': params or {}},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get(job_id=response.json()['job']['job_id'])
+        self.assertEqual(job.params['restaurant_id'], self.manager.restaurant_id)
+        self.assertEqual(claim_jobs(1), [job.id])
+        return job
+
+    def test_manager_price_optimization_runs_for_their_restaurant(self):
+        # restaurant_ids from a manager cannot widen the forced scope
+        other = Restaurant.objects.exclude(id=self.manager.restaurant_id).first()
+        job = self.queue('profit.price_optimization', {'restaurant_ids': [other.id]})
+
+        self.assertEqual(run_job(job.id), 'succeeded')
+        job.refresh_from_db()
+        self.assertEqual(job.result['restaurants'], 1)
+        self.assertFalse(PriceOptimization.objects.exclude(
+            restaurant_id=self.manager.restaurant_id).exists())
+
+    def test_manager_alert_evaluation_runs_for_their_restaurant(self):
+        other = Restaurant.objects.exclude(id=self.manager.restaurant_id).first()
+        job = self.queue('profit.alerts', {'restaurant_ids': [other.id]})
+
+        self.assertEqual(run_job(job.id), 'succeeded')
+        self.assertFalse(ProfitAlert.objects.filter(restaurant=other).exists())
+
+
+class PerformanceTestCase(TestCase):
+    day = date(2026, 1, 2)
+
+    @classmethod
+    def setUpTestData(cls):
+        generator = DataGenerator(restaurants=1, branches=1, tables=1, menu_items=4,
+                                  days=0, orders_per_day=0, waste_per_day=0)
+        generator.generate()
+        cls.manager = generator.users['manager']
+        cls.branch = generator.users['chef'].branch
+        cls.items = list(MenuItem.objects.order_by('id'))
+
+    def performance(self, item, day, quantity, revenue, cost, branch=None):
+        return MenuItemPerformance.objects.create(
+            date=day, menu_item=item, restaurant=self.manager.restaurant, branch=branch,
+            quantity_sold=quantity, revenue=Decimal(revenue), ingredient_cost=Decimal(cost))
+
+
+class MenuEngineeringTests(PerformanceTestCase):
+    def test_restaurant_rows_win_per_item_day(self):
+        item = self.items[0]
+        previous = date(2026, 1, 1)
+        # Day one has both levels, day two only its branch row
+        self.performance(item, previous, 5, '50', '20')
+        self.performance(item, previous, 5, '50', '20', branch=self.branch)
+        self.performance(item, self.day, 3, '30', '12', branch=self.branch)
+
+        rows = scoped_performances(self.manager.restaurant_id, None, previous, self.day)
+        self.assertEqual(sorted(rows.values_list('date', 'branch_id')),
+                         [(previous, None), (self.day, self.branch.id)])
+
+        matrix = compute_menu_engineering(self.manager.restaurant_id, days=3650)
+        self.assertEqual(matrix['summary']['total_quantity_sold'], 8)
+
+
+class RankingTests(PerformanceTestCase):
+    def test_ties_share_a_rank_and_unseen_items_are_new(self):
+        first, second, third, fourth = self.items
+        self.performance(first, self.day, 10, '100', '40')   # margin 60
+        self.performance(second, self.day, 5, '100', '40')   # same revenue and margin
+        self.performance(third, self.day, 3, '50', '10')     # margin 80
+        self.performance(fourth, self.day, 1, '20', '19')    # margin 5
+        self.performance(first, date(2026, 1, 1), 2, '20', '8')
+        self.performance(second, date(2026, 1, 1), 4, '40', '16')
+
+        self.assertEqual(rank_day(self.day, self.manager.restaurant_id), 4)
+        ranked = {p.menu_item_id: p for p in MenuItemPerformance.objects.filter(date=self.day)}
+
+        self.assertEqual([ranked[item.id].revenue_rank for item in self.items], [1, 1, 3, 4])
+        self.assertEqual([ranked[item.id].margin_rank for item in self.items], [2, 2, 1, 4])
+        self.assertEqual([ranked[item.id].trend for item in self.items],
+                         ['up', 'stable', 'new', 'new'])
+        self.assertEqual(ranked[third.id].quantity_change, 3)
+
+        self.client.force_login(self.manager)
+        response = self.client.get('/profit-intelligence/api/top-items/',
+                                   {'rank_by': 'margin', 'limit': 2})
+        top = [row['menu_item'] for row in response.json()['items']]
+        self.assertEqual(top[0], third.id)
+        self.assertEqual(sorted(top[1:]), sorted([first.id, second.id]))
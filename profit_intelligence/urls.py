@@ -20,6 +20,8 @@ urlpatterns += [
     # Dashboard API
     path('api/dashboard/', api_views.ProfitDashboardAPIView.as_view(),
          name='api-dashboard'),
+    path('api/snapshot/', api_views.DashboardSnapshotAPIView.as_view(),
+         name='api-snapshot'),
     path('api/daily/', api_views.DailyProfitAPIView.as_view(), name='api-daily'),
     path('api/menu-items/', api_views.MenuItemProfitAPIView.as_view(),
          name='api-menu-items'),
@@ -37,4 +39,10 @@ urlpatterns += [
          name='api-popular-items'),
     path('api/recent-activity/', api_views.RecentActivityAPIView.as_view(),
          name='api-recent-activity'),
+    path('api/top-items/', api_views.TopItemsAPIView.as_view(),
+         name='api-top-items'),
+    path('api/trending-items/', api_views.TrendingItemsAPIView.as_view(),
+         name='api-trending-items'),
+    path('api/menu-engineering/', api_views.MenuEngineeringAPIView.as_view(),
+         name='api-menu-engineering'),
 ]
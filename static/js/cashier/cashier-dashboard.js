@@ -94,24 +94,30 @@ async loadPendingBills() {
     try {
         console.log('📋 Loading pending bills...');
         
-        // Use payment API to get pending payments
-        const response = await fetch(
-            `/api/payments/cashier/pending-orders/`,  // FIXED ENDPOINT
-            { headers: this.getAuthHeaders() }
-        );
-        
-        if (response.status === 401 || response.status === 403) {
-            localStorage.clear();
-            window.location.href = '/login/';
-            return;
-        }
-        
-        if (!response.ok) {
-            throw new Error(`HTTP ${response.status}: Failed to load pending bills`);
+        // Pending orders come a page at a time; follow next_offset to the end
+        const bills = [];
+        let offset = 0;
+        while (offset !== null) {
+            const response = await fetch(
+                `/api/payments/cashier/pending-orders/?offset=${offset}`,
+                { headers: this.getAuthHeaders() }
+            );
+
+            if (response.status === 401 || response.status === 403) {
+                localStorage.clear();
+                window.location.href = '/login/';
+                return;
+            }
+
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}: Failed to load pending bills`);
+            }
+
+            const data = await response.json();
+            bills.push(...(data.orders || []));
+            offset = data.next_offset ?? null;
         }
-        
-        const data = await response.json();
-        this.pendingBills = data.orders || [];
+        this.pendingBills = bills;
         console.log(`✅ Loaded ${this.pendingBills.length} pending bills`);
         this.renderPendingBills();
         this.populateTableFilter();
@@ -4,6 +4,10 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
 from .models import Table, Cart, CartItem, Order, OrderItem
+from core.audit import record_order_transition
+from core.jobs import enqueue
+from .qr import refresh_tokens
+from .table_state import TableStateService
 import qrcode
 import io
 from django.core.files.base import ContentFile
@@ -76,7 +80,7 @@ class TableAdmin(admin.ModelAdmin):
         }),
     )
 
-    actions = ['generate_qr_codes', 'mark_as_available', 'mark_as_occupied']
+    actions = ['render_selected_qr_codes', 'mark_as_available', 'mark_as_occupied']
 
     # Custom display methods
     def branch_display(self, obj):
@@ -107,25 +111,29 @@ class TableAdmin(admin.ModelAdmin):
     qr_expiry_status.short_description = 'QR Status'
 
     # Custom actions
-    def generate_qr_codes(self, request, queryset):
-        """Admin action to generate QR codes for selected tables"""
-        for table in queryset:
-            table.refresh_qr_token()
+    def render_selected_qr_codes(self, request, queryset):
+        """Admin action: refresh tokens now, render QR images in a background job"""
+        tables = list(queryset)
+        refresh_tokens(tables)
+        job, _ = enqueue('tables.qr_codes', {'table_ids': sorted(table.pk for table in tables)},
+                         user=request.user)
         self.message_user(
             request,
-            f"Successfully generated QR codes for {queryset.count()} tables."
+            f"Refreshed QR tokens of {len(tables)} tables; QR images are rendered by job {job.job_id}."
         )
-    generate_qr_codes.short_description = "Generate/Refresh QR Codes"
+    render_selected_qr_codes.short_description = "Generate/Refresh QR Codes"
 
     def mark_as_available(self, request, queryset):
         """Mark selected tables as available"""
-        updated = queryset.update(status='available')
+        updated = TableStateService.bulk_set_status(
+            list(queryset.values_list('id', flat=True)), 'available')
         self.message_user(request, f"Marked {updated} tables as available.")
     mark_as_available.short_description = "Mark as Available"
 
     def mark_as_occupied(self, request, queryset):
         """Mark selected tables as occupied"""
-        updated = queryset.update(status='occupied')
+        updated = TableStateService.bulk_set_status(
+            list(queryset.values_list('id', flat=True)), 'occupied')
         self.message_user(request, f"Marked {updated} tables as occupied.")
     mark_as_occupied.short_description = "Mark as Occupied"
 
@@ -449,33 +457,46 @@ class OrderAdmin(admin.ModelAdmin):
         self.message_user(request, f"Confirmed {queryset.count()} orders.")
     mark_as_confirmed.short_description = "Mark as Confirmed"
 
+    def _bulk_transition(self, queryset, status, **fields):
+        """
+        One UPDATE for the selected orders not already in the status, each
+        transition audited (update() bypasses the audit hooks). Returns the
+        number of orders changed.
+        """
+        orders = list(queryset.exclude(status=status))
+        changed = Order.objects.filter(id__in=[order.id for order in orders]).exclude(
+            status=status).update(status=status, **fields)
+        for order in orders:
+            record_order_transition(order, order.status, status)
+        return changed
+
     def mark_as_preparing(self, request, queryset):
         """Mark selected orders as preparing"""
-        queryset.update(status='preparing',
-                        preparation_started_at=timezone.now())
+        changed = self._bulk_transition(queryset, 'preparing',
+                                        preparation_started_at=timezone.now())
         self.message_user(
-            request, f"Marked {queryset.count()} orders as preparing.")
+            request, f"Marked {changed} orders as preparing.")
     mark_as_preparing.short_description = "Mark as Preparing"
 
     def mark_as_ready(self, request, queryset):
         """Mark selected orders as ready"""
-        queryset.update(status='ready', ready_at=timezone.now())
+        changed = self._bulk_transition(queryset, 'ready', ready_at=timezone.now())
         self.message_user(
-            request, f"Marked {queryset.count()} orders as ready.")
+            request, f"Marked {changed} orders as ready.")
     mark_as_ready.short_description = "Mark as Ready"
 
     def mark_as_served(self, request, queryset):
         """Mark selected orders as served"""
-        queryset.update(status='served', served_at=timezone.now())
+        changed = self._bulk_transition(queryset, 'served', served_at=timezone.now())
         self.message_user(
-            request, f"Marked {queryset.count()} orders as served.")
+            request, f"Marked {changed} orders as served.")
     mark_as_served.short_description = "Mark as Served"
 
     def mark_as_completed(self, request, queryset):
         """Mark selected orders as completed"""
-        queryset.update(status='completed', completed_at=timezone.now())
+        changed = self._bulk_transition(queryset, 'completed', completed_at=timezone.now())
         self.message_user(
-            request, f"Marked {queryset.count()} orders as completed.")
+            request, f"Marked {changed} orders as completed.")
     mark_as_completed.short_description = "Mark as Completed"
 
     def mark_as_paid(self, request, queryset):
@@ -0,0 +1,255 @@
+# tables/eta.py
+"""
+Load-aware order ready time estimates.
+
+Per-item preparation times are learned from the branch's recent history
+(preparation_started_at -> ready_at of finished orders): every order
+gives an observed/planned ratio, planned being its slowest item's menu
+preparation_time, and each item keeps a rolling window of the ratios of
+its last orders. The window median, shrunk toward the menu time while
+there are few samples, scales the item's menu preparation_time. Learned
+estimates are cached per branch.
+
+Ready times are then computed for every open order of a scope in one
+pass: the kitchen queue is replayed station by station (orders being
+prepared hold a slot, then priority and oldest orders first, then orders
+still waiting for confirmation), each station working on STATION_CAPACITY
+tickets at a time. That is two queries however many orders are open.
+"""
+import heapq
+import logging
+import math
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from menu.models import DEFAULT_STATION
+
+from .models import Order, OrderItem
+
+logger = logging.getLogger(__name__)
+
+OPEN_ORDER_STATUSES = ('preparing', 'confirmed', 'pending')
+
+
+def eta_config():
+    config = {
+        'HISTORY_DAYS': 30,  # finished orders learned from
+        'WINDOW': 50,  # rolling window of observations per item
+        'PRIOR_WEIGHT': 5,  # samples worth of trust in the menu time
+        'MIN_RATIO': 0.5,  # clamp observed/planned ratios (bad timestamps)
+        'MAX_RATIO': 4.0,
+        'STATION_CAPACITY': 2,  # tickets a station works on at once
+        'STATION_CAPACITIES': {},  # per-station overrides, e.g. {'grill': 3}
+        'DEFAULT_PREPARATION_TIME': 15,  # minutes, item without a menu time
+        'OVERDUE_GRACE': 2,  # minutes still expected for an overdue order
+        'CACHE_TIMEOUT': 600,  # seconds learned estimates are cached
+    }
+    config.update(getattr(settings, 'ORDER_ETA', {}))
+    return config
+
+
+# ============ LEARNING ============
+
+def _median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def learn_item_prep_times(branch_id, config=None):
+    """
+    Rolling per-item preparation statistics of one branch (one query).
+
+    Returns {menu_item_id: {'minutes', 'ratio', 'samples'}}.
+    """
+    config = config or eta_config()
+    since = timezone.now() - timedelta(days=config['HISTORY_DAYS'])
+
+    rows = OrderItem.objects.filter(
+        order__table__branch_id=branch_id,
+        order__ready_at__gte=since,
+        order__preparation_started_at__isnull=False,
+    ).order_by('-order__ready_at', 'order_id').values_list(
+        'order_id', 'menu_item_id', 'menu_item__preparation_time',
+        'order__preparation_started_at', 'order__ready_at')
+
+    # Group item rows per order, newest order first
+    orders = {}
+    for order_id, item_id, prep_time, started_at, ready_at in rows:
+        order = orders.get(order_id)
+        if order is None:
+            order = orders[order_id] = {
+                'minutes': (ready_at - started_at).total_seconds() / 60,
+                'planned': 0,
+                'items': {},
+            }
+        prep_time = prep_time or config['DEFAULT_PREPARATION_TIME']
+        order['planned'] = max(order['planned'], prep_time)
+        order['items'][item_id] = prep_time
+
+    windows = defaultdict(lambda: deque(maxlen=config['WINDOW']))
+    menu_times = {}
+    for order in orders.values():
+        if order['minutes'] <= 0 or not order['planned']:
+            continue
+        ratio = min(config['MAX_RATIO'], max(
+            config['MIN_RATIO'], order['minutes'] / order['planned']))
+        for item_id, prep_time in order['items'].items():
+            window = windows[item_id]
+            # Orders come newest first; the window keeps the latest ones
+            if len(window) < window.maxlen:
+                window.append(ratio)
+            menu_times[item_id] = prep_time
+
+    prior = config['PRIOR_WEIGHT']
+    estimates = {}
+    for item_id, window in windows.items():
+        samples = len(window)
+        ratio = (samples * _median(window) + prior) / (samples + prior)
+        estimates[item_id] = {
+            'minutes': round(menu_times[item_id] * ratio, 1),
+            'ratio': round(ratio, 3),
+            'samples': samples,
+        }
+    return estimates
+
+
+def get_item_prep_times(branch_id, config=None):
+    """Learned estimates of a branch, cached for CACHE_TIMEOUT"""
+    config = config or eta_config()
+    key = f'eta:item-prep:{branch_id}'
+    estimates = cache.get(key)
+    if estimates is None:
+        estimates = learn_item_prep_times(branch_id, config)
+        logger.debug(f"Learned preparation times of {len(estimates)} items for branch {branch_id}")
+        cache.set(key, estimates, config['CACHE_TIMEOUT'])
+    return estimates
+
+
+# ============ ESTIMATION ============
+
+def _station_slots(capacity, now):
+    slots = [now] * max(1, capacity)
+    heapq.heapify(slots)
+    return slots
+
+
+def _ticket_minutes(items, learned, config):
+    """Minutes a station needs for its part of an order: its slowest item"""
+    minutes = 0
+    for item_id, prep_time in items:
+        estimate = learned.get(item_id)
+        if estimate is not None:
+            minutes = max(minutes, estimate['minutes'])
+        else:
+            minutes = max(minutes, prep_time or config['DEFAULT_PREPARATION_TIME'])
+    return minutes
+
+
+def estimate_ready_times(queryset, now=None):
+    """
+    Estimated ready time of every open order of an (already scoped) Order
+    queryset.
+
+    Returns {order_id: {'estimated_ready_at', 'minutes_remaining',
+    'queue_position', 'learned'}}; queue_position is 0 for orders already
+    being prepared.
+    """
+    config = eta_config()
+    now = now or timezone.now()
+
+    rows = list(
+        queryset
+        .select_related(None)
+        .prefetch_related(None)
+        .filter(status__in=OPEN_ORDER_STATUSES, table__isnull=False)
+        .order_by('-is_priority', 'placed_at', 'id')
+        .values_list('id', 'table__branch_id', 'status', 'preparation_started_at')
+    )
+    if not rows:
+        return {}
+
+    order_items = defaultdict(lambda: defaultdict(list))
+    items = OrderItem.objects.filter(
+        order_id__in=[row[0] for row in rows]
+    ).values_list('order_id', 'station', 'menu_item_id', 'menu_item__preparation_time')
+    for order_id, station, item_id, prep_time in items:
+        order_items[order_id][station or DEFAULT_STATION].append((item_id, prep_time))
+
+    by_branch = defaultdict(list)
+    for row in rows:
+        by_branch[row[1]].append(row)
+
+    # Being prepared first (they hold station slots), then the queue,
+    # then orders still waiting for a waiter to confirm them
+    rank = {status: index for index, status in enumerate(OPEN_ORDER_STATUSES)}
+
+    grace = timedelta(minutes=config['OVERDUE_GRACE'])
+    etas = {}
+    for branch_id, branch_rows in by_branch.items():
+        learned = get_item_prep_times(branch_id, config)
+        branch_rows.sort(key=lambda row: rank[row[2]])
+        stations = {}
+        position = 0
+
+        for order_id, _, status, started_at in branch_rows:
+            ready_at = now
+            for station, station_items in order_items[order_id].items():
+                slots = stations.get(station)
+                if slots is None:
+                    capacity = config['STATION_CAPACITIES'].get(
+                        station, config['STATION_CAPACITY'])
+                    slots = stations[station] = _station_slots(capacity, now)
+
+                duration = timedelta(minutes=_ticket_minutes(station_items, learned, config))
+                if status == 'preparing' and started_at:
+                    # An overdue order is still expected a little later, not now
+                    finish = max(started_at + duration, now + grace)
+                else:
+                    finish = slots[0] + duration
+                heapq.heapreplace(slots, max(slots[0], finish))
+                ready_at = max(ready_at, finish)
+
+            if status != 'preparing':
+                position += 1
+            etas[order_id] = {
+                'estimated_ready_at': ready_at,
+                'minutes_remaining': math.ceil((ready_at - now).total_seconds() / 60),
+                'queue_position': 0 if status == 'preparing' else position,
+                'learned': any(
+                    item_id in learned
+                    for station_items in order_items[order_id].values()
+                    for item_id, _ in station_items),
+            }
+
+    return etas
+
+
+def estimate_orders_ready_times(orders, now=None):
+    """
+    ETAs of the given orders only, replaying just their branches' queues
+    (orders need their table loaded)
+    """
+    branch_ids = {order.table.branch_id for order in orders
+                  if order.status in OPEN_ORDER_STATUSES and order.table_id}
+    if not branch_ids:
+        return {}
+    etas = estimate_ready_times(Order.objects.filter(table__branch_id__in=branch_ids), now)
+    order_ids = {order.id for order in orders}
+    return {order_id: eta for order_id, eta in etas.items() if order_id in order_ids}
+
+
+def estimate_order_ready_time(order):
+    """ETA of a single order within its branch's current queue"""
+    branch_id = Order.objects.filter(id=order.id).values_list(
+        'table__branch_id', flat=True).first()
+    if not branch_id:
+        return None
+    return estimate_ready_times(
+        Order.objects.filter(table__branch_id=branch_id)).get(order.id)
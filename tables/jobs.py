@@ -0,0 +1,22 @@
+# tables/jobs.py - Background job handlers (see core.jobs)
+from core.jobs import job_handler
+
+from .models import Table
+from .qr import generate_qr_codes
+
+
+@job_handler('tables.qr_codes')
+def render_table_qr_codes(job, table_ids=None, restaurant_id=None, branch_id=None):
+    """Render the missing QR images of tables (a branch's active ones by default)"""
+    tables = Table.objects.filter(is_active=True)
+    if table_ids:
+        tables = Table.objects.filter(id__in=table_ids)
+    if restaurant_id:
+        tables = tables.filter(branch__restaurant_id=restaurant_id)
+    if branch_id:
+        tables = tables.filter(branch_id=branch_id)
+
+    tables = list(tables)
+    # A job worker is not a web worker: rendering may fork processes
+    changed = generate_qr_codes(tables, processes=True)
+    return {'tables': len(tables), 'qr_codes_updated': changed}
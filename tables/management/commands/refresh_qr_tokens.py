@@ -0,0 +1,58 @@
+# tables/management/commands/refresh_qr_tokens.py
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurants.models import Branch
+from tables.models import Table
+from tables.qr import build_branch_sheet, generate_qr_codes, refresh_branch_tokens
+
+
+class Command(BaseCommand):
+    help = ('Rotate expiring table QR tokens branch by branch, render missing '
+            'QR images, and optionally write printable QR sheets')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--branch', type=int, action='append', dest='branches',
+                            help='Branch id (repeatable); all active branches by default')
+        parser.add_argument('--within-hours', type=float, default=1,
+                            help='Rotate tokens expiring within this many hours')
+        parser.add_argument('--force', action='store_true',
+                            help='Rotate every token, expiring or not')
+        parser.add_argument('--render', action='store_true',
+                            help='Also render QR images that are missing')
+        parser.add_argument('--max-workers', type=int,
+                            help='Processes rendering QR images')
+        parser.add_argument('--sheet-dir',
+                            help='Write one printable sheet per branch to this directory')
+        parser.add_argument('--format', choices=['pdf', 'png'], default='pdf',
+                            help='Sheet format: multi-page PDF or PNG sprite sheet')
+
+    def handle(self, *args, **options):
+        branches = Branch.objects.filter(is_active=True)
+        if options['branches']:
+            branches = Branch.objects.filter(id__in=options['branches'])
+            missing = set(options['branches']) - set(branches.values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"Unknown branches: {', '.join(map(str, sorted(missing)))}")
+
+        total = 0
+        for branch in branches.order_by('id'):
+            rotated = refresh_branch_tokens(
+                branch.id, within_hours=options['within_hours'], force=options['force'])
+            total += rotated
+            line = f"{branch.name}: {rotated} token(s) rotated"
+
+            if options['render']:
+                tables = Table.objects.filter(branch=branch, is_active=True)
+                changed = generate_qr_codes(
+                    tables, workers=options['max_workers'], processes=True)
+                line += f", {changed} QR image(s) updated"
+
+            if options['sheet_dir']:
+                path = f"{options['sheet_dir'].rstrip('/')}/branch_{branch.id}_qr_codes.{options['format']}"
+                with open(path, 'wb') as f:
+                    f.write(build_branch_sheet(branch.id, options['format']))
+                line += f", sheet written to {path}"
+
+            self.stdout.write(line)
+
+        self.stdout.write(self.style.SUCCESS(f"Rotated {total} QR token(s)"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-19 11:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurants', '0001_initial'),
+        ('tables', '0005_order_chef'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='station',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.CreateModel(
+            name='StationTicket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('station', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('preparing', 'Preparing'), ('ready', 'Ready'), ('cancelled', 'Cancelled')], default='queued', max_length=20)),
+                ('is_priority', models.BooleanField(default=False)),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('ready_at', models.DateTimeField(blank=True, null=True)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='station_tickets', to='restaurants.branch')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='station_tickets', to='tables.order')),
+            ],
+            options={
+                'ordering': ['-is_priority', 'queued_at'],
+                'indexes': [models.Index(fields=['branch', 'station', 'status'], name='tables_stat_branch__e440cd_idx')],
+                'unique_together': {('order', 'station')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 14:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def capture_unit_costs(apps, schema_editor):
+    """Existing lines get today's menu item cost, the best cost known for them"""
+    OrderItem = apps.get_model('tables', 'OrderItem')
+    MenuItem = apps.get_model('menu', 'MenuItem')
+    OrderItem.objects.filter(unit_cost__isnull=True).update(unit_cost=Subquery(
+        MenuItem.objects.filter(id=OuterRef('menu_item_id')).values('cost_price')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tables', '0006_orderitem_station_stationticket'),
+        ('menu', '0003_category_station_menuitem_station'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='unit_cost',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(capture_unit_costs, migrations.RunPython.noop),
+    ]
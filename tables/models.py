@@ -2,10 +2,6 @@ from decimal import Decimal
 from django.db import models
 from django.conf import settings
 from restaurants.models import Branch
-import qrcode
-import io
-from django.core.files.base import ContentFile
-import uuid
 from django.utils import timezone
 from menu.models import MenuItem
 
@@ -46,43 +42,31 @@ class Table(models.Model):
         return f"Table {self.table_number} - {branch_name}"
 
     def save(self, *args, **kwargs):
-        # Generate QR token if not exists
+        # Partial saves (update_fields) never touch the QR token/image
+        if kwargs.get('update_fields') is not None:
+            return super().save(*args, **kwargs)
+
+        super().save(*args, **kwargs)
+
+        # Signed QR tokens carry the table id, so new tables get theirs after the insert
         if not self.qr_token:
-            self.qr_token = f"{self.branch.id}:{uuid.uuid4().hex}"
-            self.qr_expires_at = timezone.now() + timezone.timedelta(hours=4)  # 4-hour expiry
+            self.assign_qr_token()
+            super().save(update_fields=['qr_token', 'qr_expires_at'])
 
-        # Generate QR code image if not exists
-        if not self.qr_code and self.qr_token:
+        # The QR payload contains the table id, so the image follows the insert
+        if not self.qr_code:
             self.generate_qr_code()
 
-        super().save(*args, **kwargs)
+    def assign_qr_token(self):
+        from .qr import qr_expiry
+        from .qr_tokens import sign_qr_token
+        self.qr_expires_at = qr_expiry()
+        self.qr_token = sign_qr_token(self.pk, self.branch_id, self.qr_expires_at)
 
     def generate_qr_code(self):
-        """Generate QR code for the table"""
-        # Create QR code data
-        qr_data = f"http://localhost:8000/qr-menu/{self.branch.restaurant.id}/{self.id}/"
-
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        # Save to BytesIO
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-
-        # Save to ImageField
-        filename = f"table_{self.table_number}_{self.branch.id}_qr.png"
-        self.qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
+        """Point the table at its QR image (rendered only if missing)"""
+        from .qr import generate_qr_codes
+        generate_qr_codes([self])
 
     def is_qr_valid(self):
         """Check if QR token is still valid"""
@@ -91,11 +75,13 @@ class Table(models.Model):
         return timezone.now() < self.qr_expires_at
 
     def refresh_qr_token(self):
-        """Refresh QR token (for security)"""
-        self.qr_token = f"{self.branch.id}:{uuid.uuid4().hex}"
-        self.qr_expires_at = timezone.now() + timezone.timedelta(hours=4)
+        """Refresh QR token (for security); the replaced token is revoked"""
+        from .qr_tokens import revoke_qr_tokens
+        replaced = self.qr_token
+        self.assign_qr_token()
+        self.save(update_fields=['qr_token', 'qr_expires_at', 'updated_at'])
+        revoke_qr_tokens(replaced)
         self.generate_qr_code()
-        self.save()
 
 
 # Additional models related to table reservations, orders, etc.
@@ -405,9 +391,8 @@ class Order(models.Model):
         self.save()
 
         # Update table status
-        if self.table:
-            self.table.status = 'cleaning'
-            self.table.save()
+        from .table_state import TableStateService
+        TableStateService.set_status(self.table_id, 'cleaning')
 
         return self
 
@@ -430,7 +415,11 @@ class OrderItem(models.Model):
     quantity = models.IntegerField(default=1)
     unit_price = models.DecimalField(
         max_digits=10, decimal_places=2)  # Price at time of order
+    unit_cost = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True)  # Ingredient cost at time of order
     special_instructions = models.TextField(blank=True)
+    # Kitchen station at time of order (menu item's, else its category's)
+    station = models.CharField(max_length=100, blank=True)
 
     class Meta:
         ordering = ['id']
@@ -446,7 +435,44 @@ class OrderItem(models.Model):
         # Store current menu item price
         if not self.unit_price:
             self.unit_price = self.menu_item.price
+        if self.unit_cost is None:
+            self.unit_cost = self.menu_item.cost_price
+        if not self.station:
+            self.station = self.menu_item.get_station()
         super().save(*args, **kwargs)
 
 
+class StationTicket(models.Model):
+    """The part of a confirmed order one kitchen station has to prepare"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('preparing', 'Preparing'),
+        ('ready', 'Ready'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name='station_tickets')
+    branch = models.ForeignKey(
+        Branch, on_delete=models.CASCADE, related_name='station_tickets')
+    station = models.CharField(max_length=100)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='queued')
+    is_priority = models.BooleanField(default=False)
+
+    queued_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    ready_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-is_priority', 'queued_at']
+        unique_together = ['order', 'station']
+        indexes = [
+            models.Index(fields=['branch', 'station', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.station} ticket - Order #{self.order.order_number}"
+
+
 #
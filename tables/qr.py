@@ -0,0 +1,259 @@
+# tables/qr.py
+"""
+QR code generation pipeline.
+
+QR images are content-addressed: the file name is a hash of the payload
+(the table's menu URL) and the render settings, so a payload that did not
+change is never rendered again and identical payloads share one file.
+Missing images of a batch are rendered in a worker pool and the tables
+are pointed at their files with one bulk_update. Inside a web request the
+pool is threads: forking a web worker would copy its open connections and
+threads. Processes are only used by the refresh_qr_tokens command and the
+'tables.qr_codes' job (processes=True).
+
+Rotating qr_tokens (signed, see tables.qr_tokens) does not change the
+payload, so a bulk refresh of a whole branch is two statements and no
+rendering at all.
+"""
+import hashlib
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+
+import qrcode
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageDraw, ImageFont
+
+from .models import Table
+from .qr_tokens import revoke_qr_tokens, sign_qr_token
+
+logger = logging.getLogger(__name__)
+
+QR_DIRECTORY = 'qr_codes'
+
+
+def qr_config():
+    config = {
+        'BASE_URL': 'http://localhost:8000',  # host encoded in the QR codes
+        'TOKEN_TTL_HOURS': 4,
+        'BOX_SIZE': 10,
+        'BORDER': 4,
+        'MAX_WORKERS': 4,  # render threads/processes
+        'MIN_PARALLEL': 8,  # smaller batches render in-process
+        'SHEET_COLUMNS': 3,  # QR codes per row of a print sheet
+    }
+    config.update(getattr(settings, 'QR_CODES', {}))
+    return config
+
+
+# ============ TOKENS ============
+
+def qr_expiry(config=None):
+    config = config or qr_config()
+    return timezone.now() + timedelta(hours=config['TOKEN_TTL_HOURS'])
+
+
+def refresh_branch_tokens(branch_id, within_hours=0, force=False):
+    """
+    Rotate the qr_tokens of a branch's active tables in one pass.
+
+    Only tables whose token is missing or expires within `within_hours`
+    are rotated, unless force. Returns the number of tables rotated.
+    """
+    tables = Table.objects.filter(branch_id=branch_id, is_active=True)
+    if not force:
+        horizon = timezone.now() + timedelta(hours=within_hours)
+        tables = tables.filter(
+            Q(qr_token__isnull=True) | Q(qr_token='') |
+            Q(qr_expires_at__isnull=True) | Q(qr_expires_at__lte=horizon))
+
+    rotated = refresh_tokens(tables.only('id', 'branch_id', 'qr_token'))
+    logger.info(f"Rotated {rotated} QR tokens for branch {branch_id}")
+    return rotated
+
+
+def refresh_tokens(tables, config=None):
+    """
+    Give tables new signed qr_tokens with one bulk_update and revoke the
+    tokens they replace. Returns the count.
+    """
+    tables = [table for table in tables if table.pk]
+    expires_at = qr_expiry(config)
+    replaced = []
+    for table in tables:
+        replaced.append(table.qr_token)
+        table.qr_token = sign_qr_token(table.pk, table.branch_id, expires_at)
+        table.qr_expires_at = expires_at
+
+    Table.objects.bulk_update(tables, ['qr_token', 'qr_expires_at'], batch_size=500)
+    revoke_qr_tokens(*replaced)
+    return len(tables)
+
+
+# ============ RENDERING ============
+
+def qr_payload(restaurant_id, table_id, config=None):
+    config = config or qr_config()
+    return f"{config['BASE_URL'].rstrip('/')}/qr-menu/{restaurant_id}/{table_id}/"
+
+
+def qr_file_name(payload, config=None):
+    """Content-addressed storage name of a payload's QR image"""
+    config = config or qr_config()
+    digest = hashlib.sha256(
+        f"{payload}|{config['BOX_SIZE']}|{config['BORDER']}".encode('utf-8')
+    ).hexdigest()[:32]
+    return f'{QR_DIRECTORY}/{digest}.png'
+
+
+def render_qr_png(payload, box_size=10, border=4):
+    """PNG bytes of a payload's QR code (runs in pool worker processes)"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=box_size,
+        border=border,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+
+    buffer = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _render_job(job):
+    payload, box_size, border = job
+    return render_qr_png(payload, box_size, border)
+
+
+def render_missing(payloads, config=None, workers=None, processes=False):
+    """
+    Render and store the payloads whose file does not exist yet, in a
+    thread pool or (processes=True, never inside a request) a process pool.
+
+    Returns {payload: storage name}.
+    """
+    config = config or qr_config()
+    names = {payload: qr_file_name(payload, config) for payload in set(payloads)}
+    missing = [payload for payload, name in names.items()
+               if not default_storage.exists(name)]
+    if not missing:
+        return names
+
+    jobs = [(payload, config['BOX_SIZE'], config['BORDER']) for payload in missing]
+    workers = workers or config['MAX_WORKERS']
+    if workers > 1 and len(jobs) >= config['MIN_PARALLEL']:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with pool(max_workers=workers) as executor:
+            images = list(executor.map(_render_job, jobs, chunksize=chunksize))
+    else:
+        images = [_render_job(job) for job in jobs]
+
+    for payload, image in zip(missing, images):
+        default_storage.save(names[payload], ContentFile(image))
+
+    logger.info(f"Rendered {len(missing)} QR codes ({len(names) - len(missing)} reused)")
+    return names
+
+
+def generate_qr_codes(tables, workers=None, processes=False):
+    """
+    Point every table at its content-addressed QR image, rendering only
+    missing images. Returns the number of tables whose qr_code changed.
+    """
+    config = qr_config()
+    tables = [table for table in tables if table.pk]
+    if not tables:
+        return 0
+
+    restaurant_ids = dict(
+        Table.objects.filter(id__in=[table.pk for table in tables])
+        .values_list('id', 'branch__restaurant_id'))
+    payloads = {
+        table.pk: qr_payload(restaurant_ids[table.pk], table.pk, config)
+        for table in tables
+    }
+    names = render_missing(payloads.values(), config, workers, processes)
+
+    changed = []
+    for table in tables:
+        name = names[payloads[table.pk]]
+        if table.qr_code.name != name:
+            table.qr_code.name = name
+            changed.append(table)
+
+    Table.objects.bulk_update(changed, ['qr_code'], batch_size=500)
+    return len(changed)
+
+
+# ============ PRINT SHEETS ============
+
+SHEET_PAGE_SIZE = (1240, 1754)  # A4 at 150 dpi
+SHEET_MARGIN = 60
+LABEL_HEIGHT = 60
+
+
+def _label_font():
+    try:
+        return ImageFont.truetype('DejaVuSans-Bold.ttf', 32)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def build_branch_sheet(branch_id, image_format='pdf'):
+    """
+    One printable document with the QR code of every active table of a
+    branch: a multi-page PDF, or a single PNG sprite sheet.
+    """
+    config = qr_config()
+    tables = list(
+        Table.objects.filter(branch_id=branch_id, is_active=True)
+        .order_by('table_number'))
+    generate_qr_codes(tables)
+
+    columns = config['SHEET_COLUMNS']
+    page_width = SHEET_PAGE_SIZE[0]
+    cell_width = (page_width - 2 * SHEET_MARGIN) // columns
+    cell_height = cell_width + LABEL_HEIGHT
+    qr_size = cell_width - 40
+    font = _label_font()
+
+    if image_format == 'pdf':
+        page_height = SHEET_PAGE_SIZE[1]
+        per_page = columns * max(1, (page_height - 2 * SHEET_MARGIN) // cell_height)
+    else:
+        # A sprite sheet is one page tall enough for every table
+        per_page = max(len(tables), 1)
+        rows = -(-per_page // columns)
+        page_height = 2 * SHEET_MARGIN + rows * cell_height
+
+    pages = []
+    for start in range(0, max(len(tables), 1), per_page):
+        page = Image.new('RGB', (page_width, page_height), 'white')
+        draw = ImageDraw.Draw(page)
+        for index, table in enumerate(tables[start:start + per_page]):
+            x = SHEET_MARGIN + (index % columns) * cell_width
+            y = SHEET_MARGIN + (index // columns) * cell_height
+            with default_storage.open(table.qr_code.name, 'rb') as f:
+                image = Image.open(f).convert('RGB').resize((qr_size, qr_size))
+            page.paste(image, (x + 20, y))
+            label = f"Table {table.table_number}"
+            if table.table_name:
+                label += f" - {table.table_name}"
+            draw.text((x + 20, y + qr_size + 10), label, fill='black', font=font)
+        pages.append(page)
+
+    buffer = io.BytesIO()
+    if image_format == 'pdf':
+        pages[0].save(buffer, format='PDF', resolution=150,
+                      save_all=True, append_images=pages[1:])
+    else:
+        pages[0].save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
@@ -0,0 +1,200 @@
+# tables/qr_tokens.py
+"""
+Signed, stateless QR tokens.
+
+A token is "<table_id>.<branch_id>.<expiry>.<nonce>.<signature>", the
+signature being an HMAC (SECRET_KEY derived) over everything before it.
+Validating one is CPU-only: parse, check the signature, the expiry and
+the revocation set. The Table row is only read when an order is submitted;
+the public table info a scan shows is cached per table.
+
+Revoked tokens (rotated, or of deactivated/deleted tables) are kept until
+they would have expired anyway: each revocation is its own cache key,
+qr:revoked:<signature>, expiring with the token, so concurrent revocations
+in different processes never overwrite each other. A process remembers
+the signatures it found revoked, and those it found valid for
+REVOCATION_SYNC_INTERVAL seconds, so a scan normally costs no cache read.
+"""
+import logging
+import secrets
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from core.caching import branch_tag, get_or_set_tagged
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'tables.qr_tokens'
+SIGNATURE_LENGTH = 32
+REVOCATION_KEY_PREFIX = 'qr:revoked:'
+TABLE_INFO_CACHE_TIMEOUT = 60 * 10
+
+QRTokenClaims = namedtuple('QRTokenClaims', 'table_id branch_id expires_at signature')
+
+
+class InvalidQRToken(Exception):
+    """reason: 'malformed', 'signature', 'expired' or 'revoked'"""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def _signature(body):
+    return salted_hmac(
+        TOKEN_SALT, body, algorithm='sha256').hexdigest()[:SIGNATURE_LENGTH]
+
+
+def sign_qr_token(table_id, branch_id, expires_at):
+    body = f"{table_id}.{branch_id}.{int(expires_at.timestamp()):x}.{secrets.token_hex(4)}"
+    return f"{body}.{_signature(body)}"
+
+
+def is_signed_token(token):
+    return bool(token) and token.count('.') == 4
+
+
+def parse_qr_token(token):
+    """Claims of a token, without checking its signature"""
+    try:
+        table_id, branch_id, expiry, _, signature = token.split('.')
+        return QRTokenClaims(
+            int(table_id), int(branch_id),
+            datetime.fromtimestamp(int(expiry, 16), tz=dt_timezone.utc), signature)
+    except (AttributeError, ValueError, OverflowError):
+        raise InvalidQRToken('malformed')
+
+
+def verify_qr_token(token, now=None):
+    """Claims of a valid token; raises InvalidQRToken otherwise (no DB access)"""
+    claims = parse_qr_token(token)
+    body = token.rsplit('.', 1)[0]
+    if not constant_time_compare(_signature(body), claims.signature):
+        raise InvalidQRToken('signature')
+    if claims.expires_at <= (now or datetime.now(dt_timezone.utc)):
+        raise InvalidQRToken('expired')
+    if revocations.is_revoked(claims.signature):
+        raise InvalidQRToken('revoked')
+    return claims
+
+
+# ============ REVOCATION ============
+
+def _revocation_key(signature):
+    return f'{REVOCATION_KEY_PREFIX}{signature}'
+
+
+class RevocationSet:
+    """Revoked token signatures (a cache key each), remembered per process"""
+
+    def __init__(self, sync_interval):
+        self.sync_interval = sync_interval
+        self.revoked = {}  # signature -> expiry (unix time)
+        self.valid = {}  # signature -> when it was last found not revoked (monotonic)
+        self.pruned_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def revoke(self, tokens):
+        entries = {}
+        for token in tokens:
+            if not is_signed_token(token):
+                continue
+            try:
+                claims = parse_qr_token(token)
+            except InvalidQRToken:
+                continue
+            entries[claims.signature] = claims.expires_at.timestamp()
+
+        now = time.time()
+        entries = {signature: expiry for signature, expiry in entries.items() if expiry > now}
+        if not entries:
+            return 0
+
+        for signature, expiry in entries.items():
+            cache.set(_revocation_key(signature), expiry, max(1, int(expiry - now) + 1))
+        with self.lock:
+            self.revoked.update(entries)
+            for signature in entries:
+                self.valid.pop(signature, None)
+        logger.info(f"Revoked {len(entries)} QR token(s)")
+        return len(entries)
+
+    def is_revoked(self, signature):
+        now = time.monotonic()
+        if now - self.pruned_at > self.sync_interval:
+            self._prune(now)
+        if signature in self.revoked:
+            return True
+        checked_at = self.valid.get(signature)
+        if checked_at is not None and now - checked_at < self.sync_interval:
+            return False
+
+        expiry = cache.get(_revocation_key(signature))
+        with self.lock:
+            if expiry is not None:
+                self.revoked[signature] = expiry
+                return True
+            self.valid[signature] = now
+        return False
+
+    def clear(self):
+        """Forget what this process knows (the cache keys expire on their own)"""
+        with self.lock:
+            self.revoked = {}
+            self.valid = {}
+
+    def _prune(self, now):
+        expired_before = time.time()
+        with self.lock:
+            self.revoked = {signature: expiry for signature, expiry in self.revoked.items()
+                            if expiry > expired_before}
+            self.valid = {signature: checked_at for signature, checked_at in self.valid.items()
+                          if now - checked_at < self.sync_interval}
+            self.pruned_at = now
+
+
+revocations = RevocationSet(
+    getattr(settings, 'QR_CODES', {}).get('REVOCATION_SYNC_INTERVAL', 30))
+
+
+def revoke_qr_tokens(*tokens):
+    return revocations.revoke(tokens)
+
+
+# ============ TABLE INFO ============
+
+def get_qr_table_info(table_id, branch_id):
+    """Public info a scan shows, cached until the branch's tables change"""
+    def compute():
+        from .models import Table
+
+        table = Table.objects.filter(id=table_id, branch_id=branch_id, is_active=True).select_related(
+            'branch__restaurant').first()
+        if table is None:
+            return {}
+        restaurant = table.branch.restaurant
+        return {
+            'table': {
+                'id': table.id,
+                'table_number': table.table_number,
+                'table_name': table.table_name,
+                'capacity': table.capacity,
+                'branch_name': table.branch.name,
+            },
+            'restaurant': {
+                'id': restaurant.id,
+                'name': restaurant.name,
+                'logo': restaurant.logo.url if restaurant.logo else None,
+            },
+        }
+
+    # {} (not None) caches "no such active table" too
+    return get_or_set_tagged(
+        f'qr:table-info:{table_id}', [branch_tag(branch_id, 'tables')],
+        compute, TABLE_INFO_CACHE_TIMEOUT) or None
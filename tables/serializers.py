@@ -4,6 +4,9 @@ from menu.serializers import MenuItemSerializer
 from restaurants.serializers import BranchSerializer
 from accounts.serializers import UserSerializer
 from menu.models import MenuItem
+from core.signals import invalidate_branch
+from django.db import transaction
+from .qr import generate_qr_codes, refresh_tokens
 
 
 class TableSerializer(serializers.ModelSerializer):
@@ -41,18 +44,22 @@ class TableCreateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         count = validated_data.pop('count', 1)
-        tables = []
+        if count == 1:
+            return Table.objects.create(**validated_data)
 
+        # Insert the batch at once, then sign tokens and render QR codes in one pass
+        branch = validated_data['branch']
+        tables = []
         for i in range(count):
             table_data = validated_data.copy()
-            if count > 1:
-                table_data['table_number'] = f"{validated_data['table_number']}{i+1:02d}"
-
-            table = Table.objects.create(**table_data)
-            tables.append(table)
-
-        if count == 1:
-            return tables[0]
+            table_data['table_number'] = f"{validated_data['table_number']}{i+1:02d}"
+            tables.append(Table(**table_data))
+
+        with transaction.atomic():
+            Table.objects.bulk_create(tables)
+            refresh_tokens(tables)
+        generate_qr_codes(tables)
+        invalidate_branch(branch.id, 'tables')
         return tables
 
 
@@ -105,6 +112,7 @@ class OrderSerializer(serializers.ModelSerializer):
     status_display = serializers.CharField(
         source='get_status_display', read_only=True)
     preparation_time = serializers.SerializerMethodField()
+    eta = serializers.SerializerMethodField()
 
     # Add this field to make it easier for JavaScript
     table_number = serializers.SerializerMethodField()
@@ -120,7 +128,7 @@ class OrderSerializer(serializers.ModelSerializer):
             'notes', 'subtotal', 'tax_amount', 'service_charge', 'discount_amount',
             'total_amount', 'placed_at', 'confirmed_at', 'preparation_started_at',
             'ready_at', 'served_at', 'completed_at', 'cancelled_at', 'is_paid',
-            'is_priority', 'requires_waiter_confirmation', 'items', 'preparation_time', 'items_count', 'is_served'
+            'is_priority', 'requires_waiter_confirmation', 'items', 'preparation_time', 'eta', 'items_count', 'is_served'
         ]
         read_only_fields = [
             'id', 'order_number', 'placed_at', 'confirmed_at', 'preparation_started_at',
@@ -130,6 +138,10 @@ class OrderSerializer(serializers.ModelSerializer):
     def get_preparation_time(self, obj):
         return obj.get_preparation_time()
 
+    def get_eta(self, obj):
+        # Computed in bulk by the view (tables.eta.estimate_ready_times)
+        return self.context.get('etas', {}).get(obj.id)
+
     def get_table_number(self, obj):
         if obj.table:
             return obj.table.table_number
@@ -0,0 +1,34 @@
+# tables/signals.py - Route kitchen orders to station queues, revoke QR tokens
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Order, OrderItem, Table
+from .qr_tokens import revoke_qr_tokens
+from .stations import (
+    KITCHEN_ORDER_STATUSES, build_station_tickets, route_order_item,
+    sync_station_tickets)
+
+
+@receiver(post_save, sender=Order)
+def route_order_to_stations(sender, instance, created, update_fields=None, **kwargs):
+    """Split an order into station tickets once it reaches the kitchen"""
+    if update_fields and 'status' not in update_fields:
+        return
+
+    if instance.status in KITCHEN_ORDER_STATUSES and not instance.station_tickets.exists():
+        build_station_tickets(instance)
+    sync_station_tickets(instance)
+
+
+@receiver(post_save, sender=OrderItem)
+def route_item_to_station(sender, instance, created, **kwargs):
+    if created:
+        route_order_item(instance)
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def revoke_inactive_table_token(sender, instance, **kwargs):
+    """Scans of a deactivated or deleted table stop validating right away"""
+    if kwargs.get('signal') is post_delete or not instance.is_active:
+        revoke_qr_tokens(instance.qr_token)
@@ -0,0 +1,230 @@
+# tables/stations.py
+"""
+Kitchen station routing.
+
+When an order reaches the kitchen it is split into one StationTicket per
+station its items are routed to (OrderItem.station). Station screens then
+poll only their own queue, read like the kitchen display: one query for
+the tickets and one for their items.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .kitchen import KitchenTicketItem
+from .models import Order, OrderItem, StationTicket
+
+logger = logging.getLogger(__name__)
+
+KITCHEN_ORDER_STATUSES = ('confirmed', 'preparing')
+OPEN_TICKET_STATUSES = ('queued', 'preparing')
+
+# Order status -> status its open station tickets move to
+TICKET_STATUS_FOR_ORDER = {
+    'ready': 'ready',
+    'served': 'ready',
+    'bill_presented': 'ready',
+    'payment_pending': 'ready',
+    'completed': 'ready',
+    'cancelled': 'cancelled',
+}
+
+
+# ============ ROUTING ============
+
+def build_station_tickets(order):
+    """Create the missing station tickets of a kitchen order (idempotent)"""
+    items = list(OrderItem.objects.filter(order=order).select_related(
+        'menu_item__category'))
+
+    # Items saved before routing existed have no station yet
+    unrouted = [item for item in items if not item.station]
+    for item in unrouted:
+        item.station = item.menu_item.get_station()
+    if unrouted:
+        OrderItem.objects.bulk_update(unrouted, ['station'])
+
+    stations = {item.station for item in items}
+    if not stations:
+        return []
+
+    branch_id = Order.objects.filter(id=order.id).values_list(
+        'table__branch_id', flat=True).first()
+    now = timezone.now()
+    started = order.status == 'preparing'
+
+    StationTicket.objects.bulk_create([
+        StationTicket(
+            order=order, branch_id=branch_id, station=station,
+            status='preparing' if started else 'queued',
+            is_priority=order.is_priority, queued_at=now,
+            started_at=now if started else None)
+        for station in sorted(stations)
+    ], ignore_conflicts=True)
+
+    return sorted(stations)
+
+
+def route_order_item(item):
+    """Put an item added to an order already in the kitchen on its station's queue"""
+    order = Order.objects.filter(id=item.order_id).values(
+        'status', 'is_priority', 'table__branch_id').first()
+    if not order or order['status'] not in KITCHEN_ORDER_STATUSES:
+        return
+
+    ticket, created = StationTicket.objects.get_or_create(
+        order_id=item.order_id, station=item.station,
+        defaults={
+            'branch_id': order['table__branch_id'],
+            'is_priority': order['is_priority'],
+        })
+    if not created and ticket.status not in OPEN_TICKET_STATUSES:
+        # The station already finished this order; reopen it for the new item
+        ticket.status = 'queued'
+        ticket.ready_at = None
+        ticket.save(update_fields=['status', 'ready_at'])
+
+
+def sync_station_tickets(order):
+    """Close open tickets when the whole order is ready or cancelled
+
+    Stations start their own tickets, so an order moving to 'preparing'
+    leaves the other stations' tickets queued.
+    """
+    ticket_status = TICKET_STATUS_FOR_ORDER.get(order.status)
+    if ticket_status:
+        updates = {'status': ticket_status}
+        if ticket_status == 'ready':
+            updates['ready_at'] = timezone.now()
+        StationTicket.objects.filter(
+            order=order, status__in=OPEN_TICKET_STATUSES).update(**updates)
+
+
+def advance_ticket(ticket):
+    """
+    Move a station ticket one step (queued -> preparing -> ready).
+
+    The order follows: it starts preparing with its first ticket and is
+    marked ready once every station is done.
+    """
+    with transaction.atomic():
+        ticket = StationTicket.objects.select_for_update().get(id=ticket.id)
+        now = timezone.now()
+
+        if ticket.status == 'queued':
+            ticket.status = 'preparing'
+            ticket.started_at = now
+        elif ticket.status == 'preparing':
+            ticket.status = 'ready'
+            ticket.ready_at = now
+        else:
+            return ticket
+        ticket.save(update_fields=['status', 'started_at', 'ready_at'])
+
+        order = ticket.order
+        if ticket.status == 'preparing' and order.status == 'confirmed':
+            order.mark_preparing()
+        elif (ticket.status == 'ready' and order.status == 'preparing' and
+                not order.station_tickets.filter(status__in=OPEN_TICKET_STATUSES).exists()):
+            order.mark_ready()
+
+    logger.info(
+        f"Station ticket {ticket.id} ({ticket.station}) -> {ticket.status}")
+    return ticket
+
+
+# ============ READ MODEL ============
+
+class StationTicketView:
+    __slots__ = ('id', 'order_id', 'order_number', 'table_number', 'station',
+                 'status', 'is_priority', 'queued_at', 'started_at', 'items')
+
+    def __init__(self, id, order_id, order_number, table_number, station,
+                 status, is_priority, queued_at, started_at):
+        self.id = id
+        self.order_id = order_id
+        self.order_number = order_number
+        self.table_number = table_number or 'N/A'
+        self.station = station
+        self.status = status
+        self.is_priority = is_priority
+        self.queued_at = queued_at
+        self.started_at = started_at
+        self.items = []
+
+    def as_dict(self, now):
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'order_number': self.order_number,
+            'table_number': self.table_number,
+            'station': self.station,
+            'status': self.status,
+            'is_priority': self.is_priority,
+            'queued_at': self.queued_at,
+            'age_seconds': int((now - self.queued_at).total_seconds()),
+            'items': [item.as_dict() for item in self.items],
+        }
+
+
+def get_station_queue(branch_id, station):
+    """Open tickets of one station, priority first then oldest (2 queries)"""
+    rows = StationTicket.objects.filter(
+        branch_id=branch_id, station=station,
+        status__in=OPEN_TICKET_STATUSES
+    ).order_by('-is_priority', 'queued_at', 'id').values_list(
+        'id', 'order_id', 'order__order_number', 'order__table__table_number',
+        'station', 'status', 'is_priority', 'queued_at', 'started_at')
+    tickets = [StationTicketView(*row) for row in rows]
+    if not tickets:
+        return tickets
+
+    by_order = defaultdict(list)
+    for ticket in tickets:
+        by_order[ticket.order_id].append(ticket)
+
+    items = OrderItem.objects.filter(
+        order_id__in=by_order, station=station
+    ).order_by('order_id', 'id').values_list(
+        'order_id', 'menu_item__name', 'quantity', 'special_instructions',
+        'menu_item__preparation_time')
+    for order_id, *fields in items:
+        for ticket in by_order[order_id]:
+            ticket.items.append(KitchenTicketItem(*fields))
+
+    return tickets
+
+
+def get_station_load(branch_id, station=None):
+    """Queue depth and oldest open ticket per station (one grouped query)"""
+    tickets = StationTicket.objects.filter(
+        branch_id=branch_id, status__in=OPEN_TICKET_STATUSES)
+    if station:
+        tickets = tickets.filter(station=station)
+
+    rows = tickets.values('station').annotate(
+        queue_depth=Count('id'),
+        queued=Count('id', filter=Q(status='queued')),
+        preparing=Count('id', filter=Q(status='preparing')),
+        priority=Count('id', filter=Q(is_priority=True)),
+        oldest_queued_at=Min('queued_at'),
+    ).order_by('station')
+
+    now = timezone.now()
+    return [{
+        'station': row['station'],
+        'queue_depth': row['queue_depth'],
+        'queued': row['queued'],
+        'preparing': row['preparing'],
+        'priority': row['priority'],
+        'oldest_ticket_age_seconds': int(
+            (now - row['oldest_queued_at']).total_seconds()),
+    } for row in rows]
+
+
+def serialize_station_queue(tickets):
+    now = timezone.now()
+    return [ticket.as_dict(now) for ticket in tickets]
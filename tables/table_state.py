@@ -0,0 +1,143 @@
+# tables/table_state.py
+"""
+Table status updates and the table-board read model.
+
+Status changes driven by orders and payments are one read plus one
+UPDATE: the read fetches the tables' id, number, previous status and
+branch for the audit log, and the UPDATE ... SET status skips Table.save()
+side effects (QR token/image checks, post_save), so the service
+invalidates the branch's table caches and records the audit events itself.
+
+The table board is the floor screen's view of a branch: every table with
+its status, open order count and current (unpaid) bill, built with two
+queries and cached until a table or order of the branch changes.
+"""
+import logging
+from collections import Counter
+
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from core.audit import record_table_transition
+from core.caching import branch_tag, get_or_set_tagged
+from core.signals import invalidate_branch
+
+from .models import Order, Table
+
+logger = logging.getLogger(__name__)
+
+BOARD_CACHE_TIMEOUT = 60
+
+# Orders still on a table (not completed or cancelled)
+OPEN_ORDER_STATUSES = (
+    'pending', 'confirmed', 'preparing', 'ready', 'served',
+    'bill_presented', 'payment_pending',
+)
+
+# Order status -> status its table moves to
+TABLE_STATUS_FOR_ORDER = {
+    'pending': 'occupied',
+    'confirmed': 'occupied',
+    'preparing': 'occupied',
+    'ready': 'occupied',
+    'served': 'cleaning',
+    'completed': 'cleaning',
+    'cancelled': 'cleaning',
+}
+
+
+class TableStateService:
+    """Targeted table status writes"""
+
+    @staticmethod
+    def set_status(table_id, status):
+        """
+        Set one table's status with one read plus one UPDATE.
+
+        Returns True if the status changed.
+        """
+        return TableStateService.bulk_set_status([table_id], status) > 0
+
+    @staticmethod
+    def bulk_set_status(table_ids, status):
+        """Set the status of many tables with one read plus one UPDATE; returns rows changed"""
+        table_ids = [table_id for table_id in table_ids if table_id]
+        if not table_ids:
+            return 0
+
+        # The rows about to change: their previous status for the audit log
+        changing = list(Table.objects.filter(id__in=table_ids).exclude(status=status)
+                        .values_list('id', 'table_number', 'status', 'branch_id'))
+        if not changing:
+            return 0
+        changed = Table.objects.filter(id__in=[row[0] for row in changing]).exclude(
+            status=status).update(status=status, updated_at=timezone.now())
+        if not changed:
+            return 0
+
+        # update() sends no post_save, so stale the branch board and audit here
+        for changed_branch_id in {row[3] for row in changing}:
+            invalidate_branch(changed_branch_id, 'tables')
+        for table_id, table_number, previous, _ in changing:
+            record_table_transition(table_id, table_number, previous, status)
+
+        logger.debug(f"{changed} table(s) -> {status}")
+        return changed
+
+    @staticmethod
+    def set_status_for_order(order, order_status=None):
+        """Move the order's table to the status its order status implies"""
+        table_status = TABLE_STATUS_FOR_ORDER.get(order_status or order.status)
+        if not table_status or not order.table_id:
+            return False
+        return TableStateService.set_status(order.table_id, table_status)
+
+
+# ============ TABLE BOARD ============
+
+def build_table_board(branch_id):
+    """Every active table of a branch with its open orders (2 queries)"""
+    tables = list(
+        Table.objects.filter(branch_id=branch_id, is_active=True)
+        .order_by('table_number')
+        .values('id', 'table_number', 'table_name', 'capacity', 'status')
+    )
+
+    open_orders = Q(status__in=OPEN_ORDER_STATUSES)
+    unpaid = open_orders & Q(is_paid=False)
+    totals = {
+        row['table_id']: row for row in
+        Order.objects.filter(table__branch_id=branch_id, table__is_active=True)
+        .filter(open_orders)
+        .values('table_id')
+        .annotate(
+            open_orders=Count('id'),
+            ready_orders=Count('id', filter=Q(status='ready')),
+            current_bill=Sum('total_amount', filter=unpaid),
+            seated_since=Min('placed_at'),
+        )
+        .order_by()
+    }
+
+    for table in tables:
+        row = totals.get(table['id'], {})
+        table['open_orders'] = row.get('open_orders', 0)
+        table['ready_orders'] = row.get('ready_orders', 0)
+        table['current_bill'] = float(row.get('current_bill') or 0)
+        table['seated_since'] = row.get('seated_since')
+
+    return {
+        'branch_id': branch_id,
+        'generated_at': timezone.now(),
+        'summary': dict(Counter(table['status'] for table in tables)),
+        'open_bills_total': round(sum(table['current_bill'] for table in tables), 2),
+        'tables': tables,
+    }
+
+
+def get_table_board(branch_id):
+    """Cached table board; rebuilt after any table or order write of the branch"""
+    tags = [branch_tag(branch_id, 'tables'), branch_tag(branch_id, 'orders')]
+    return get_or_set_tagged(
+        f'table-board:{branch_id}', tags,
+        lambda: build_table_board(branch_id), BOARD_CACHE_TIMEOUT)
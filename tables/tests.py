@@ -1,3 +1,63 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.tests import QueryBudgetTestCase
+from tables import qr_tokens
+from tables.qr_tokens import (
+    InvalidQRToken, RevocationSet, revoke_qr_tokens, sign_qr_token, verify_qr_token,
+)
+
+
+class KitchenOrdersQueryBudgetTests(QueryBudgetTestCase):
+    def test_kitchen_orders_within_budget(self):
+        self.assertWithinBudget('kitchen-orders', 'chef', '/api/tables/orders/kitchen_orders/')
+
+
+class QRTokenTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        qr_tokens.revocations.clear()
+        self.expires_at = datetime.now(dt_timezone.utc) + timedelta(hours=1)
+        self.token = sign_qr_token(7, 3, self.expires_at)
+
+    def assertRejected(self, token, reason):
+        with self.assertRaises(InvalidQRToken) as raised:
+            verify_qr_token(token)
+        self.assertEqual(raised.exception.reason, reason)
+
+    def test_valid_token_yields_its_claims(self):
+        claims = verify_qr_token(self.token)
+        self.assertEqual((claims.table_id, claims.branch_id), (7, 3))
+        self.assertEqual(int(claims.expires_at.timestamp()), int(self.expires_at.timestamp()))
+
+    def test_tampered_token_is_rejected(self):
+        _, rest = self.token.split('.', 1)
+        self.assertRejected(f'8.{rest}', 'signature')
+        body, signature = self.token.rsplit('.', 1)
+        self.assertRejected(f"{body}.{'0' * len(signature)}", 'signature')
+        self.assertRejected('not-a-token', 'malformed')
+
+    def test_expired_token_is_rejected(self):
+        token = sign_qr_token(7, 3, datetime.now(dt_timezone.utc) - timedelta(seconds=1))
+        self.assertRejected(token, 'expired')
+        with self.assertRaises(InvalidQRToken):
+            verify_qr_token(self.token, now=self.expires_at + timedelta(seconds=1))
+
+    def test_revoked_token_is_rejected(self):
+        self.assertEqual(revoke_qr_tokens(self.token), 1)
+        self.assertRejected(self.token, 'revoked')
+
+    def test_revocation_reaches_other_processes_within_the_sync_interval(self):
+        # Another process that already found the token valid trusts that
+        # answer for sync_interval seconds, then reads the revocation key
+        other = RevocationSet(sync_interval=30)
+        signature = qr_tokens.parse_qr_token(self.token).signature
+        with mock.patch.object(qr_tokens.time, 'monotonic', return_value=1000.0):
+            self.assertFalse(other.is_revoked(signature))
+            revoke_qr_tokens(self.token)
+            self.assertFalse(other.is_revoked(signature))
+        with mock.patch.object(qr_tokens.time, 'monotonic', return_value=1031.0):
+            self.assertTrue(other.is_revoked(signature))
@@ -23,6 +23,13 @@ urlpatterns = [
     path('orders/by_table/<int:table_id>/',
          views.OrderViewSet.as_view({'get': 'by_table'}), name='orders-by-table'),
 
+    # Kitchen station queues
+    path('stations/', views.station_load, name='station-load'),
+    path('stations/<str:station>/tickets/',
+         views.station_tickets, name='station-tickets'),
+    path('stations/tickets/<int:ticket_id>/advance/',
+         views.advance_station_ticket, name='advance-station-ticket'),
+
     # ============ ROUTER ENDPOINTS ============
     path('', include(router.urls)),
 
@@ -37,6 +44,8 @@ urlpatterns = [
     # QR validation
     path('validate-qr/', views.validate_qr_token, name='validate-qr'),
     path('submit-qr-order/', views.submit_qr_order, name='submit-qr-order'),
+    path('qr-order/<str:order_number>/eta/',
+         views.qr_order_eta, name='qr-order-eta'),
 
     # orders print view
 
@@ -1,5 +1,6 @@
 from tables.models import Order, OrderItem, Table
 from menu.models import MenuItem
+from tables.table_state import TableStateService
 
 
 class OrderManager:
@@ -34,8 +35,8 @@ class OrderManager:
 
         # Update table status to occupied when order is created
         if order_type == 'waiter':
+            TableStateService.set_status(table.id, 'occupied')
             table.status = 'occupied'
-            table.save()
 
         # Prepare order data
         order_data = {
@@ -108,8 +109,7 @@ class OrderManager:
 
         # Update table status for QR orders too
         if order_data['order_type'] == 'qr':
-            cart.table.status = 'occupied'
-            cart.table.save()
+            TableStateService.set_status(cart.table_id, 'occupied')
 
         order = Order.objects.create(**order_data)
 
@@ -134,25 +134,5 @@ class OrderManager:
 
     @staticmethod
     def update_table_status(order, new_status):
-        """Update table status based on order status"""
-        table = order.table
-
-        # Define when to change table status
-        if new_status in ['served', 'completed', 'cancelled']:
-            # Meal is done, table becomes available for cleaning
-            table.status = 'cleaning'
-        elif new_status == 'ready':
-            # Food is ready, table is still occupied
-            table.status = 'occupied'
-        elif new_status == 'preparing':
-            # Food is being prepared, table is still occupied
-            table.status = 'occupied'
-        elif new_status == 'confirmed':
-            # Order confirmed, table is occupied
-            table.status = 'occupied'
-        elif new_status == 'pending':
-            # QR order pending, table is still available? Or should it be reserved?
-            table.status = 'occupied'  # Safer to mark as occupied
-
-        table.save()
-        return table
+        """Update table status based on order status (one UPDATE, no Table load)"""
+        return TableStateService.set_status_for_order(order, new_status)
@@ -19,14 +19,23 @@ from django.http import HttpResponse
 from accounts.decorators import role_required, check_role
 
 
-from .models import Table, Cart, CartItem, Order, OrderItem
+from .models import Table, Cart, CartItem, Order, OrderItem, StationTicket
 from .serializers import (
     TableSerializer, TableCreateSerializer, CartSerializer, CartItemSerializer,
     OrderSerializer, OrderCreateSerializer, QRValidationSerializer,
     CartAddItemSerializer, CartUpdateItemSerializer, OrderStatusUpdateSerializer, OrderWithItemsSerializer, OrderItemSerializer
 )
 from menu.models import MenuItem
+from restaurants.models import Branch
 from accounts.permissions import IsAdminUser, IsManagerOrAdmin, IsWaiterOrHigher, IsCashierOrHigher, IsChefOrHigher
+from core.caching import cached_view
+from .eta import estimate_order_ready_time, estimate_orders_ready_times
+from .kitchen import get_kitchen_tickets, serialize_tickets
+from .qr import build_branch_sheet
+from .qr_tokens import InvalidQRToken, get_qr_table_info, is_signed_token, verify_qr_token
+from .table_state import TableStateService, get_table_board
+from .stations import (
+    advance_ticket, get_station_load, get_station_queue, serialize_station_queue)
 
 
 # ==================== HTML TEMPLATE VIEWS ====================
@@ -190,6 +199,25 @@ class TableViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(table)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], permission_classes=[IsManagerOrAdmin])
+    def qr_sheet(self, request):
+        """Printable QR codes of every table of a branch (?output=pdf|png)"""
+        branch_id = _request_branch_id(request)
+        if not branch_id:
+            return Response({'error': 'Branch not found'}, status=404)
+
+        # Not ?format=, which DRF reserves for content negotiation
+        image_format = request.query_params.get('output', 'pdf')
+        if image_format not in ('pdf', 'png'):
+            return Response({'error': 'output must be pdf or png'}, status=400)
+
+        content_type = 'application/pdf' if image_format == 'pdf' else 'image/png'
+        response = HttpResponse(
+            build_branch_sheet(branch_id, image_format), content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="branch_{branch_id}_qr_codes.{image_format}"')
+        return response
+
     @action(detail=False, methods=['get'])
     def by_branch(self, request):
         """Get tables grouped by branch"""
@@ -217,11 +245,20 @@ class TableViewSet(viewsets.ModelViewSet):
                 'error': f'Cannot change status from {table.status} to {new_status}'
             }, status=400)
 
+        TableStateService.set_status(table.id, new_status)
         table.status = new_status
-        table.save()
         serializer = self.get_serializer(table)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """Floor screen: every table of the branch with open orders and bill"""
+        branch_id = _request_branch_id(request)
+        if not branch_id:
+            return Response({'error': 'Branch not found'}, status=404)
+
+        return Response(get_table_board(branch_id))
+
     def validate_table_status_transition(self, current_status, new_status, user_role):
         """Validate if table status transition is allowed for user role"""
         valid_transitions = {
@@ -271,6 +308,10 @@ def validate_qr_token(request):
     qr_token = serializer.validated_data['qr_token']
     table_id = serializer.validated_data.get('table_id')
 
+    if is_signed_token(qr_token):
+        return _validate_signed_qr_token(qr_token, table_id)
+
+    # Tokens issued before signed tokens: validated against the table row
     try:
         if table_id:
             # Validate specific table with token
@@ -311,6 +352,35 @@ def validate_qr_token(request):
             'message': 'Invalid QR code or table not found.'
         }, status=status.HTTP_404_NOT_FOUND)
 
+
+
+QR_TOKEN_ERRORS = {
+    'expired': ('QR code has expired. Please scan a fresh QR code.', status.HTTP_410_GONE),
+    'revoked': ('QR code is no longer valid. Please scan a fresh QR code.', status.HTTP_410_GONE),
+}
+
+
+def _validate_signed_qr_token(qr_token, table_id=None):
+    """Signature/expiry/revocation checks only; table info comes from cache"""
+    try:
+        claims = verify_qr_token(qr_token)
+    except InvalidQRToken as e:
+        message, code = QR_TOKEN_ERRORS.get(
+            e.reason, ('Invalid QR code or table not found.', status.HTTP_404_NOT_FOUND))
+        return Response({'valid': False, 'message': message}, status=code)
+
+    info = None
+    if not table_id or table_id == claims.table_id:
+        info = get_qr_table_info(claims.table_id, claims.branch_id)
+    if info is None:
+        return Response({
+            'valid': False,
+            'message': 'Invalid QR code or table not found.'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({'valid': True, 'expires_at': claims.expires_at, **info})
+
+
 # Cart Management
 
 
@@ -450,9 +520,28 @@ class OrderViewSet(viewsets.ModelViewSet):
     # filterset_fields = ['table', 'status',
     #                  'order_type', 'is_paid', 'is_priority']
 
+    search_fields = ['order_number', 'customer_name', 'table__table_number']
+    ordering_fields = ['placed_at', 'total_amount', 'order_number']
+
+    # Actions whose responses carry ready time estimates (waiter screens)
+    eta_actions = ('list', 'retrieve', 'by_table', 'pending_confirmation')
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return OrderCreateSerializer
+        return OrderSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        if args and self.action in self.eta_actions and self.request.user.is_authenticated:
+            # ETAs of the serialized orders (the page) only, each within its
+            # branch's whole queue so it sees the load ahead of it
+            orders = args[0] if kwargs.get('many') else [args[0]]
+            kwargs['context'] = {**self.get_serializer_context(),
+                                 'etas': estimate_orders_ready_times(orders)}
+        return super().get_serializer(*args, **kwargs)
+
     def get_queryset(self):
-        user = self.request.user
-        queryset = Order.objects.all()
+        queryset = self.get_scoped_queryset()
 
         # Apply manual filters
         status = self.request.query_params.get('status')
@@ -470,15 +559,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             'items__menu_item'
         )
 
-    search_fields = ['order_number', 'customer_name', 'table__table_number']
-    ordering_fields = ['placed_at', 'total_amount', 'order_number']
-
-    def get_serializer_class(self):
-        if self.action == 'create':
-            return OrderCreateSerializer
-        return OrderSerializer
-
-    def get_queryset(self):
+    def get_scoped_queryset(self):
         user = self.request.user
         queryset = Order.objects.all()
 
@@ -641,35 +722,11 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'], permission_classes=[IsChefOrHigher])
+    @cached_view(timeout=15, topics=('orders',))
     def kitchen_orders(self, request):
         """Get orders for kitchen display (confirmed & preparing)"""
-        queryset = self.get_queryset().filter(
-            status__in=['confirmed', 'preparing']
-        ).order_by('is_priority', 'placed_at')
-
-        # Serialize for kitchen display
-        orders_data = []
-        for order in queryset:
-            orders_data.append({
-                'id': order.id,
-                'order_number': order.order_number,
-                'table_number': order.table.table_number if order.table else 'N/A',
-                'items': [
-                    {
-                        'name': item.menu_item.name if item.menu_item else 'Unknown Item',  # FIXED HERE
-                        'quantity': item.quantity,
-                        'instructions': item.special_instructions,
-                        'preparation_time': item.menu_item.preparation_time if item.menu_item else 15
-                    }
-                    for item in order.items.all()
-                ],
-                'status': order.status,
-                'is_priority': order.is_priority,
-                'placed_at': order.placed_at,
-                'preparation_time': order.get_preparation_time(),
-            })
-
-        return Response(orders_data)
+        tickets = get_kitchen_tickets(self.get_scoped_queryset())
+        return Response(serialize_tickets(tickets))
 
     @action(detail=False, methods=['get'])
     def by_table(self, request, table_id):
@@ -685,6 +742,87 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+# ==================== KITCHEN STATIONS ====================
+
+def _request_branch_id(request):
+    """Branch the user works on, or ?branch_id= for managers/admins (None if not allowed)"""
+    user = request.user
+    if user.role in ('admin', 'manager'):
+        branch_id = request.query_params.get('branch_id') or user.branch_id
+        if not branch_id:
+            return None
+        branches = Branch.objects.filter(id=branch_id)
+        if user.role == 'manager':
+            branches = branches.filter(restaurant=user.restaurant)
+        return branches.values_list('id', flat=True).first()
+    return user.branch_id
+
+
+@api_view(['GET'])
+@permission_classes([IsChefOrHigher])
+def station_load(request):
+    """Queue depth and oldest ticket of every station of the branch"""
+    branch_id = _request_branch_id(request)
+    if not branch_id:
+        return Response({'error': 'Branch not found'}, status=404)
+
+    return Response({
+        'branch_id': branch_id,
+        'stations': get_station_load(branch_id),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsChefOrHigher])
+@cached_view(timeout=10, topics=('orders',))
+def station_tickets(request, station):
+    """Open tickets of one station (station display)"""
+    branch_id = _request_branch_id(request)
+    if not branch_id:
+        return Response({'error': 'Branch not found'}, status=404)
+
+    load = get_station_load(branch_id, station)
+    return Response({
+        'branch_id': branch_id,
+        'station': station,
+        'load': load[0] if load else {
+            'station': station, 'queue_depth': 0, 'queued': 0,
+            'preparing': 0, 'priority': 0, 'oldest_ticket_age_seconds': 0,
+        },
+        'tickets': serialize_station_queue(get_station_queue(branch_id, station)),
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsChefOrHigher])
+def advance_station_ticket(request, ticket_id):
+    """Start a queued station ticket or mark a preparing one ready"""
+    tickets = StationTicket.objects.all()
+    user = request.user
+    if user.role == 'manager':
+        tickets = tickets.filter(branch__restaurant=user.restaurant)
+    elif user.role != 'admin':
+        tickets = tickets.filter(branch_id=user.branch_id)
+
+    try:
+        ticket = tickets.get(id=ticket_id)
+    except StationTicket.DoesNotExist:
+        return Response({'error': 'Ticket not found'}, status=404)
+
+    ticket = advance_ticket(ticket)
+    return Response({
+        'success': True,
+        'ticket': {
+            'id': ticket.id,
+            'station': ticket.station,
+            'status': ticket.status,
+            'started_at': ticket.started_at,
+            'ready_at': ticket.ready_at,
+        },
+        'order_status': ticket.order.status,
+    })
+
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def submit_qr_order(request):
@@ -699,6 +837,16 @@ def submit_qr_order(request):
     if not session_id or not table_id:
         return Response({'error': 'session_id and table_id required'}, status=400)
 
+    # Scans carrying a signed token must still be valid for this table
+    qr_token = request.data.get('qr_token')
+    if is_signed_token(qr_token):
+        try:
+            claims = verify_qr_token(qr_token)
+        except InvalidQRToken:
+            return Response({'error': 'QR code is no longer valid. Please scan again.'}, status=410)
+        if str(claims.table_id) != str(table_id):
+            return Response({'error': 'QR code does not match this table'}, status=400)
+
     try:
         table = Table.objects.get(id=table_id, is_active=True)
     except Table.DoesNotExist:
@@ -746,10 +894,46 @@ def submit_qr_order(request):
         'success': True,
         'order_number': order.order_number,
         'message': 'Order submitted successfully. Waiting for waiter confirmation.',
-        'order': OrderSerializer(order).data
+        'order': OrderSerializer(order, context={
+            'etas': {order.id: estimate_order_ready_time(order)}}).data
     }, status=201)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def qr_order_eta(request, order_number):
+    """
+    Status and estimated ready time of a customer's QR order. Order numbers
+    are sequential, so the table's signed QR token (qr_token) is required
+    and only orders of that table are found.
+    """
+    qr_token = request.query_params.get('qr_token')
+    if not is_signed_token(qr_token):
+        return Response({'error': 'qr_token required'}, status=400)
+    try:
+        claims = verify_qr_token(qr_token)
+    except InvalidQRToken as e:
+        message, code = QR_TOKEN_ERRORS.get(
+            e.reason, ('Invalid QR code.', status.HTTP_403_FORBIDDEN))
+        return Response({'error': message}, status=code)
+
+    table_id = request.query_params.get('table_id')
+    if table_id and table_id != str(claims.table_id):
+        return Response({'error': 'QR code does not match this table'}, status=400)
+
+    try:
+        order = Order.objects.get(order_number=order_number, table_id=claims.table_id)
+    except Order.DoesNotExist:
+        return Response({'error': 'Order not found'}, status=404)
+
+    return Response({
+        'order_number': order.order_number,
+        'status': order.status,
+        'status_display': order.get_status_display(),
+        'eta': estimate_order_ready_time(order),
+    })
+
+
 # views for order creation
 
 # Updated create_order_with_items view using serializer
@@ -0,0 +1,207 @@
+# waste_tracker/bulk_entry.py
+"""
+Bulk waste entry for end-of-shift logging.
+
+A batch of N validated lines is written in one transaction with a fixed
+number of statements instead of N quick entries (each saving its record
+up to three times):
+
+- one bulk INSERT of the stock transactions, one of the waste records
+- recurring-issue detection: one query over the batch's item/reason pairs
+- daily thresholds: one GROUP BY over the batch's reasons
+- one bulk INSERT of the resulting alerts
+
+Records are created pending, as by the quick entry: the quantity leaves
+stock when a record is approved (WasteRecord.approve()), and the serializer
+rejects lines that add up to more than the stock on hand.
+
+bulk_create sends no post_save, so the per-record signal work happens
+here (once per batch) and the branch's waste caches are invalidated here.
+"""
+import logging
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.signals import invalidate_branch
+from inventory.models import StockTransaction
+
+from .models import WasteAlert, WasteRecord
+
+logger = logging.getLogger(__name__)
+
+MAX_BULK_WASTE_LINES = 200
+RECURRENCE_WINDOW_DAYS = 7  # same window as WasteRecord._detect_recurring_issue()
+
+
+def waste_priority(cost):
+    """Priority bands of WasteRecord.save()"""
+    if cost > 100:
+        return 'critical'
+    if cost > 50:
+        return 'high'
+    if cost > 20:
+        return 'medium'
+    return 'low'
+
+
+# ============ BATCH CHECKS ============
+
+def _mark_recurring(records, now):
+    """
+    Flag recurring records before they are inserted (one query).
+
+    A line is recurring when an approved/pending record of the same stock
+    item and reason exists within the window, or an earlier line of the
+    batch has them, as if the lines had been entered one by one.
+    Returns {(stock_item_id, reason_id): [records]} of the recurring pairs.
+    """
+    pairs = defaultdict(list)
+    for record in records:
+        pairs[(record.stock_transaction.stock_item_id, record.waste_reason_id)].append(record)
+
+    previous = {}
+    rows = WasteRecord.objects.filter(
+        stock_transaction__stock_item_id__in={pair[0] for pair in pairs},
+        waste_reason_id__in={pair[1] for pair in pairs},
+        status__in=['approved', 'pending'],
+        recorded_at__gte=now - timedelta(days=RECURRENCE_WINDOW_DAYS),
+    ).values_list('stock_transaction__stock_item_id', 'waste_reason_id', 'recurrence_id')
+    for stock_item_id, reason_id, recurrence_id in rows:
+        # Newest first (Meta ordering), like .first() in the per-record check
+        previous.setdefault((stock_item_id, reason_id), recurrence_id)
+
+    recurring = {}
+    for pair, group in pairs.items():
+        followers = group if pair in previous else group[1:]
+        if not followers:
+            continue
+        recurrence_id = previous.get(pair) or uuid.uuid4()
+        for record in followers:
+            record.is_recurring_issue = True
+            record.recurrence_id = recurrence_id
+        recurring[pair] = followers
+    return recurring
+
+
+def _batch_alerts(records, recurring, branch, now):
+    """Approval, recurring-issue and daily-threshold alerts of a batch"""
+    alerts = []
+    for record in records:
+        if record.waste_reason.category.requires_approval:
+            alerts.append(WasteAlert(
+                alert_type='approval_needed',
+                title='Waste Record Needs Approval',
+                message=f'Waste record for {record.stock_transaction.stock_item.name} '
+                f'needs approval. Reason: {record.waste_reason.name}',
+                waste_record=record,
+                branch=branch,
+            ))
+
+    for group in recurring.values():
+        record = group[-1]
+        alerts.append(WasteAlert(
+            alert_type='recurring_issue',
+            title=f'Recurring Waste Issue: {record.stock_transaction.stock_item.name}',
+            message=f'This appears to be a recurring issue. {record.waste_reason.name} '
+            f'has occurred multiple times recently ({len(group)} in this batch).',
+            waste_record=record,
+            waste_reason=record.waste_reason,
+            branch=branch,
+        ))
+
+    # Same rule as the post_save signal: today's approved cost per reason
+    reasons = {record.waste_reason_id: record.waste_reason for record in records
+               if record.waste_reason.alert_threshold_daily > 0}
+    if reasons:
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        totals = dict(
+            WasteRecord.objects.filter(
+                waste_reason_id__in=reasons, branch=branch,
+                status='approved', created_at__gte=today_start)
+            .values('waste_reason_id')
+            .annotate(total=Sum('stock_transaction__total_cost'))
+            .order_by()
+            .values_list('waste_reason_id', 'total'))
+        for reason_id, reason in reasons.items():
+            total = totals.get(reason_id) or Decimal('0.00')
+            if total >= reason.alert_threshold_daily:
+                alerts.append(WasteAlert(
+                    alert_type='threshold_exceeded',
+                    title=f'Daily Threshold Exceeded: {reason.name}',
+                    message=f'Daily waste cost for {reason.name} has reached '
+                    f'${total:.2f} (threshold: ${reason.alert_threshold_daily:.2f})',
+                    waste_reason=reason,
+                    branch=branch,
+                ))
+    return alerts
+
+
+# ============ ENTRY ============
+
+def record_waste_batch(lines, user, branch):
+    """
+    Write validated lines (see BulkWasteEntrySerializer) as waste records.
+
+    Returns {'records': [...], 'total_cost', 'recurring', 'alerts'}.
+    """
+    now = timezone.now()
+    transactions = []
+    records = []
+
+    for line in lines:
+        stock_item = line['stock_item']
+        reason = line['waste_reason']
+        total_cost = (line['quantity'] * stock_item.cost_per_unit).quantize(Decimal('0.01'))
+        stock_transaction = StockTransaction(
+            stock_item=stock_item,
+            transaction_type='waste',
+            quantity=line['quantity'],
+            unit_cost=stock_item.cost_per_unit,
+            total_cost=total_cost,
+            reason=f"Waste: {reason.name}",
+            user=user,
+            restaurant_id=branch.restaurant_id,
+            branch=branch,
+        )
+        transactions.append(stock_transaction)
+        records.append(WasteRecord(
+            stock_transaction=stock_transaction,
+            waste_reason=reason,
+            waste_source=line.get('waste_source', ''),
+            station=line.get('station', ''),
+            shift=line.get('shift', ''),
+            notes=line.get('notes', ''),
+            batch_number=line.get('batch_number'),
+            expiry_date=line.get('expiry_date'),
+            recorded_by=user,
+            branch=branch,
+            status='pending',
+            priority=waste_priority(total_cost),
+            recorded_at=now,
+            waste_occurred_at=now,
+        ))
+
+    with transaction.atomic():
+        recurring = _mark_recurring(records, now)
+        StockTransaction.objects.bulk_create(transactions)
+        WasteRecord.objects.bulk_create(records)
+        alerts = _batch_alerts(records, recurring, branch, now)
+        WasteAlert.objects.bulk_create(alerts)
+
+    invalidate_branch(branch.id, 'waste')
+    logger.info(f"Recorded {len(records)} waste lines for branch {branch.id} "
+                f"({len(alerts)} alerts)")
+
+    return {
+        'records': records,
+        'total_cost': sum((record.stock_transaction.total_cost for record in records),
+                          Decimal('0.00')),
+        'recurring': sum(len(group) for group in recurring.values()),
+        'alerts': len(alerts),
+    }
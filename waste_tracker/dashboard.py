@@ -0,0 +1,228 @@
+# waste_tracker/dashboard.py
+"""
+Waste dashboard engine.
+
+The kitchen manager's dashboard is built from a fixed number of queries,
+whatever the data volume:
+
+- one conditional aggregate for the today/week/month cost sums, pending
+  reviews and recurring issues
+- one GROUP BY for the month's cost and count per category
+- one query each for the recent records and the open alerts
+- targets: their categories plus one conditional aggregate with a sum per
+  target, cached until waste data of the scope changes
+
+Nothing is written on read; WasteTarget.calculate_current_value() (which
+saves) is left to explicit refreshes.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from core.caching import get_or_set_tagged, global_tag, restaurant_tag
+
+from .models import WasteAlert, WasteRecord, WasteTarget
+
+COST = 'stock_transaction__total_cost'
+TARGETS_CACHE_TIMEOUT = 60 * 5
+
+# Same windows as WasteTarget.calculate_current_value()
+PERIOD_DAYS = {'daily': 0, 'weekly': 7, 'monthly': 30}
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _money(value):
+    return round(float(value or Decimal('0.00')), 2)
+
+
+def scoped_records(restaurant, branch=None):
+    queryset = WasteRecord.objects.filter(branch__restaurant=restaurant)
+    if branch:
+        queryset = queryset.filter(branch=branch)
+    return queryset
+
+
+# ============ SECTIONS ============
+
+def get_summary(queryset, today):
+    """Period sums and counts in one conditional aggregate"""
+    today_start = _day_start(today)
+    week_start = _day_start(today - timedelta(days=7))
+    month_start = _day_start(today - timedelta(days=30))
+    approved = Q(status='approved', stock_transaction__isnull=False)
+
+    totals = queryset.aggregate(
+        today=Sum(COST, filter=approved & Q(recorded_at__gte=today_start)),
+        week=Sum(COST, filter=approved & Q(recorded_at__gte=week_start)),
+        month=Sum(COST, filter=approved & Q(recorded_at__gte=month_start)),
+        pending=Count('id', filter=Q(status='pending')),
+        recurring=Count('id', filter=Q(is_recurring_issue=True, recorded_at__gte=week_start)),
+    )
+    return {
+        'total_waste_cost_today': _money(totals['today']),
+        'total_waste_cost_week': _money(totals['week']),
+        'total_waste_cost_month': _money(totals['month']),
+        'pending_reviews': totals['pending'],
+        'recurring_issues': totals['recurring'],
+    }
+
+
+def get_category_breakdown(queryset, restaurant, today):
+    """The month's approved waste per active category (one GROUP BY)"""
+    rows = (
+        queryset
+        .filter(status='approved',
+                recorded_at__gte=_day_start(today - timedelta(days=30)),
+                waste_reason__category__restaurant=restaurant,
+                waste_reason__category__is_active=True)
+        .values('waste_reason__category_id', 'waste_reason__category__name',
+                'waste_reason__category__category_type',
+                'waste_reason__category__color_code')
+        .annotate(waste_count=Count('id'), total_cost=Sum(COST))
+        .order_by('waste_reason__category__sort_order', 'waste_reason__category__name')
+    )
+    return [{
+        'category_id': row['waste_reason__category_id'],
+        'category_name': row['waste_reason__category__name'],
+        'category_type': row['waste_reason__category__category_type'],
+        'waste_count': row['waste_count'],
+        'total_cost': _money(row['total_cost']),
+        'color': row['waste_reason__category__color_code'],
+    } for row in rows]
+
+
+def get_recent_waste(queryset, limit=10):
+    records = queryset.select_related(
+        'stock_transaction__stock_item', 'waste_reason', 'recorded_by'
+    ).order_by('-recorded_at')[:limit]
+
+    recent = []
+    for record in records:
+        stock_item = record.stock_item
+        recent.append({
+            'id': record.id,
+            'item_name': stock_item.name if stock_item else 'Unknown',
+            'quantity': float(record.quantity) if record.quantity else 0,
+            'unit': stock_item.unit if stock_item else '',
+            'reason': record.waste_reason.name,
+            'cost': float(record.total_cost),
+            'status': record.status,
+            'recorded_by': record.recorded_by.username,
+            'recorded_at': record.recorded_at,
+            'station': record.station,
+        })
+    return recent
+
+
+def get_active_alerts(restaurant, branch=None, limit=5):
+    alerts = WasteAlert.objects.filter(branch__restaurant=restaurant, is_resolved=False)
+    if branch:
+        alerts = alerts.filter(branch=branch)
+
+    return [{
+        'id': alert['id'],
+        'type': alert['alert_type'],
+        'title': alert['title'],
+        'message': alert['message'],
+        'created_at': alert['created_at'],
+        'is_read': alert['is_read'],
+    } for alert in alerts.order_by('-created_at').values(
+        'id', 'alert_type', 'title', 'message', 'created_at', 'is_read')[:limit]]
+
+
+# ============ TARGETS ============
+
+def compute_targets_progress(restaurant, branch=None, today=None):
+    """
+    Progress of the active targets, read only: the targets with their
+    categories (two queries), then one conditional aggregate with a sum
+    per target.
+    """
+    today = today or timezone.now().date()
+    targets = WasteTarget.objects.filter(restaurant=restaurant, is_active=True)
+    if branch:
+        targets = targets.filter(branch=branch)
+    targets = list(targets.prefetch_related('waste_categories'))
+    if not targets:
+        return []
+
+    annotations = {}
+    for target in targets:
+        category_ids = [category.id for category in target.waste_categories.all()]
+        if not category_ids or target.target_type not in ('cost', 'quantity'):
+            continue
+        start = _day_start(today - timedelta(days=PERIOD_DAYS.get(target.period, 30)))
+        condition = Q(recorded_at__gte=start, waste_reason__category_id__in=category_ids)
+        if target.branch_id:
+            condition &= Q(branch_id=target.branch_id)
+
+        if target.target_type == 'cost':
+            annotations[f't{target.id}'] = Sum(
+                COST, filter=condition & Q(stock_transaction__isnull=False))
+        else:
+            annotations[f't{target.id}'] = Count('id', filter=condition)
+
+    values = {}
+    if annotations:
+        values = WasteRecord.objects.filter(
+            branch__restaurant=restaurant, status='approved',
+            recorded_at__gte=_day_start(today - timedelta(days=max(PERIOD_DAYS.values())))
+        ).aggregate(**annotations)
+
+    progress = []
+    for target in targets:
+        key = f't{target.id}'
+        if key in annotations:
+            current = Decimal(values.get(key) or 0)
+        elif target.target_type in ('cost', 'quantity'):
+            current = Decimal('0.00')  # no categories: nothing counts toward it
+        else:
+            current = target.current_value  # e.g. percentage of sales: stored value
+
+        target_value = target.target_value or Decimal('0')
+        percentage = float(current / target_value * 100) if target_value else 0.0
+        progress.append({
+            'id': target.id,
+            'name': target.name,
+            'target_type': target.target_type,
+            'target_value': float(target_value),
+            'current_value': _money(current),
+            'progress_percentage': round(percentage, 2),
+            # Waste targets are ceilings: on track while at or under them
+            'is_on_track': current <= target_value,
+            'period': target.period,
+        })
+    return progress
+
+
+def get_targets_progress(restaurant, branch=None):
+    """Target progress, cached until waste data of the restaurant changes"""
+    restaurant_id = restaurant.id if restaurant else None
+    branch_id = branch.id if branch else None
+    tag = restaurant_tag(restaurant_id, 'waste') if restaurant_id else global_tag('waste')
+    return get_or_set_tagged(
+        f'waste:targets:{restaurant_id}:{branch_id}', [tag],
+        lambda: compute_targets_progress(restaurant, branch),
+        TARGETS_CACHE_TIMEOUT)
+
+
+# ============ DASHBOARD ============
+
+def build_waste_dashboard(restaurant, branch=None):
+    today = timezone.now().date()
+    queryset = scoped_records(restaurant, branch)
+
+    return {
+        'success': True,
+        'timestamp': timezone.now(),
+        'summary': get_summary(queryset, today),
+        'waste_by_category': get_category_breakdown(queryset, restaurant, today),
+        'recent_waste': get_recent_waste(queryset),
+        'active_alerts': get_active_alerts(restaurant, branch),
+        'targets_progress': get_targets_progress(restaurant, branch),
+    }
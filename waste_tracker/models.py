@@ -1,12 +1,12 @@
 # waste_tracker/models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-from django.db.models import Sum, Avg
+from django.db.models import F, Sum, Avg
 import uuid
 
-from inventory.models import StockItem, StockTransaction
+from inventory.models import StockAlert, StockItem, StockTransaction
 from restaurants.models import Restaurant, Branch
 from decimal import Decimal
 
@@ -235,26 +235,70 @@ class WasteRecord(models.Model):
             )
 
     def approve(self, reviewer, notes=""):
-        """Approve waste record"""
-        self.status = 'approved'
-        self.reviewed_by = reviewer
-        self.reviewed_at = timezone.now()
-        if notes:
-            self.notes = f"{self.notes}\n\nApproval Notes: {notes}"
-        self.save()
+        """
+        Approve waste record. The wasted quantity leaves stock here, not when
+        the record is entered; ValueError if it exceeds the stock on hand.
+        """
+        with transaction.atomic():
+            if self.status != 'approved':
+                self._take_from_stock()
+            self.status = 'approved'
+            self.reviewed_by = reviewer
+            self.reviewed_at = timezone.now()
+            if notes:
+                self.notes = f"{self.notes}\n\nApproval Notes: {notes}"
+            self.save()
 
     def reject(self, reviewer, reason):
-        """Reject waste record"""
-        self.status = 'rejected'
-        self.reviewed_by = reviewer
-        self.reviewed_at = timezone.now()
-        self.notes = f"{self.notes}\n\nRejection Reason: {reason}"
-
-        # Optionally delete the linked transaction if rejected
-        if self.stock_transaction:
-            self.stock_transaction.delete()
+        """Reject waste record, returning the quantity to stock if it was approved"""
+        with transaction.atomic():
+            if self.status == 'approved':
+                self._return_to_stock()
+            self.status = 'rejected'
+            self.reviewed_by = reviewer
+            self.reviewed_at = timezone.now()
+            self.notes = f"{self.notes}\n\nRejection Reason: {reason}"
+
+            # Detach the linked transaction before deleting it
+            stock_transaction = self.stock_transaction
+            self.stock_transaction = None
+            self.save()
+            if stock_transaction:
+                stock_transaction.delete()
+
+    def _take_from_stock(self):
+        """Conditional decrement: never below what is on hand"""
+        if not self.stock_transaction:
+            return
+        quantity = self.stock_transaction.quantity
+        stock_item = self.stock_transaction.stock_item
+        updated = StockItem.objects.filter(
+            id=stock_item.id, current_quantity__gte=quantity
+        ).update(current_quantity=F('current_quantity') - quantity, updated_at=timezone.now())
+        stock_item.refresh_from_db(fields=['current_quantity'])
+        if not updated:
+            raise ValueError(
+                f"Insufficient stock. Available: {stock_item.current_quantity}, Requested: {quantity}")
+
+        if stock_item.is_low_stock:
+            StockAlert.objects.get_or_create(
+                stock_item=stock_item,
+                alert_type='low_stock',
+                resolved=False,
+                defaults={
+                    'message': f'{stock_item.name} is low on stock '
+                    f'({stock_item.current_quantity} {stock_item.unit} remaining)',
+                    'restaurant': stock_item.restaurant,
+                    'branch': stock_item.branch,
+                }
+            )
 
-        self.save()
+    def _return_to_stock(self):
+        if not self.stock_transaction:
+            return
+        StockItem.objects.filter(id=self.stock_transaction.stock_item_id).update(
+            current_quantity=F('current_quantity') + self.stock_transaction.quantity,
+            updated_at=timezone.now())
 
     @property
     def stock_item(self):
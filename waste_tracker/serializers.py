@@ -1,9 +1,14 @@
 # waste_tracker/serializers.py
+from collections import defaultdict
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
 
+from .bulk_entry import MAX_BULK_WASTE_LINES
 from .models import WasteCategory, WasteReason, WasteRecord, WasteTarget, WasteAlert
 from inventory.models import StockItem, StockTransaction
 from restaurants.models import Restaurant, Branch
@@ -195,6 +200,13 @@ class WasteRecordSerializer(serializers.ModelSerializer):
                     "Photo evidence is required for this waste reason."
                 )
 
+        # Stock leaves on approval; more than is on hand could never be approved
+        stock_item = data.get('_stock_item')
+        quantity = data.get('_quantity')
+        if stock_item and quantity and quantity > stock_item.current_quantity:
+            raise serializers.ValidationError({'quantity': [
+                f'Exceeds the {stock_item.current_quantity} {stock_item.unit} in stock.']})
+
         return data
 
 
@@ -228,6 +240,15 @@ class WasteRecordCreateSerializer(serializers.ModelSerializer):
             'batch_number', 'expiry_date'
         ]
 
+    def validate(self, data):
+        # Stock leaves on approval; more than is on hand could never be approved
+        stock_item = data.get('_stock_item')
+        quantity = data.get('_quantity')
+        if stock_item and quantity and quantity > stock_item.current_quantity:
+            raise serializers.ValidationError({'quantity': [
+                f'Exceeds the {stock_item.current_quantity} {stock_item.unit} in stock.']})
+        return data
+
     def create(self, validated_data):
         """Create waste record with linked stock transaction"""
         # Get user from context
@@ -384,3 +405,78 @@ class WasteAnalyticsSerializer(serializers.Serializer):
     by_staff = serializers.ListField()
     daily_trend = serializers.ListField()
     top_items = serializers.ListField()
+
+
+class WasteEntryLineSerializer(serializers.Serializer):
+    """One line of a bulk waste entry"""
+
+    waste_reason_id = serializers.IntegerField()
+    stock_item_id = serializers.IntegerField()
+    quantity = serializers.DecimalField(
+        max_digits=10, decimal_places=3, min_value=Decimal('0.001'))
+    waste_source = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    station = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    shift = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    notes = serializers.CharField(required=False, allow_blank=True)
+    batch_number = serializers.CharField(
+        max_length=100, required=False, allow_blank=True, allow_null=True)
+    expiry_date = serializers.DateField(required=False, allow_null=True)
+
+
+class BulkWasteEntrySerializer(serializers.Serializer):
+    """
+    End-of-shift waste entry: many lines validated together. Reasons and
+    stock items are resolved with one query each and must belong to the
+    restaurant passed in the context; station/shift default every line.
+    """
+
+    station = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    shift = serializers.CharField(max_length=50, required=False, allow_blank=True)
+    lines = serializers.ListField(
+        child=WasteEntryLineSerializer(), min_length=1, max_length=MAX_BULK_WASTE_LINES)
+
+    def validate(self, attrs):
+        restaurant = self.context['restaurant']
+        branch = self.context.get('branch')
+        lines = attrs['lines']
+
+        reasons = WasteReason.objects.filter(
+            id__in={line['waste_reason_id'] for line in lines},
+            category__restaurant=restaurant, is_active=True
+        ).select_related('category').in_bulk()
+        stock_items = StockItem.objects.filter(
+            id__in={line['stock_item_id'] for line in lines},
+            restaurant=restaurant, is_active=True)
+        if branch:
+            stock_items = stock_items.filter(Q(branch=branch) | Q(branch__isnull=True))
+        stock_items = stock_items.in_bulk()
+
+        errors = {}
+        wasted = defaultdict(Decimal)  # quantity per stock item over the batch
+        for index, line in enumerate(lines):
+            line_errors = {}
+            if line['waste_reason_id'] not in reasons:
+                line_errors['waste_reason_id'] = ['Unknown or inactive waste reason.']
+            if line['stock_item_id'] not in stock_items:
+                line_errors['stock_item_id'] = ['Unknown or inactive stock item.']
+            if line_errors:
+                errors[index] = line_errors
+                continue
+
+            stock_item = stock_items[line['stock_item_id']]
+            wasted[stock_item.id] += line['quantity']
+            if wasted[stock_item.id] > stock_item.current_quantity:
+                errors[index] = {'quantity': [
+                    f'Batch exceeds the {stock_item.current_quantity} {stock_item.unit} '
+                    f'of {stock_item.name} in stock.']}
+                continue
+
+            line['waste_reason'] = reasons[line.pop('waste_reason_id')]
+            line['stock_item'] = stock_items[line.pop('stock_item_id')]
+            for field in ('station', 'shift'):
+                if not line.get(field) and attrs.get(field):
+                    line[field] = attrs[field]
+
+        if errors:
+            raise serializers.ValidationError({'lines': errors})
+        return attrs
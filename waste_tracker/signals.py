@@ -1,4 +1,5 @@
 # waste_tracker/signals.py - FIXED VERSION
+from django.db.models import Sum
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
@@ -43,17 +44,12 @@ def handle_waste_record_post_save(sender, instance, created, **kwargs):
         if instance.waste_reason.alert_threshold_daily > 0:
             # Check daily threshold for this reason
             today_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            today_waste = WasteRecord.objects.filter(
+            total_today_cost = WasteRecord.objects.filter(
                 waste_reason=instance.waste_reason,
                 status='approved',
                 created_at__gte=today_start,
                 branch=instance.branch
-            ).select_related('stock_transaction')
-
-            total_today_cost = Decimal('0.00')
-            for record in today_waste:
-                if record.stock_transaction:
-                    total_today_cost += record.stock_transaction.total_cost
+            ).aggregate(total=Sum('stock_transaction__total_cost'))['total'] or Decimal('0.00')
 
             if total_today_cost >= instance.waste_reason.alert_threshold_daily:
                 WasteAlert.objects.create(
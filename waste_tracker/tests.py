@@ -1,3 +1,126 @@
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.benchmark import DataGenerator
+from core.tests import QueryBudgetTestCase
+from inventory.models import StockItem
+from waste_tracker.bulk_entry import record_waste_batch
+from waste_tracker.models import WasteReason, WasteRecord
+from waste_tracker.serializers import WasteRecordSerializer
+
+
+class WasteDashboardQueryBudgetTests(QueryBudgetTestCase):
+    def test_waste_dashboard_within_budget(self):
+        self.assertWithinBudget('waste-dashboard-api', 'manager', '/waste/api/dashboard/')
+
+
+class BulkWasteEntryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generator = DataGenerator(restaurants=1, branches=1, tables=1, menu_items=2,
+                                  days=0, orders_per_day=0, waste_per_day=0)
+        generator.generate()
+        cls.users = generator.users
+        cls.chef = cls.users['chef']
+        cls.branch = cls.chef.branch
+        cls.stock_items = list(StockItem.objects.order_by('id')[:3])
+        cls.reasons = list(WasteReason.objects.select_related('category').order_by('id')[:2])
+
+    def lines(self, count):
+        return [{
+            'stock_item': self.stock_items[i % len(self.stock_items)],
+            'waste_reason': self.reasons[i % len(self.reasons)],
+            'quantity': Decimal('1.5'),
+        } for i in range(count)]
+
+    def stock(self, stock_item):
+        return StockItem.objects.get(id=stock_item.id).current_quantity
+
+    def test_statement_count_does_not_grow_with_lines(self):
+        record_waste_batch(self.lines(1), self.chef, self.branch)  # warm branch lookups
+        with CaptureQueriesContext(connection) as small:
+            record_waste_batch(self.lines(2), self.chef, self.branch)
+        with CaptureQueriesContext(connection) as large:
+            record_waste_batch(self.lines(12), self.chef, self.branch)
+        self.assertEqual(len(small), len(large))
+
+    def test_repeated_pair_is_flagged_recurring(self):
+        line = {'stock_item': self.stock_items[0], 'waste_reason': self.reasons[0],
+                'quantity': Decimal('1')}
+        result = record_waste_batch([dict(line), dict(line), self.lines(1)[0] | {
+            'stock_item': self.stock_items[1]}], self.chef, self.branch)
+
+        first, second, other = result['records']
+        self.assertEqual(result['recurring'], 1)
+        self.assertFalse(first.is_recurring_issue)
+        self.assertTrue(second.is_recurring_issue)
+        self.assertFalse(other.is_recurring_issue)
+
+        # A later batch joins the same recurrence
+        later = record_waste_batch([dict(line)], self.chef, self.branch)['records'][0]
+        self.assertTrue(later.is_recurring_issue)
+        self.assertEqual(later.recurrence_id, second.recurrence_id)
+
+    def test_stock_leaves_on_approval_and_returns_on_reject(self):
+        stock_item = self.stock_items[0]
+        before = self.stock(stock_item)
+        record = record_waste_batch([{
+            'stock_item': stock_item, 'waste_reason': self.reasons[0],
+            'quantity': Decimal('4')}], self.chef, self.branch)['records'][0]
+        self.assertEqual(self.stock(stock_item), before)
+
+        record = WasteRecord.objects.get(id=record.id)
+        record.approve(self.users['manager'])
+        self.assertEqual(self.stock(stock_item), before - 4)
+
+        record.reject(self.users['manager'], 'Counted twice')
+        self.assertEqual(self.stock(stock_item), before)
+        self.assertEqual(WasteRecord.objects.get(id=record.id).status, 'rejected')
+
+    def test_approval_beyond_stock_on_hand_fails(self):
+        stock_item = self.stock_items[0]
+        record = record_waste_batch([{
+            'stock_item': stock_item, 'waste_reason': self.reasons[0],
+            'quantity': Decimal('4')}], self.chef, self.branch)['records'][0]
+        StockItem.objects.filter(id=stock_item.id).update(current_quantity=Decimal('3'))
+
+        record = WasteRecord.objects.get(id=record.id)
+        with self.assertRaises(ValueError):
+            record.approve(self.users['manager'])
+        self.assertEqual(self.stock(stock_item), Decimal('3'))
+        self.assertEqual(WasteRecord.objects.get(id=record.id).status, 'pending')
+
+    def test_bulk_entry_rejects_lines_beyond_stock(self):
+        stock_item = self.stock_items[0]
+        half = self.stock(stock_item) / 2 + 1
+        line = {'stock_item_id': stock_item.id, 'waste_reason_id': self.reasons[0].id,
+                'quantity': str(half)}
+
+        self.client.force_login(self.chef)
+        response = self.client.post('/waste/api/quick-entry/bulk/', {'lines': [line, line]},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1', response.json()['details']['lines'])
+        self.assertFalse(WasteRecord.objects.exists())
+
+    def test_quick_entry_rejects_quantity_beyond_stock(self):
+        stock_item = self.stock_items[0]
+        self.client.force_login(self.chef)
+        response = self.client.post('/waste/api/quick-entry/', {
+            'stock_item_id': stock_item.id, 'waste_reason_id': self.reasons[0].id,
+            'quantity': str(self.stock(stock_item) + 1)}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('quantity', response.json()['details'])
+        self.assertFalse(WasteRecord.objects.exists())
 
-# Create your tests here.
+    def test_record_serializer_rejects_quantity_beyond_stock(self):
+        stock_item = self.stock_items[0]
+        serializer = WasteRecordSerializer(data={
+            'stock_item_id': stock_item.id, 'waste_reason': self.reasons[0].id,
+            'recorded_by': self.chef.id, 'branch': self.branch.id,
+            'quantity': str(self.stock(stock_item) + 1)})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('quantity', serializer.errors)
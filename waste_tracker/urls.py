@@ -5,7 +5,7 @@ from .views import (
     WasteCategoryViewSet, WasteReasonViewSet, WasteRecordViewSet,
     WasteTargetViewSet, WasteAlertViewSet,
     waste_dashboard, detailed_waste_analytics, waste_reduction_potential,
-    waste_forecast, quick_waste_entry, run_waste_alerts
+    waste_forecast, quick_waste_entry, bulk_waste_entry, run_waste_alerts
 )
 from rest_framework.routers import DefaultRouter
 
@@ -30,6 +30,7 @@ api_patterns = [
 
     # Quick entry
     path('quick-entry/', quick_waste_entry, name='waste-quick-entry'),
+    path('quick-entry/bulk/', bulk_waste_entry, name='waste-bulk-entry'),
 
     # Alert management
     path('alerts/run-checks/', run_waste_alerts, name='waste-alert-checks'),
@@ -16,12 +16,15 @@ from decimal import Decimal
 from .models import WasteCategory, WasteReason, WasteRecord, WasteTarget, WasteAlert
 from .serializers import (
     WasteCategorySerializer, WasteReasonSerializer,
-    WasteRecordSerializer, WasteRecordCreateSerializer,
+    WasteRecordSerializer, WasteRecordCreateSerializer, BulkWasteEntrySerializer,
     WasteTargetSerializer, WasteAlertSerializer,
     WasteDashboardSerializer, WasteAnalyticsSerializer
 )
 from .business_logic import EnhancedWasteAnalyzer, WasteAlertManager
+from .bulk_entry import record_waste_batch
+from .dashboard import build_waste_dashboard
 from accounts.permissions import IsManagerOrAdmin, IsWaiterOrHigher, IsChefOrHigher
+from core.caching import cached_view
 from inventory.models import StockItem
 
 
@@ -300,7 +303,10 @@ class WasteRecordViewSet(viewsets.ModelViewSet):
         waste_record = self.get_object()
         notes = request.data.get('notes', '')
 
-        waste_record.approve(request.user, notes)
+        try:
+            waste_record.approve(request.user, notes)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response({
             'success': True,
@@ -576,163 +582,13 @@ class WasteAlertViewSet(viewsets.ModelViewSet):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsChefOrHigher])
+@cached_view(timeout=60, topics=('waste',))
 def waste_dashboard(request):
     """
     Get comprehensive waste dashboard data
     """
     user = request.user
-
-    # Get date ranges
-    today = timezone.now().date()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
-
-    # Base queryset
-    queryset = WasteRecord.objects.filter(branch__restaurant=user.restaurant)
-    if user.branch:
-        queryset = queryset.filter(branch=user.branch)
-
-    # Calculate summary statistics
-    today_waste = Decimal('0.00')
-    week_waste = Decimal('0.00')
-    month_waste = Decimal('0.00')
-
-    # Today's waste
-    today_records = queryset.filter(
-        status='approved',
-        recorded_at__date=today
-    )
-    for record in today_records:
-        if record.stock_transaction:
-            today_waste += record.stock_transaction.total_cost
-
-    # Week's waste
-    week_records = queryset.filter(
-        status='approved',
-        recorded_at__date__gte=week_ago
-    )
-    for record in week_records:
-        if record.stock_transaction:
-            week_waste += record.stock_transaction.total_cost
-
-    # Month's waste
-    month_records = queryset.filter(
-        status='approved',
-        recorded_at__date__gte=month_ago
-    )
-    for record in month_records:
-        if record.stock_transaction:
-            month_waste += record.stock_transaction.total_cost
-
-    # Pending reviews
-    pending_reviews = queryset.filter(status='pending').count()
-
-    # Recurring issues
-    recurring_issues = queryset.filter(
-        is_recurring_issue=True,
-        recorded_at__date__gte=week_ago
-    ).count()
-
-    # Waste by category
-    waste_by_category = []
-    categories = WasteCategory.objects.filter(
-        restaurant=user.restaurant, is_active=True)
-
-    for category in categories:
-        category_records = queryset.filter(
-            waste_reason__category=category,
-            status='approved',
-            recorded_at__date__gte=month_ago
-        )
-
-        category_cost = Decimal('0.00')
-        for record in category_records:
-            if record.stock_transaction:
-                category_cost += record.stock_transaction.total_cost
-
-        if category_records.exists():
-            waste_by_category.append({
-                'category_id': category.id,
-                'category_name': category.name,
-                'category_type': category.category_type,
-                'waste_count': category_records.count(),
-                'total_cost': float(category_cost),
-                'color': category.color_code
-            })
-
-    # Recent waste (last 10 records)
-    recent_waste = []
-    recent_records = queryset.order_by('-recorded_at')[:10]
-    for record in recent_records:
-        recent_waste.append({
-            'id': record.id,
-            'item_name': record.stock_item.name if record.stock_item else 'Unknown',
-            'quantity': float(record.quantity) if record.quantity else 0,
-            'unit': record.stock_item.unit if record.stock_item else '',
-            'reason': record.waste_reason.name,
-            'cost': float(record.total_cost),
-            'status': record.status,
-            'recorded_by': record.recorded_by.username,
-            'recorded_at': record.recorded_at,
-            'station': record.station
-        })
-
-    # Active alerts
-    alerts_queryset = WasteAlert.objects.filter(
-        branch__restaurant=user.restaurant)
-    if user.branch:
-        alerts_queryset = alerts_queryset.filter(branch=user.branch)
-
-    active_alerts = alerts_queryset.filter(
-        is_resolved=False).order_by('-created_at')[:5]
-    alerts_list = []
-    for alert in active_alerts:
-        alerts_list.append({
-            'id': alert.id,
-            'type': alert.alert_type,
-            'title': alert.title,
-            'message': alert.message,
-            'created_at': alert.created_at,
-            'is_read': alert.is_read
-        })
-
-    # Targets progress
-    targets_queryset = WasteTarget.objects.filter(
-        restaurant=user.restaurant,
-        is_active=True
-    )
-    if user.branch:
-        targets_queryset = targets_queryset.filter(branch=user.branch)
-
-    targets_progress = []
-    for target in targets_queryset:
-        target.calculate_current_value()
-        targets_progress.append({
-            'id': target.id,
-            'name': target.name,
-            'target_type': target.target_type,
-            'target_value': float(target.target_value),
-            'current_value': float(target.current_value),
-            'progress_percentage': float(target.progress_percentage),
-            'is_on_track': target.is_on_track,
-            'period': target.period
-        })
-
-    return Response({
-        'success': True,
-        'timestamp': timezone.now(),
-        'summary': {
-            'total_waste_cost_today': float(today_waste),
-            'total_waste_cost_week': float(week_waste),
-            'total_waste_cost_month': float(month_waste),
-            'pending_reviews': pending_reviews,
-            'recurring_issues': recurring_issues
-        },
-        'waste_by_category': waste_by_category,
-        'recent_waste': recent_waste,
-        'active_alerts': alerts_list,
-        'targets_progress': targets_progress
-    })
+    return Response(build_waste_dashboard(user.restaurant, user.branch))
 
 
 @api_view(['GET'])
@@ -893,6 +749,63 @@ def quick_waste_entry(request):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsWaiterOrHigher])
+def bulk_waste_entry(request):
+    """
+    End-of-shift waste entry: many lines validated and recorded together
+    (see waste_tracker.bulk_entry). Nothing is written unless every line
+    is valid.
+    """
+    user = request.user
+    if not user.branch:
+        return Response(
+            {'error': 'Bulk waste entry requires a branch assignment'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = BulkWasteEntrySerializer(
+        data=request.data,
+        context={'request': request, 'restaurant': user.branch.restaurant,
+                 'branch': user.branch}
+    )
+    if not serializer.is_valid():
+        return Response(
+            {'error': 'Invalid data', 'details': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        result = record_waste_batch(
+            serializer.validated_data['lines'], user, user.branch)
+    except Exception as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+    records = result['records']
+    return Response({
+        'success': True,
+        'message': f'{len(records)} waste records recorded',
+        'total_cost': float(result['total_cost']),
+        'recurring_issues': result['recurring'],
+        'alerts_created': result['alerts'],
+        'records': [{
+            'waste_record_id': record.id,
+            'item_name': record.stock_transaction.stock_item.name,
+            'quantity': float(record.stock_transaction.quantity),
+            'unit': record.stock_transaction.stock_item.unit,
+            'total_cost': float(record.stock_transaction.total_cost),
+            'reason': record.waste_reason.name,
+            'status': record.status,
+            'priority': record.priority,
+            'is_recurring_issue': record.is_recurring_issue,
+            'requires_approval': record.waste_reason.category.requires_approval,
+        } for record in records],
+    }, status=status.HTTP_201_CREATED)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsManagerOrAdmin])
 def run_waste_alerts(request):